@@ -1,16 +1,20 @@
-import tkinter as tk
-from tkinter import simpledialog, messagebox
+# Only what the launcher itself needs is imported here; tkinter, the GUI, the
+# network stack and the TUI are loaded by the mode that uses them
 import socket
-from logic import PoE_Meeting
-from gui import PoE_UI
-from network import PoE_Server, PoE_Client
+import sys
 
 def get_local_ip():
     hostname = socket.gethostname()
     local_ip = socket.gethostbyname(hostname)
     return local_ip
 
-def start_host():
+def start_host(qr_code_path=None):
+    import tkinter as tk
+    from tkinter import simpledialog, messagebox
+    from logic import PoE_Meeting
+    from gui import PoE_UI
+    from network import PoE_Server
+    
     root = tk.Tk()
     meeting = PoE_Meeting()
 
@@ -28,7 +32,7 @@ def start_host():
     ui = PoE_UI(root, meeting, is_host=True)
     
     # Create server with UI reference
-    server = PoE_Server(meeting, ui)
+    server = PoE_Server(meeting, ui, qr_code_path=qr_code_path)
     success = server.start()
     
     if success:
@@ -37,6 +41,7 @@ def start_host():
         
         # Start the meeting
         meeting.start_meeting()
+        server.broadcast_meeting_state()
         ui.update_display()
         
         # Show server IP address
@@ -52,6 +57,12 @@ def start_host():
         root.destroy()
 
 def start_client():
+    import tkinter as tk
+    from tkinter import simpledialog, messagebox
+    from logic import PoE_Meeting
+    from gui import PoE_UI
+    from network import PoE_Client
+    
     server_ip = simpledialog.askstring("Connect to Server", "Enter server IP address:")
     if not server_ip:
         return
@@ -81,7 +92,9 @@ def on_close(root, network):
         network.stop()
     root.destroy()
 
-def main():
+def main(qr_code_path=None):
+    import tkinter as tk
+    
     # Create selection window
     root = tk.Tk()
     root.title("PoE_ meeting")
@@ -91,7 +104,7 @@ def main():
     label = tk.Label(root, text="Choose an option:", font=("Arial", 14))
     label.pack(pady=20)
     
-    host_button = tk.Button(root, text="Host meeting", width=20, command=lambda: [root.destroy(), start_host()])
+    host_button = tk.Button(root, text="Host meeting", width=20, command=lambda: [root.destroy(), start_host(qr_code_path)])
     host_button.pack(pady=10)
     
     join_button = tk.Button(root, text="Join meeting", width=20, command=lambda: [root.destroy(), start_client()])
@@ -100,5 +113,20 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    # Dedicated hosts run without Tk: ProcessOfElimination.py --headless [options]
+    if len(sys.argv) > 1 and sys.argv[1] == "--headless":
+        import headless
+        sys.exit(headless.main(sys.argv[2:]))
+    
+    # Terminal UI: ProcessOfElimination.py --tui
+    if len(sys.argv) > 1 and sys.argv[1] == "--tui":
+        import tui
+        tui.main()
+        sys.exit(0)
+    
+    # Optional QR code for sharing the host address: ProcessOfElimination.py --qr poe_connect.png
+    qr_code_path = None
+    if len(sys.argv) > 2 and sys.argv[1] == "--qr":
+        qr_code_path = sys.argv[2]
+    main(qr_code_path)
 
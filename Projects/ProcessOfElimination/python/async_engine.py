@@ -0,0 +1,167 @@
+import asyncio
+import threading
+
+from codec import decode_message
+from fanout import OutboundQueue
+from framing import FrameDecoder, FrameError, RECV_SIZE
+
+class StreamConnection(OutboundQueue):
+    """Outbound frame queue for one asyncio client
+
+    A pump task writes queued frames and waits for the transport to drain, so
+    a slow client only ever backs up its own queue. Frames sent from other
+    threads are handed to the event loop.
+    """
+    def __init__(self, loop, writer, snapshot_provider, **kwargs):
+        super().__init__(writer.get_extra_info("peername"), snapshot_provider, **kwargs)
+        self.loop = loop
+        self.writer = writer
+        self.wakeup = asyncio.Event()
+        # Connections are created on the loop thread
+        self.loop_thread = threading.get_ident()
+        self.pump_task = loop.create_task(self.pump())
+
+    def _on_loop(self):
+        return threading.get_ident() == self.loop_thread
+
+    def send_frame(self, frame):
+        """Queue a frame without blocking; False if the client is gone"""
+        if self.closed:
+            return False
+
+        if self._on_loop():
+            return self._enqueue_and_wake(frame)
+
+        self.loop.call_soon_threadsafe(self._enqueue_and_wake, frame)
+        return True
+
+    def _enqueue_and_wake(self, frame):
+        queued = self._enqueue(frame)
+        if queued:
+            self.wakeup.set()
+        return queued
+
+    async def pump(self):
+        while True:
+            while not self.queue and not self.closed:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            if self.closed:
+                return
+
+            frame = self.queue.popleft()
+            try:
+                self.writer.write(frame)
+                await self.writer.drain()
+                self._sent(frame)
+            except Exception as e:
+                print(f"Error sending to client {self.address}: {e}")
+                self.close()
+                return
+
+    def close(self):
+        if not self._on_loop():
+            try:
+                self.loop.call_soon_threadsafe(self.close)
+            except RuntimeError:
+                # Event loop already shut down and closed the transport
+                self.closed = True
+            return
+
+        self.closed = True
+        self.queue.clear()
+        self.wakeup.set()
+        # Abort rather than close so shutdown never waits on a client that stopped reading
+        self.writer.transport.abort()
+
+    def __repr__(self):
+        return f"StreamConnection({self.address})"
+
+class AsyncServerEngine:
+    """Run accept, read and broadcast for a PoE_Server on a single event loop"""
+    def __init__(self, server):
+        self.server = server
+        self.loop = None
+        self.thread = None
+        self.aio_server = None
+        self.stopped = None
+        self.handlers = set()
+        self.ready = threading.Event()
+
+    def start(self):
+        """Start the event loop in a background thread and wait until it is accepting"""
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+        self.ready.wait(timeout=5.0)
+        return self.aio_server is not None
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.serve())
+        except Exception as e:
+            print(f"Error in asyncio server engine: {e}")
+        finally:
+            self.ready.set()
+            self.loop.close()
+
+    async def serve(self):
+        self.stopped = asyncio.Event()
+        self.aio_server = await asyncio.start_server(
+            self.handle_connection,
+            sock=self.server.server,
+            backlog=self.server.backlog,
+        )
+        self.ready.set()
+
+        async with self.aio_server:
+            await self.stopped.wait()
+
+            # Closing every transport lets the handlers see EOF and finish on this loop
+            for client in list(self.server.clients):
+                client.close()
+            await asyncio.gather(*self.handlers, return_exceptions=True)
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        connection = StreamConnection(
+            self.loop,
+            writer,
+            self.server.client_snapshot,
+            max_queue=self.server.max_queue,
+            policy=self.server.slow_consumer_policy,
+        )
+        print(f"Connection from {connection.address}")
+
+        self.server.add_client(connection)
+
+        decoder = FrameDecoder()
+        try:
+            while self.server.running:
+                data = await reader.read(RECV_SIZE)
+                if not data:
+                    break
+
+                for frame in decoder.feed(data):
+                    self.server.process_message(decode_message(frame), connection)
+        except FrameError as e:
+            print(f"Dropping client with malformed stream: {e}")
+        except Exception as e:
+            print(f"Error handling client: {e}")
+        finally:
+            self.server.remove_client(connection)
+            connection.pump_task.cancel()
+            self.handlers.discard(task)
+
+    def stop(self):
+        """Stop accepting and shut down the event loop"""
+        if self.loop and self.stopped and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.stopped.set)
+            except RuntimeError:
+                pass
+        if self.thread:
+            self.thread.join(timeout=5.0)
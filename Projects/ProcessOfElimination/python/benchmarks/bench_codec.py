@@ -0,0 +1,71 @@
+"""Compare the JSON and binary wire codecs: encode/decode time and bytes per frame
+
+Messages are built the way PoE_Room builds them: a snapshot of a normal-length
+word, a snapshot of a long custom word, a delta and a client guess. Frame
+sizes include the 4-byte length prefix.
+"""
+
+import argparse
+import os
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codec import CODEC_BINARY, CODEC_JSON, decode_message, encode_message
+from framing import HEADER_SIZE
+
+def snapshot(word, guessed, seq=1234):
+    return {
+        "type": "meeting_state",
+        "room": "default",
+        "seq": seq,
+        "data": {
+            "actual_word": word,
+            "display_word": " ".join(letter if letter in guessed else "_" for letter in word),
+            "guessed_letters": sorted(guessed),
+            "incorrect_guesses": 3,
+            "max_incorrect": 6,
+            "state": 1,
+        },
+    }
+
+def messages(long_word_length):
+    long_word = (string.ascii_uppercase * (long_word_length // 26 + 1))[:long_word_length]
+    return {
+        "snapshot": snapshot("ALGORITHM", {"A", "E", "G", "R", "T", "Z"}),
+        f"snapshot {long_word_length:,} chars": snapshot(long_word, set("AEIOURSTLN")),
+        "delta": {
+            "type": "meeting_delta",
+            "room": "default",
+            "seq": 1235,
+            "data": {"letters": ["M"], "incorrect_guesses": 3, "state": 1},
+        },
+        "guess": {"type": "guess", "letter": "Q"},
+    }
+
+def time_per_op(function, argument, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function(argument)
+    return (time.perf_counter() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--long-word", type=int, default=10000, help="length of the long snapshot word")
+    args = parser.parse_args()
+
+    print(f"{'message':<24}{'codec':<8}{'bytes':>8}{'encode us':>12}{'decode us':>12}")
+    for name, message in messages(args.long_word).items():
+        iterations = args.iterations if "chars" not in name else max(1, args.iterations // 20)
+        for codec in (CODEC_JSON, CODEC_BINARY):
+            payload = encode_message(message, codec)
+            encode_time = time_per_op(lambda m: encode_message(m, codec), message, iterations)
+            decode_time = time_per_op(decode_message, payload, iterations)
+            print(f"{name:<24}{codec:<8}{len(payload) + HEADER_SIZE:>8,}"
+                  f"{encode_time * 1e6:>12.2f}{decode_time * 1e6:>12.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Measure UDP discovery replies per second during a burst of requests
+
+A client keeps --window requests in flight against a responder on
+localhost for --seconds and counts the replies. The baseline is the previous
+responder, which made a blocking recvfrom per request, resolved the host's
+address and re-encoded the reply for every packet, and printed each one.
+Each client socket stands for one joining player; a responder answers a
+socket at most once per batch, like a real player re-asking.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discovery import DiscoveryResponder, UDP_DISCOVERY_REQUEST
+
+class BlockingResponder:
+    """Previous PoE_Server.handle_discovery_requests, kept here as the baseline"""
+    def __init__(self, port, name, udp_port):
+        self.port = port
+        self.name = name
+        self.udp_port = udp_port
+        self.running = False
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", self.udp_port))
+        self.running = True
+        thread = threading.Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+
+    def run(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(1024)
+                request = data.decode('utf-8')
+
+                if request == "DISCOVER_PROCESS_OF_ELIMINATION_SERVER":
+                    hostname = socket.gethostname()
+                    local_ip = socket.gethostbyname(hostname)
+                    response = json.dumps({
+                        "type": "server_info",
+                        "host": local_ip,
+                        "port": self.port,
+                        "name": self.name
+                    }).encode('utf-8')
+                    self.sock.sendto(response, addr)
+                    print(f"Responding to discovery request from {addr}")
+            except Exception as e:
+                if self.running:
+                    print(f"Error handling discovery request: {e}")
+                    time.sleep(1)
+
+    def close(self):
+        self.running = False
+        self.sock.close()
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def blast(udp_port, clients, window, seconds):
+    """Keep `window` requests outstanding per client socket; returns (sent, replies, elapsed)"""
+    sockets = []
+    for _ in range(clients):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        sockets.append(sock)
+
+    sent = replies = 0
+    outstanding = [0] * clients
+    start = time.perf_counter()
+    deadline = start + seconds
+    try:
+        while time.perf_counter() < deadline:
+            for index, sock in enumerate(sockets):
+                while outstanding[index] < window:
+                    try:
+                        sock.sendto(UDP_DISCOVERY_REQUEST, ("127.0.0.1", udp_port))
+                    except BlockingIOError:
+                        break
+                    outstanding[index] += 1
+                    sent += 1
+                while True:
+                    try:
+                        sock.recvfrom(1024)
+                    except BlockingIOError:
+                        break
+                    replies += 1
+                    # A batched responder answers several queued requests from one socket once
+                    outstanding[index] = 0
+            if not replies and time.perf_counter() - start > 1:
+                break
+            time.sleep(0)
+        elapsed = time.perf_counter() - start
+    finally:
+        for sock in sockets:
+            sock.close()
+    return sent, replies, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200, help="client sockets, one per joining player")
+    parser.add_argument("--window", type=int, default=1, help="requests in flight per client")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'responder':<12}{'requests':>10}{'replies':>10}{'replies/s':>12}")
+    for label, responder_class in (("baseline", BlockingResponder), ("cached", DiscoveryResponder)):
+        udp_port = free_udp_port()
+        if responder_class is DiscoveryResponder:
+            responder = DiscoveryResponder(5555, "POE_bench_5555", udp_port, bind_host="127.0.0.1")
+        else:
+            responder = responder_class(5555, "POE_bench_5555", udp_port)
+        # The baseline prints every reply; keep that cost but not the output
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            responder.start()
+            try:
+                sent, replies, elapsed = blast(udp_port, args.clients, args.window, args.seconds)
+            finally:
+                responder.close()
+        print(f"{label:<12}{sent:>10,}{replies:>10,}{replies / elapsed:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Measure messages/sec for guesses pipelined over a single framed socket"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import string
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from framing import FrameDecoder, RECV_SIZE, encode_frame
+from logic import PoE_Meeting
+from network import PoE_Server, ServerEngine
+
+class BenchUI:
+    """Stand-in for PoE_UI so the benchmark measures only the network path"""
+    def update_display(self):
+        pass
+
+# Z is never guessed, so after every guess the meeting is still PLAYING
+WORD = "PUZZLE"
+GUESS_LETTERS = string.ascii_lowercase[:25]
+
+def build_guesses(count):
+    return [
+        encode_frame(json.dumps({"type": "guess", "letter": GUESS_LETTERS[i % len(GUESS_LETTERS)]}).encode('utf-8'))
+        for i in range(count)
+    ]
+
+def bench_server(count, engine):
+    """Pipeline every guess over one joined connection and time until the server has processed them all
+
+    The server listens on an ephemeral port and the connection goes through
+    its ClientWriter, room join and guess rate limiter like any player's.
+    Only the first pass over the alphabet changes the meeting; later guesses
+    repeat letters and take the same path up to the meeting's check.
+    """
+    meeting = PoE_Meeting()
+    meeting.pose_problem(WORD)
+    meeting.max_incorrect = count + 1
+    meeting.start_meeting()
+
+    # A bucket that holds the whole burst: the limiter runs but never rejects a guess
+    server = PoE_Server(meeting, BenchUI(), host="127.0.0.1", port=0, engine=engine,
+                        guess_rate=float(count), guess_burst=count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not server.start():
+            raise RuntimeError("server failed to start")
+
+    processed = 0
+    joined = threading.Event()
+    done = threading.Event()
+    process_message = server.process_message
+
+    def counting_process_message(message, client=None):
+        nonlocal processed
+        process_message(message, client)
+        if message["type"] == "join":
+            joined.set()
+        elif message["type"] == "guess":
+            processed += 1
+            if processed == count:
+                done.set()
+
+    server.process_message = counting_process_message
+
+    sock = socket.create_connection(("127.0.0.1", server.port))
+    sock.sendall(encode_frame(json.dumps({"type": "join", "room": None}).encode('utf-8')))
+    joined.wait(timeout=10)
+
+    # Read the welcome, snapshot and deltas so the server's writer never backs up
+    reader = threading.Thread(target=drain, args=(sock,))
+    reader.daemon = True
+    reader.start()
+
+    payload = b"".join(build_guesses(count))
+    start = time.perf_counter()
+    sock.sendall(payload)
+    done.wait(timeout=30)
+    elapsed = time.perf_counter() - start
+
+    state = meeting.state
+    sock.close()
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.stop()
+    return processed, elapsed, state
+
+def drain(sock):
+    try:
+        while sock.recv(RECV_SIZE):
+            pass
+    except OSError:
+        pass
+
+def bench_decoder(count, chunk_size):
+    """Decode the same pipelined stream split into fixed recv()-sized chunks"""
+    payload = b"".join(build_guesses(count))
+    decoder = FrameDecoder()
+
+    start = time.perf_counter()
+    decoded = 0
+    for offset in range(0, len(payload), chunk_size):
+        decoded += len(decoder.feed(payload[offset:offset + chunk_size]))
+    elapsed = time.perf_counter() - start
+    return decoded, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1000, help="guesses to pipeline")
+    parser.add_argument("--chunk", type=int, default=1024, help="chunk size for decoder-only run")
+    parser.add_argument("--engine", choices=[ServerEngine.THREADED, ServerEngine.ASYNCIO],
+                        default=ServerEngine.THREADED)
+    args = parser.parse_args()
+
+    processed, elapsed, state = bench_server(args.count, args.engine)
+    print(f"server ({args.engine}): {processed}/{args.count} messages in {elapsed * 1000:.1f} ms "
+          f"({processed / elapsed:,.0f} msg/s), meeting {state.name} after the last guess")
+
+    decoded, elapsed = bench_decoder(args.count, args.chunk)
+    print(f"decoder: {decoded} frames from {args.chunk}-byte chunks in {elapsed * 1000:.1f} ms "
+          f"({decoded / elapsed:,.0f} msg/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Time guesses and state snapshots on PoE_Meeting with very long custom words
+
+The baseline is the previous implementation, which rescanned the word on every
+guess and rebuilt the masked string and sorted guess list on every snapshot.
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import PoE_Meeting, Transcript
+
+class RescanMeeting:
+    """Previous PoE_Meeting guess/snapshot logic, kept here as the baseline"""
+    def __init__(self, word):
+        self.word = word
+        self.guessed_letters = set()
+        self.incorrect_guesses = 0
+        self.max_incorrect = 6
+        self.state = Transcript.PLAYING
+
+    def propose_solution(self, letter):
+        if self.state != Transcript.PLAYING or letter in self.guessed_letters:
+            return False
+        self.guessed_letters.add(letter)
+        if letter not in self.word:
+            self.incorrect_guesses += 1
+        if all(letter in self.guessed_letters for letter in self.word):
+            self.state = Transcript.WON
+        return True
+
+    def get_meeting_state(self):
+        return {
+            "word": self.word,
+            "display_word": " ".join([letter if letter in self.guessed_letters else "_" for letter in self.word]),
+            "guessed_letters": sorted(list(self.guessed_letters)),
+            "incorrect_guesses": self.incorrect_guesses,
+            "max_incorrect": self.max_incorrect,
+            "state": self.state
+        }
+
+def play(meeting, guesses, snapshots_per_guess):
+    """Guess every letter, taking snapshots after each like a busy server would"""
+    start = time.perf_counter()
+    for letter in guesses:
+        meeting.propose_solution(letter)
+        for _ in range(snapshots_per_guess):
+            meeting.get_meeting_state()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--snapshots", type=int, default=10, help="get_meeting_state calls per guess")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Leave out one letter so the meeting stays in progress for all 26 guesses
+    alphabet = string.ascii_uppercase[:-1]
+    guesses = list(string.ascii_uppercase)
+    rng.shuffle(guesses)
+
+    for length in args.lengths:
+        word = "".join(rng.choice(alphabet) for _ in range(length))
+
+        meeting = PoE_Meeting()
+        meeting.max_incorrect = len(guesses)
+        start = time.perf_counter()
+        meeting.pose_problem(word)
+        setup = time.perf_counter() - start
+        meeting.start_meeting()
+        indexed = play(meeting, guesses, args.snapshots)
+
+        baseline = play(RescanMeeting(word), guesses, args.snapshots)
+
+        calls = len(guesses) * (1 + args.snapshots)
+        print(f"length={length:>7}: indexed {indexed * 1000:8.2f} ms (+{setup * 1000:.2f} ms setup), "
+              f"rescan {baseline * 1000:8.2f} ms, "
+              f"{indexed / calls * 1e6:.2f} vs {baseline / calls * 1e6:.2f} us/call, "
+              f"speedup {baseline / indexed:.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Measure guesses/sec and memory per room with many rooms on one PoE_Server
+
+Clients are in-process stand-ins that only count the bytes they are sent, so
+the numbers cover room lookup, guess evaluation, encoding and queueing but not
+socket writes. Guesses are not rate-limited, since one stand-in guesses far
+faster than any player could.
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fanout import OutboundQueue
+from logic import PoE_Meeting, Transcript
+from network import PoE_Server
+
+class BenchUI:
+    """Stand-in for PoE_UI so the benchmark measures only the server path"""
+    def update_display(self):
+        pass
+
+class CountingClient(OutboundQueue):
+    """Connection stand-in that accepts every frame and counts the bytes
+
+    Everything but the writer comes from OutboundQueue, so the server sees
+    the same per-connection state as on a real ClientWriter.
+    """
+    def send_frame(self, frame):
+        if self.closed:
+            return False
+        self._sent(frame)
+        return True
+
+    def close(self):
+        self.closed = True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=4, help="clients per room")
+    parser.add_argument("--guesses", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = PoE_Server(PoE_Meeting(), BenchUI(), port=0, guess_rate=None)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    clients = []
+    for room_number in range(args.rooms):
+        room_id = f"room-{room_number}"
+        for _ in range(args.clients):
+            client = CountingClient(f"{room_id}/{len(clients)}", server.client_snapshot)
+            server.add_client(client)
+            server.process_message({"type": "join", "room": room_id}, client)
+            clients.append(client)
+
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    letters = string.ascii_lowercase
+    restarts = 0
+    start = time.perf_counter()
+    for _ in range(args.guesses):
+        client = clients[rng.randrange(len(clients))]
+        if client.room.meeting.state != Transcript.PLAYING:
+            server.start_new_meeting(client.room)
+            restarts += 1
+        server.process_message({"type": "guess", "letter": rng.choice(letters)}, client)
+    elapsed = time.perf_counter() - start
+
+    sent = sum(client.bytes_sent for client in clients)
+    print(f"rooms={len(server.rooms) - 1} clients/room={args.clients}")
+    print(f"memory: {allocated / 1024:,.0f} KiB total, {allocated / args.rooms / 1024:.1f} KiB per room "
+          f"(including {args.clients} client stand-ins)")
+    print(f"guesses: {args.guesses:,} in {elapsed:.2f} s ({args.guesses / elapsed:,.0f}/s), "
+          f"{restarts:,} meetings restarted, {sent / 1e6:.1f} MB queued")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Time solver moves over whole meetings on a large dictionary
+
+Without --word-list a synthetic dictionary is generated with English-like
+letter frequencies. Each meeting draws a word from the dictionary and the
+solver plays it to the end; moves are timed both incrementally (only the
+new guess is applied to the previous candidates) and from scratch.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import PoE_Meeting, Transcript
+from solver import Solver
+from wordstore import ListWordStore, open_word_store
+
+# Relative frequency of A-Z in English text
+LETTER_WEIGHTS = [8.2, 1.5, 2.8, 4.3, 12.7, 2.2, 2.0, 6.1, 7.0, 0.2, 0.8, 4.0, 2.4,
+                  6.7, 7.5, 1.9, 0.1, 6.0, 6.3, 9.1, 2.8, 1.0, 2.4, 0.2, 2.0, 0.1]
+LETTERS = [chr(ord("A") + letter) for letter in range(26)]
+
+def synthetic_words(count, rng):
+    words = set()
+    while len(words) < count:
+        length = min(max(int(rng.gauss(8, 2.5)), 3), 16)
+        words.add("".join(rng.choices(LETTERS, LETTER_WEIGHTS, k=length)))
+    return sorted(words)
+
+def play(solver, meeting, incremental):
+    """Solve one meeting; returns the time of every move"""
+    times = []
+    candidates = None
+    while meeting.state == Transcript.PLAYING:
+        start = time.perf_counter()
+        letter, next_candidates = solver.play(meeting, candidates)
+        times.append(time.perf_counter() - start)
+        if incremental:
+            candidates = next_candidates
+        if letter is None or not meeting.propose_solution(letter):
+            break
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--word-list", help="dictionary file (default: synthetic)")
+    parser.add_argument("--words", type=int, default=100_000, help="size of the synthetic dictionary")
+    parser.add_argument("--meetings", type=int, default=500)
+    parser.add_argument("--no-numpy", action="store_true", help="build tables in pure Python")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    store = open_word_store(args.word_list) if args.word_list else ListWordStore(synthetic_words(args.words, rng))
+    solver = Solver(store, use_numpy=not args.no_numpy)
+
+    start = time.perf_counter()
+    lengths = store.get_index("length").keys
+    for length in lengths:
+        solver.table(length)
+    print(f"{len(store):,} words, {len(lengths)} lengths: tables built in {time.perf_counter() - start:.2f} s")
+
+    print(f"{'mode':<14}{'moves':>8}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'max us':>10}{'won':>8}")
+    for mode, incremental in (("incremental", True), ("from scratch", False)):
+        times = []
+        won = 0
+        meeting_rng = random.Random(args.seed)
+        for _ in range(args.meetings):
+            meeting = PoE_Meeting(store)
+            meeting.pose_problem(store.random_word(meeting_rng))
+            meeting.start_meeting()
+            times.extend(play(solver, meeting, incremental))
+            won += meeting.state == Transcript.WON
+        times.sort()
+        print(f"{mode:<14}{len(times):>8,}{statistics.fmean(times) * 1e6:>10.1f}"
+              f"{times[len(times) // 2] * 1e6:>10.1f}{times[int(len(times) * 0.99)] * 1e6:>10.1f}"
+              f"{times[-1] * 1e6:>10.1f}{won / args.meetings:>8.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Track cold-start import cost for each launch mode, and of the frozen build
+
+For every mode a fresh interpreter imports the mode's entry module under
+-X importtime; the slowest imports are listed with their cumulative time.
+Pass --exe to also time cold starts of the PyInstaller build produced from
+ProcessOfElimination.spec (it is run with --headless --help, which loads the
+launcher and exits before opening any sockets or windows). --record appends
+the results as one JSON line so they can be tracked across commits.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry module imported by each launch mode before its first screen appears
+MODES = {
+    "launcher": "import ProcessOfElimination",
+    "gui-host": "import ProcessOfElimination, tkinter, gui, network",
+    "headless": "import headless",
+    "network": "import network",
+}
+
+def import_times(statement):
+    """Run one cold import; returns ({module: cumulative_us}, top-level total_us, wall seconds)"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{result.stderr}")
+
+    times = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or "cumulative" in fields[1]:
+            continue
+        cumulative_us, name = int(fields[1]), fields[2]
+        # Nested imports are indented under their importer; only roots add to the total
+        if not name.startswith("  "):
+            total += cumulative_us
+        times[name.strip()] = max(times.get(name.strip(), 0), cumulative_us)
+    return times, total, wall
+
+def bench_mode(statement, runs):
+    """Median wall time and import total over several cold starts, plus the last run's breakdown"""
+    walls, totals = [], []
+    times = {}
+    for _ in range(runs):
+        times, total, wall = import_times(statement)
+        walls.append(wall)
+        totals.append(total)
+    return times, statistics.median(totals), statistics.median(walls)
+
+def bench_exe(exe, runs):
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([exe, "--headless", "--help"], capture_output=True)
+        walls.append(time.perf_counter() - start)
+    return statistics.median(walls)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to list per mode")
+    parser.add_argument("--exe", help="path to the frozen ProcessOfElimination executable")
+    parser.add_argument("--record", help="append results as a JSON line to this file")
+    args = parser.parse_args()
+
+    record = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0], "modes": {}}
+
+    for mode, statement in MODES.items():
+        times, total_us, wall = bench_mode(statement, args.runs)
+        total_ms = total_us / 1000
+        record["modes"][mode] = {"imports_ms": round(total_ms, 1), "process_ms": round(wall * 1000, 1)}
+        print(f"{mode:>9}: imports {total_ms:6.1f} ms, process {wall * 1000:6.1f} ms")
+
+        slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, us in slowest:
+            print(f"{'':>11}{us / 1000:7.1f} ms  {name}")
+
+    if args.exe:
+        wall = bench_exe(args.exe, args.runs)
+        record["frozen_ms"] = round(wall * 1000, 1)
+        print(f"   frozen: {wall * 1000:6.1f} ms for {args.exe} --headless --help")
+
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as history:
+            history.write(json.dumps(record) + "\n")
+
+if __name__ == "__main__":
+    main()
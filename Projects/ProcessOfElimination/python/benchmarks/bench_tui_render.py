@@ -0,0 +1,96 @@
+"""Count the bytes the terminal UI writes per state change over 100 guesses
+
+A player's session is simulated: each guess is typed (the input buffer
+changes) and then sent (the meeting changes), and every change redraws the
+meeting view. When a meeting ends, the next one starts from a cleared
+screen, like coming back from the results screen.
+
+"full reprint" is what the view cost before it went through the screen
+buffer: the screen is cleared and every line is printed again. "diff" is what
+screen.Screen writes.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import PoE_Meeting, Transcript
+from screen import Screen
+from tui import ProcessOfEliminationTUI
+
+# What `clear` wrote before each reprint
+CLEAR_SEQUENCE = "\033[H\033[2J\033[3J"
+
+class CountingStream(io.TextIOBase):
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text.encode("utf-8"))
+        return len(text)
+
+def full_reprint_bytes(lines):
+    return len((CLEAR_SEQUENCE + "\n".join(lines)).encode("utf-8"))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guesses", type=int, default=100)
+    parser.add_argument("--width", type=int, default=120)
+    parser.add_argument("--height", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    meeting = PoE_Meeting()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tui = ProcessOfEliminationTUI(meeting)
+    tui.width, tui.height = args.width, args.height
+
+    stream = CountingStream()
+    screen = Screen(args.width, args.height, stream)
+    full_bytes = []
+    diff_bytes = []
+
+    def draw():
+        lines = tui.meeting_view_lines(meeting.get_meeting_state())
+        before = stream.bytes
+        screen.render(lines)
+        diff_bytes.append(stream.bytes - before)
+        full_bytes.append(full_reprint_bytes(lines))
+
+    guesses = meetings = 0
+    while guesses < args.guesses:
+        meeting.reset_meeting()
+        meeting.start_meeting()
+        meetings += 1
+        screen.invalidate()
+        draw()
+        letters = [chr(ord("a") + letter) for letter in range(26)]
+        rng.shuffle(letters)
+        for letter in letters:
+            if meeting.state != Transcript.PLAYING or guesses >= args.guesses:
+                break
+            tui.input_buffer = letter
+            draw()
+            tui.input_buffer = ""
+            meeting.propose_solution(letter)
+            guesses += 1
+            draw()
+
+    changes = len(diff_bytes)
+    print(f"{guesses} guesses over {meetings} meetings, {changes} redraws on a {args.width}x{args.height} terminal")
+    print(f"{'':<14}{'total':>10}{'mean':>8}{'median':>8}{'max':>8}")
+    for label, sizes in (("full reprint", full_bytes), ("diff", diff_bytes)):
+        print(f"{label:<14}{sum(sizes):>10,}{statistics.mean(sizes):>8.0f}{statistics.median(sizes):>8.0f}"
+              f"{max(sizes):>8,}")
+    print(f"diff writes {sum(diff_bytes) / sum(full_bytes):.1%} of the bytes; "
+          f"{screen.full_frames} of its frames were full redraws")
+
+if __name__ == "__main__":
+    main()
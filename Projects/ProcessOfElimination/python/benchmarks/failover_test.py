@@ -0,0 +1,165 @@
+"""Kill a headless host with a hot standby attached and time how long players take to recover
+
+A host and a standby (headless.py --standby-of) run as two local processes.
+Players connect to the host, make some guesses, and then the host is killed
+with SIGKILL. The run reports how long it took the standby to take over, and
+how long it took each player to get the meeting back from it. It checks that
+the meeting state survived, and that a guess made after failover reaches
+every player.
+
+Exits non-zero if any player failed to recover or saw a different meeting.
+"""
+
+import argparse
+import contextlib
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import PoE_Meeting
+from network import PoE_Client
+from discovery import DiscoveryCache
+
+HEADLESS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "headless.py")
+
+class RecordingUI:
+    """Notes when the player's meeting last changed"""
+    def __init__(self):
+        self.updated = threading.Event()
+        self.updated_at = None
+
+    def update_display(self):
+        self.updated_at = time.monotonic()
+        self.updated.set()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_host(port, *extra):
+    return subprocess.Popen(
+        [sys.executable, HEADLESS, "--host", "127.0.0.1", "--port", str(port), "--restart-delay", "-1",
+         "--guess-rate", "0", "--batch-ms", "0", "--log-format", "text", *extra],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+def wait_until(condition, timeout, interval=0.01):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return condition()
+
+def meeting_key(meeting):
+    return meeting.word, "".join(meeting.guessed_letters), meeting.incorrect_guesses, meeting.state
+
+def run_once(players, failover_timeout, guesses):
+    host_port, standby_port = free_port(), free_port()
+    secret = os.urandom(16).hex()
+    host = start_host(host_port, "--standby-secret", secret)
+    standby = start_host(standby_port, "--standby-of", f"127.0.0.1:{host_port}", "--standby-secret", secret,
+                         "--failover-timeout", str(failover_timeout))
+    clients = []
+    try:
+        if not wait_until(lambda: connectable(host_port), 10):
+            raise RuntimeError("host did not start")
+
+        for _ in range(players):
+            client = PoE_Client(PoE_Meeting(), RecordingUI(), discovery_cache=DiscoveryCache(path=None))
+            if not client.connect_direct("127.0.0.1", host_port):
+                raise RuntimeError("player could not connect")
+            clients.append(client)
+        if not wait_until(lambda: all(client.standby and client.seq is not None for client in clients), 10):
+            raise RuntimeError("standby never attached")
+
+        for letter in guesses:
+            clients[0].propose_solution(letter)
+        expected_guesses = len(set(guesses.upper()))
+        wait_until(lambda: all(len(client.meeting.guessed_letters) >= expected_guesses for client in clients), 5)
+        before = {meeting_key(client.meeting) for client in clients}
+
+        for client in clients:
+            client.ui.updated.clear()
+        host.send_signal(signal.SIGKILL)
+        killed_at = time.monotonic()
+        host.wait()
+
+        recovered = wait_until(lambda: all(client.port == standby_port and client.ui.updated.is_set()
+                                           for client in clients), failover_timeout + 15)
+        recovery_times = [client.ui.updated_at - killed_at for client in clients if client.ui.updated.is_set()
+                          and client.port == standby_port]
+        after = {meeting_key(client.meeting) for client in clients}
+
+        # The standby must keep the meeting going, not just show it
+        letter = next(letter for letter in "ETAOINSHRDLU" if letter not in clients[0].meeting.guessed_letters)
+        clients[0].propose_solution(letter.lower())
+        continued = wait_until(lambda: all(letter in client.meeting.guessed_letters for client in clients), 5)
+
+        return {
+            "recovered": recovered,
+            "times": recovery_times,
+            "state_kept": before == after and len(before) == 1,
+            "continued": continued,
+            "state": before.pop() if before else None,
+        }
+    finally:
+        for client in clients:
+            client.disconnect()
+        for process in (host, standby):
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+def connectable(port):
+    try:
+        socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+        return True
+    except OSError:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--failover-timeout", type=float, default=2.0)
+    parser.add_argument("--guesses", default="aeo", help="letters guessed before the host is killed")
+    parser.add_argument("--verbose", action="store_true", help="show the players' connection messages")
+    args = parser.parse_args()
+
+    failures = 0
+    all_times = []
+    for run in range(1, args.runs + 1):
+        with contextlib.ExitStack() as stack:
+            if not args.verbose:
+                stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+            result = run_once(args.players, args.failover_timeout, args.guesses)
+
+        times = sorted(result["times"])
+        all_times.extend(times)
+        ok = result["recovered"] and result["state_kept"] and result["continued"]
+        failures += not ok
+        summary = (f"median {statistics.median(times) * 1000:.0f} ms, max {times[-1] * 1000:.0f} ms"
+                   if times else "no player recovered")
+        print(f"run {run}: {len(times)}/{args.players} players recovered, {summary}; "
+              f"state kept: {result['state_kept']}, play continued: {result['continued']}")
+
+    if all_times:
+        all_times.sort()
+        print(f"overall: median {statistics.median(all_times) * 1000:.0f} ms, "
+              f"p95 {all_times[int(len(all_times) * 0.95)] * 1000:.0f} ms, max {all_times[-1] * 1000:.0f} ms")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Drive many simulated clients against a PoE_Server and time broadcast fan-out
+
+Each round one client sends a guess and the round ends when every client has
+received the resulting broadcast. Clients run on an event loop in
+this process, so the numbers include the harness's own share of the GIL.
+
+With --burst N, N clients instead guess at the same moment (cycling through
+the alphabet until the meeting is won) and the run reports how many frames
+each client received before seeing the final state; compare --batch-ms 0
+with --batch-ms 20 to see guess coalescing.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from framing import FrameDecoder, RECV_SIZE, encode_frame
+from logic import PoE_Meeting, Transcript
+from network import PoE_Server, ServerEngine
+
+class BenchUI:
+    """Stand-in for PoE_UI so the harness measures only the network path"""
+    def update_display(self):
+        pass
+
+class SimulatedClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.decoder = FrameDecoder()
+        self.frames = []
+
+    async def next_message(self):
+        while not self.frames:
+            data = await self.reader.read(RECV_SIZE)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self.frames.extend(self.decoder.feed(data))
+        return json.loads(self.frames.pop(0).decode('utf-8'))
+
+    async def wait_for(self, message_type):
+        """Skip messages until one of the given type arrives; returns (message, messages read)"""
+        count = 1
+        message = await self.next_message()
+        while message["type"] != message_type:
+            message = await self.next_message()
+            count += 1
+        return message, count
+
+    async def wait_until_won(self):
+        """Read broadcasts until the meeting is won; returns how many frames that took"""
+        count = 0
+        while True:
+            message = await self.next_message()
+            count += 1
+            if message["data"]["state"] == Transcript.WON.value:
+                return count
+
+    def send(self, message):
+        self.writer.write(encode_frame(json.dumps(message).encode('utf-8')))
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+async def connect_clients(port, count, batch):
+    clients = []
+    for offset in range(0, count, batch):
+        pending = [asyncio.open_connection("127.0.0.1", port) for _ in range(min(batch, count - offset))]
+        for reader, writer in await asyncio.gather(*pending):
+            client = SimulatedClient(reader, writer)
+            client.send({"type": "join"})
+            clients.append(client)
+
+    # Every client is sent a welcome and then the current state once it has joined
+    await asyncio.gather(*(client.wait_for("meeting_state") for client in clients))
+    return clients
+
+async def drive(port, count, rounds, batch):
+    start = time.perf_counter()
+    clients = await connect_clients(port, count, batch)
+    connect_time = time.perf_counter() - start
+    print(f"connected {len(clients)} clients in {connect_time:.2f} s")
+
+    letters = string.ascii_lowercase
+    latencies = []
+    for i in range(rounds):
+        sender = clients[i % len(clients)]
+        start = time.perf_counter()
+        sender.send({"type": "guess", "letter": letters[i % 26]})
+        await asyncio.gather(*(client.next_message() for client in clients))
+        latencies.append(time.perf_counter() - start)
+
+    for client in clients:
+        client.writer.close()
+    return latencies
+
+async def drive_burst(port, count, burst, batch):
+    clients = await connect_clients(port, count, batch)
+    print(f"connected {len(clients)} clients")
+
+    start = time.perf_counter()
+    letters = string.ascii_lowercase
+    for i in range(burst):
+        clients[i % len(clients)].send({"type": "guess", "letter": letters[i % 26]})
+    frames = await asyncio.gather(*(client.wait_until_won() for client in clients))
+    elapsed = time.perf_counter() - start
+
+    for client in clients:
+        client.writer.close()
+    return frames, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=26, help="guesses to send (at most 26 distinct letters)")
+    parser.add_argument("--batch", type=int, default=100, help="concurrent connects per batch")
+    parser.add_argument("--engine", choices=[ServerEngine.ASYNCIO, ServerEngine.THREADED], default=ServerEngine.ASYNCIO)
+    parser.add_argument("--burst", type=int, default=0, help="guesses sent at once by different clients (at least 26)")
+    parser.add_argument("--batch-ms", type=float, default=0.0, help="server guess coalescing window")
+    args = parser.parse_args()
+
+    # Repeated letters change nothing, so the server does not broadcast them
+    args.rounds = min(args.rounds, 26)
+
+    # Client and server sockets both live in this process
+    raise_fd_limit(2 * args.clients + 64)
+
+    meeting = PoE_Meeting()
+    meeting.pose_problem(string.ascii_lowercase * 4)
+    meeting.start_meeting()
+
+    server = PoE_Server(meeting, BenchUI(), host="127.0.0.1", port=0, engine=args.engine,
+                        batch_window=args.batch_ms / 1000 or None)
+    if not server.start():
+        sys.exit("server failed to start")
+
+    if args.burst:
+        try:
+            frames, elapsed = asyncio.run(drive_burst(server.port, args.clients, max(args.burst, 26), args.batch))
+        finally:
+            server.stop()
+        print(f"engine={args.engine} clients={args.clients} burst={max(args.burst, 26)} batch={args.batch_ms:g} ms")
+        print(f"settled in {elapsed * 1000:.1f} ms; frames per client: median {statistics.median(frames):g}, "
+              f"max {max(frames)}; {sum(frames):,} frames total")
+        return
+
+    try:
+        latencies = asyncio.run(drive(server.port, args.clients, args.rounds, args.batch))
+    finally:
+        server.stop()
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    total = sum(latencies)
+    print(f"engine={args.engine} clients={args.clients} rounds={len(latencies)}")
+    print(f"fan-out latency: median {statistics.median(latencies_ms):.1f} ms, "
+          f"p95 {latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.95))]:.1f} ms, max {latencies_ms[-1]:.1f} ms")
+    print(f"delivered {args.clients * len(latencies) / total:,.0f} messages/s")
+
+if __name__ == "__main__":
+    main()
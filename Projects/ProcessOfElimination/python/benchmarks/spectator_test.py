@@ -0,0 +1,232 @@
+"""Show that relays keep the host's CPU flat as spectators are added
+
+A headless host and --relays relay nodes (headless.py --relay-of) run as
+local processes. One player guesses at --guess-rate for --seconds while the
+host's CPU time is sampled from /proc (Linux only), first with nobody
+watching, then with --spectators read-only connections spread over the
+relays by --workers processes. With --direct the spectators also connect
+straight to the host, for comparison.
+
+Each spectator records the last version it saw; a spectator is caught up if
+that matches the player's once the stream has drained. Exits non-zero if
+any spectator failed to connect or fell behind.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from codec import decode_message
+from discovery import DiscoveryCache
+from framing import FrameDecoder, RECV_SIZE, encode_frame
+from logic import PoE_Meeting, Transcript
+from network import PoE_Client
+
+HEADLESS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "headless.py")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+JOIN_FRAME = encode_frame(json.dumps({"type": "join", "room": None, "spectate": True}).encode("utf-8"))
+
+class QuietUI:
+    def update_display(self):
+        pass
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(port, *extra):
+    return subprocess.Popen(
+        [sys.executable, HEADLESS, "--host", "127.0.0.1", "--port", str(port), "--engine", "asyncio",
+         "--restart-delay", "0.2", "--guess-rate", "0", "--batch-ms", "0", "--max-queue", "256",
+         "--log-level", "warning", "--log-format", "text", *extra],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    # utime and stime, fields 14 and 15 of the full line
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+def wait_until(condition, timeout, interval=0.05):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return condition()
+
+def connectable(port):
+    try:
+        socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+        return True
+    except OSError:
+        return False
+
+def spectate(ports, count, ready, stop, results):
+    """Worker process: hold `count` spectator connections and note the last seq each one sees"""
+    selector = selectors.DefaultSelector()
+    last_seq = {}
+    failed = 0
+    for index in range(count):
+        port = ports[index % len(ports)]
+        try:
+            sock = socket.create_connection(("127.0.0.1", port), timeout=10)
+            sock.sendall(JOIN_FRAME)
+            sock.setblocking(False)
+        except OSError:
+            failed += 1
+            continue
+        selector.register(sock, selectors.EVENT_READ, FrameDecoder())
+        last_seq[sock] = None
+    ready.put((count - failed, failed))
+
+    frames = 0
+    while not stop.is_set():
+        for key, _ in selector.select(0.1):
+            try:
+                data = key.fileobj.recv(RECV_SIZE)
+            except OSError:
+                data = b""
+            if not data:
+                selector.unregister(key.fileobj)
+                continue
+            decoded = key.data.feed(data)
+            if decoded:
+                frames += len(decoded)
+                # Versions only go up, so the last frame of a read is enough
+                message = decode_message(decoded[-1])
+                if "seq" in message:
+                    last_seq[key.fileobj] = message["seq"]
+    results.put((list(last_seq.values()), frames))
+    for sock in last_seq:
+        sock.close()
+
+def drive(port, rate, seconds):
+    """Guess letters at `rate` per second; returns (guesses, the player's last seq)"""
+    meeting = PoE_Meeting()
+    client = PoE_Client(meeting, QuietUI(), discovery_cache=DiscoveryCache(path=None), auto_reconnect=False)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        connected = client.connect_direct("127.0.0.1", port)
+    if not connected:
+        raise RuntimeError("player could not connect")
+    wait_until(lambda: client.seq is not None, 5)
+
+    rng = random.Random(1)
+    guesses = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if meeting.state == Transcript.PLAYING:
+            open_letters = [chr(ord("a") + letter) for letter in range(26)
+                            if chr(ord("A") + letter) not in meeting.guessed_letters]
+            if open_letters:
+                client.propose_solution(rng.choice(open_letters))
+                guesses += 1
+        time.sleep(1 / rate)
+    time.sleep(0.5)
+    seq = client.seq
+    client.disconnect()
+    return guesses, seq
+
+def run_phase(label, host, host_port, relays, ports, spectators, workers, rate, seconds):
+    stop = multiprocessing.Event()
+    ready = multiprocessing.Queue()
+    results = multiprocessing.Queue()
+    processes = []
+    connected = failed = 0
+    if spectators:
+        share, extra = divmod(spectators, workers)
+        for index in range(workers):
+            count = share + (1 if index < extra else 0)
+            process = multiprocessing.Process(target=spectate, args=(ports, count, ready, stop, results))
+            process.daemon = True
+            process.start()
+            processes.append(process)
+        for _ in processes:
+            ok, bad = ready.get(timeout=120)
+            connected += ok
+            failed += bad
+        # Let the last joins get their snapshots before measuring
+        time.sleep(1)
+
+    host_before = cpu_seconds(host.pid)
+    relays_before = [cpu_seconds(relay.pid) for relay in relays]
+    started = time.monotonic()
+    guesses, final_seq = drive(host_port, rate, seconds)
+    elapsed = time.monotonic() - started
+    host_cpu = cpu_seconds(host.pid) - host_before
+    relay_cpu = [cpu_seconds(relay.pid) - before for relay, before in zip(relays, relays_before)]
+
+    # Give the relays time to pass the last changes on
+    time.sleep(1)
+    stop.set()
+    seqs = []
+    frames = 0
+    for _ in processes:
+        worker_seqs, worker_frames = results.get(timeout=60)
+        seqs.extend(worker_seqs)
+        frames += worker_frames
+    for process in processes:
+        process.join(timeout=10)
+
+    caught_up = sum(1 for seq in seqs if seq == final_seq)
+    print(f"{label:<10}{connected:>7,}{guesses:>9}{host_cpu / elapsed * 100:>10.1f}%"
+          f"{sum(relay_cpu) / elapsed * 100:>11.1f}%{frames:>12,}{caught_up:>10,}")
+    return failed == 0 and caught_up == connected
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spectators", type=int, default=5000)
+    parser.add_argument("--relays", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4, help="processes holding the spectator connections")
+    parser.add_argument("--guess-rate", type=float, default=10.0, help="guesses per second")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--direct", action="store_true", help="also run the spectators against the host itself")
+    args = parser.parse_args()
+
+    host_port = free_port()
+    host = start_server(host_port)
+    relay_ports = [free_port() for _ in range(args.relays)]
+    relays = []
+    ok = True
+    try:
+        if not wait_until(lambda: connectable(host_port), 10):
+            raise RuntimeError("host did not start")
+        relays = [start_server(port, "--relay-of", f"127.0.0.1:{host_port}") for port in relay_ports]
+        if not wait_until(lambda: all(connectable(port) for port in relay_ports), 10):
+            raise RuntimeError("relays did not start")
+        time.sleep(1)
+
+        print(f"{'phase':<10}{'watch':>7}{'guesses':>9}{'host CPU':>11}{'relay CPU':>12}"
+              f"{'frames':>12}{'caught up':>10}")
+        phases = [("idle", [], 0), ("relayed", relay_ports, args.spectators)]
+        if args.direct:
+            phases.append(("direct", [host_port], args.spectators))
+        for label, ports, spectators in phases:
+            ok = run_phase(label, host, host_port, relays, ports, spectators, args.workers, args.guess_rate,
+                           args.seconds) and ok
+    finally:
+        for process in [host] + relays:
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
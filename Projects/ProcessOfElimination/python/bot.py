@@ -0,0 +1,124 @@
+"""Bot players: PoE_Client sessions whose guesses come from the solver
+
+Each bot is the UI of its own PoE_Client, so it goes through discovery,
+joining, codecs and reconnects exactly like a person would, and guesses
+whenever the meeting changes. Run several against a host for load tests:
+
+    python bot.py --host 127.0.0.1:5555 --bots 20 --word-list words.txt
+"""
+
+import argparse
+import threading
+import time
+
+from logic import PoE_Meeting, Transcript
+from solver import Solver
+from wordstore import open_word_store
+
+class PoE_Bot:
+    """UI stand-in that answers every display update with the solver's next guess"""
+    def __init__(self, solver, meeting=None, think_time=0.0, name="bot"):
+        self.solver = solver
+        self.meeting = meeting or PoE_Meeting()
+        self.think_time = think_time
+        self.name = name
+        self.network = None
+        self.candidates = None
+
+        # Letter sent but not yet reflected in the meeting, so updates for
+        # other players' guesses do not make the bot send it twice
+        self.pending = None
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.moves = 0
+        self.move_time = 0.0
+        self.meetings_won = 0
+        self.meetings_lost = 0
+        self.last_state = None
+
+    def join(self, host=None, port=5555, room=None, **client_options):
+        from network import PoE_Client
+        self.network = PoE_Client(self.meeting, self, host=host, port=port, room=room, **client_options)
+        return self.network.connect()
+
+    def update_display(self):
+        with self.lock:
+            state = self.meeting.state
+            if state != self.last_state:
+                self.last_state = state
+                if state == Transcript.WON:
+                    self.meetings_won += 1
+                elif state == Transcript.LOST:
+                    self.meetings_lost += 1
+            if state != Transcript.PLAYING:
+                self.pending = None
+                return
+
+            start = time.perf_counter()
+            letter, self.candidates = self.solver.play(self.meeting, self.candidates)
+            self.move_time += time.perf_counter() - start
+            self.moves += 1
+
+            if letter is None or letter == self.pending:
+                return
+            self.pending = letter
+
+        if self.think_time > 0:
+            timer = threading.Timer(self.think_time, self.guess, args=(letter,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.guess(letter)
+
+    def guess(self, letter):
+        if self.network and self.network.running:
+            self.network.propose_solution(letter.lower())
+
+    def show_message(self, title, message):
+        print(f"[{self.name}] {title}: {message}")
+
+    def stop(self):
+        if self.network:
+            self.network.disconnect()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", help="server address, host or host:port (default: discover one)")
+    parser.add_argument("--room", help="meeting to join (default: the host's default room)")
+    parser.add_argument("--bots", type=int, default=1)
+    parser.add_argument("--word-list", help="dictionary the host draws from; the default words otherwise")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="delay before each guess")
+    parser.add_argument("--duration", type=float, help="seconds to play before leaving (default: until Ctrl+C)")
+    args = parser.parse_args(argv)
+
+    # One solver, so every bot shares the same per-length tables
+    solver = Solver(open_word_store(args.word_list) if args.word_list else None)
+    bots = []
+    for number in range(args.bots):
+        bot = PoE_Bot(solver, think_time=args.think_ms / 1000, name=f"bot{number + 1}")
+        if not bot.join(args.host, room=args.room):
+            print(f"{bot.name} could not connect")
+            continue
+        bots.append(bot)
+    if not bots:
+        return 1
+
+    try:
+        deadline = time.monotonic() + args.duration if args.duration else None
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for bot in bots:
+            bot.stop()
+
+    moves = sum(bot.moves for bot in bots)
+    move_time = sum(bot.move_time for bot in bots)
+    print(f"{len(bots)} bots: {moves} moves, {move_time / max(moves, 1) * 1e6:.1f} us per move, "
+          f"{sum(bot.meetings_won for bot in bots)} won, {sum(bot.meetings_lost for bot in bots)} lost")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
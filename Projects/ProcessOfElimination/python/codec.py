@@ -0,0 +1,136 @@
+import json
+import struct
+
+from framing import encode_frame
+from logic import LetterSet
+
+# Wire formats a connection can use after the join handshake
+CODEC_JSON = "json"
+CODEC_BINARY = "binary"
+
+# Server preference order; JSON stays available for debugging with any client
+SUPPORTED_CODECS = [CODEC_BINARY, CODEC_JSON]
+
+# Binary message layouts; the leading type byte can never be '{', so every
+# frame says for itself whether it is binary or JSON
+MSG_MEETING_STATE = 1
+MSG_MEETING_DELTA = 2
+MSG_GUESS = 3
+MSG_SYNC = 4
+
+# type, seq, guessed letter mask, incorrect guesses, max incorrect, state, word length; word bytes follow
+STATE = struct.Struct("!BIIBBBH")
+# type, seq, mask of letters guessed in this delta, incorrect guesses, state
+DELTA = struct.Struct("!BIIBB")
+# type, letter
+GUESS = struct.Struct("!BB")
+SYNC = struct.Struct("!B")
+
+class CodecError(ValueError):
+    """A message that cannot be represented in, or decoded from, the binary format"""
+
+def letters_to_mask(letters):
+    """Pack uppercase A-Z letters into bits 0-25 of an integer"""
+    letter_set = LetterSet(letters)
+    if letter_set.extra:
+        raise CodecError(f"letters {sorted(letter_set.extra)} are outside A-Z")
+    return letter_set.mask
+
+def negotiate(offered, allowed=SUPPORTED_CODECS):
+    """First codec the client offered that the server allows; JSON if there is none"""
+    for codec in offered or []:
+        if codec in allowed:
+            return codec
+    return CODEC_JSON
+
+def encode_binary(message):
+    kind = message["type"]
+    try:
+        if kind == "meeting_state":
+            data = message["data"]
+            word = data["actual_word"].encode("utf-8")
+            header = STATE.pack(
+                MSG_MEETING_STATE,
+                message["seq"],
+                letters_to_mask(data["guessed_letters"]),
+                data["incorrect_guesses"],
+                data["max_incorrect"],
+                data["state"],
+                len(word),
+            )
+            return header + word
+        if kind == "meeting_delta":
+            data = message["data"]
+            return DELTA.pack(
+                MSG_MEETING_DELTA,
+                message["seq"],
+                letters_to_mask(data["letters"]),
+                data["incorrect_guesses"],
+                data["state"],
+            )
+        if kind == "guess":
+            return GUESS.pack(MSG_GUESS, ord(message["letter"].upper()))
+        if kind == "sync":
+            return SYNC.pack(MSG_SYNC)
+    except (struct.error, TypeError) as e:
+        raise CodecError(f"cannot pack {kind}: {e}") from e
+    raise CodecError(f"no binary form for {kind}")
+
+def decode_binary(payload):
+    kind = payload[0]
+    try:
+        if kind == MSG_MEETING_STATE:
+            _, seq, mask, incorrect, max_incorrect, state, length = STATE.unpack_from(payload)
+            word = payload[STATE.size:STATE.size + length].decode("utf-8")
+            return {
+                "type": "meeting_state",
+                "seq": seq,
+                "data": {
+                    "actual_word": word,
+                    "guessed_letters": LetterSet.from_mask(mask),
+                    "incorrect_guesses": incorrect,
+                    "max_incorrect": max_incorrect,
+                    "state": state,
+                },
+            }
+        if kind == MSG_MEETING_DELTA:
+            _, seq, mask, incorrect, state = DELTA.unpack(payload)
+            return {
+                "type": "meeting_delta",
+                "seq": seq,
+                "data": {"letters": LetterSet.from_mask(mask), "incorrect_guesses": incorrect, "state": state},
+            }
+        if kind == MSG_GUESS:
+            return {"type": "guess", "letter": chr(GUESS.unpack(payload)[1])}
+        if kind == MSG_SYNC:
+            return {"type": "sync"}
+    except (struct.error, UnicodeDecodeError) as e:
+        raise CodecError(f"malformed binary message: {e}") from e
+    raise CodecError(f"unknown binary message type {kind}")
+
+def encode_message(message, codec=CODEC_JSON):
+    """Payload bytes for a message; anything the binary form cannot hold is sent as JSON"""
+    if codec == CODEC_BINARY:
+        try:
+            return encode_binary(message)
+        except CodecError:
+            pass
+    return json.dumps(message).encode('utf-8')
+
+def decode_message(payload):
+    """Decode one frame payload in whichever format it was sent"""
+    if not payload or payload[0] == ord("{"):
+        return json.loads(payload.decode('utf-8'))
+    return decode_binary(payload)
+
+class EncodedMessage:
+    """A message framed at most once per codec, shared by every client that receives it"""
+    def __init__(self, message):
+        self.message = message
+        self.frames = {}
+
+    def frame(self, codec=CODEC_JSON):
+        frame = self.frames.get(codec)
+        if frame is None:
+            frame = self.frames[codec] = encode_frame(encode_message(self.message, codec))
+        return frame
@@ -0,0 +1,250 @@
+"""Difficulty scores and bands for the words in a WordStore
+
+Each word is scored from three properties:
+
+- unique letters: how many distinct letters must be found
+- letter frequency: how many words in the dictionary contain each of them,
+  as the mean surprisal (-log2 p) of the word's letters
+- misses under optimal guessing: wrong guesses made by a player who guesses
+  letters from most to least common until the word is solved
+
+The score is misses plus mean surprisal. Scores are split into equal-sized
+bands (easy/medium/hard), which become a "difficulty" index on the store so
+PoE_Meeting(words, {"difficulty": band}) picks a word in constant time.
+
+Scoring runs as one vectorized batch when numpy is installed, with a pure
+Python fallback, and the result is cached on disk keyed by the word file's
+hash so a dictionary is only scored once.
+"""
+
+import bisect
+import math
+import os
+import struct
+import time
+from array import array
+
+from logic import popcount
+from wordstore import MappedWordStore
+
+DIFFICULTY_BANDS = ["easy", "medium", "hard"]
+
+# Bump when the scoring changes so stale caches are ignored
+SCORING_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".poe_cache")
+
+# magic, scoring version, band count, word count; band bytes then native float32 scores follow
+CACHE_HEADER = struct.Struct("!7sBBI")
+CACHE_MAGIC = b"POEDIFF"
+
+# Bytes of the word file turned into letter masks per numpy batch
+MASK_CHUNK_SIZE = 1 << 24
+
+# Mask bit of every byte value; only A-Z have one (words are upper-cased first)
+LETTER_BITS = [1 << (value - ord("A")) if ord("A") <= value <= ord("Z") else 0 for value in range(256)]
+
+# numpy is optional; it is only imported when a dictionary is scored
+_numpy = None
+
+def load_numpy():
+    """Import numpy on first use; returns the module, or None if it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+def band_for(name):
+    """Band number for a name such as "hard"; numbers are passed through"""
+    if isinstance(name, int):
+        return name
+    return DIFFICULTY_BANDS.index(name.lower())
+
+class DifficultyIndex:
+    """Per-word scores and bands, plus where they came from and how long that took"""
+    def __init__(self, scores, bands, source, seconds):
+        self.scores = scores
+        self.bands = bands
+        self.source = source
+        self.seconds = seconds
+
+    def __len__(self):
+        return len(self.bands)
+
+def letter_masks(store, np=None):
+    """26-bit letter mask of every word (letters outside A-Z are ignored)"""
+    if np is not None and isinstance(store, MappedWordStore) and len(store):
+        return mapped_letter_masks(store, np)
+
+    if isinstance(store, MappedWordStore):
+        data = store.data
+        words = (data[start:end] for start, end in zip(store.starts, store.ends))
+    else:
+        words = (store.word(word_id).encode("utf-8") for word_id in range(len(store)))
+    # Summing the bits of the distinct upper-cased bytes is an OR without a per-letter loop
+    bit_of = LETTER_BITS.__getitem__
+    masks = array("I", (sum(map(bit_of, set(word.upper()))) for word in words))
+    return np.frombuffer(masks, dtype=np.uint32) if np is not None else masks
+
+def mapped_letter_masks(store, np):
+    """Letter masks straight from the mapped file bytes, a batch of words at a time"""
+    data = np.frombuffer(store.data, dtype=np.uint8)
+    starts = np.frombuffer(store.starts, dtype=np.uint32 if store.starts.itemsize == 4 else np.uint64)
+    ends = np.frombuffer(store.ends, dtype=starts.dtype)
+    masks = np.empty(len(starts), dtype=np.uint32)
+
+    first = 0
+    while first < len(starts):
+        # Grow the batch until it covers MASK_CHUNK_SIZE bytes
+        last = int(np.searchsorted(starts, starts[first] + MASK_CHUNK_SIZE, side="left"))
+        last = max(last, first + 1)
+        base = int(starts[first])
+        chunk = data[base:int(ends[last - 1])]
+
+        # Clearing bit 5 upper-cases ASCII letters; everything else lands outside A-Z
+        letters = (chunk & 0xDF).astype(np.int16) - ord("A")
+        bits = np.where((letters >= 0) & (letters < 26), np.left_shift(np.uint32(1), np.clip(letters, 0, 25).astype(np.uint32)), 0).astype(np.uint32)
+
+        # Zero bytes outside words (newlines, skipped lines) so they cannot leak into a neighbour
+        inside = np.zeros(len(chunk) + 1, dtype=np.int8)
+        inside[(starts[first:last] - base).astype(np.intp)] += 1
+        inside[(ends[first:last] - base).astype(np.intp)] -= 1
+        bits *= (np.cumsum(inside[:-1]) > 0)
+
+        masks[first:last] = np.bitwise_or.reduceat(bits, (starts[first:last] - base).astype(np.intp))
+        first = last
+    return masks
+
+def score_masks_numpy(masks, np):
+    count = max(len(masks), 1)
+    present = [((masks >> bit) & 1).astype(np.float32) for bit in range(26)]
+    frequency = [float(column.sum()) / count for column in present]
+    surprisal = [-math.log2(p) if p > 0 else 0.0 for p in frequency]
+    rank = {bit: position + 1 for position, bit in enumerate(sorted(range(26), key=lambda bit: -frequency[bit]))}
+
+    unique = np.zeros(len(masks), dtype=np.float32)
+    information = np.zeros(len(masks), dtype=np.float32)
+    rarest = np.zeros(len(masks), dtype=np.float32)
+    for bit in range(26):
+        unique += present[bit]
+        information += present[bit] * surprisal[bit]
+        np.maximum(rarest, present[bit] * rank[bit], out=rarest)
+
+    misses = rarest - unique
+    return misses + information / np.maximum(unique, 1)
+
+def byte_table(offset, per_letter, combine):
+    """Combined value of the letters set in every possible mask byte at bit offset"""
+    table = []
+    for value in range(256):
+        bits = [offset + bit for bit in range(8) if value >> bit & 1 and offset + bit < 26]
+        table.append(combine(per_letter[bit] for bit in bits) if bits else 0)
+    return table
+
+def score_masks_python(masks):
+    # Per-byte histograms give letter frequencies without visiting each letter of each word
+    histograms = [[0] * 256 for _ in range(4)]
+    for mask in masks:
+        histograms[0][mask & 0xFF] += 1
+        histograms[1][mask >> 8 & 0xFF] += 1
+        histograms[2][mask >> 16 & 0xFF] += 1
+        histograms[3][mask >> 24] += 1
+    counts = [sum(total for value, total in enumerate(histograms[bit // 8]) if value >> (bit % 8) & 1) for bit in range(26)]
+
+    count = max(len(masks), 1)
+    frequency = [letter_count / count for letter_count in counts]
+    surprisal = [-math.log2(p) if p > 0 else 0.0 for p in frequency]
+    rank = [0] * 26
+    for position, bit in enumerate(sorted(range(26), key=lambda bit: -frequency[bit])):
+        rank[bit] = position + 1
+
+    information = [byte_table(offset, surprisal, sum) for offset in (0, 8, 16, 24)]
+    rarest = [byte_table(offset, rank, max) for offset in (0, 8, 16, 24)]
+
+    scores = array("f")
+    for mask in masks:
+        unique = popcount(mask)
+        if not unique:
+            scores.append(0.0)
+            continue
+        b0, b1, b2, b3 = mask & 0xFF, mask >> 8 & 0xFF, mask >> 16 & 0xFF, mask >> 24
+        misses = max(rarest[0][b0], rarest[1][b1], rarest[2][b2], rarest[3][b3]) - unique
+        scores.append(misses + (information[0][b0] + information[1][b1] + information[2][b2] + information[3][b3]) / unique)
+    return scores
+
+def split_bands(scores, band_count, np=None):
+    """Band of every score, with bands holding roughly equal numbers of words"""
+    if np is not None:
+        if not len(scores):
+            return np.zeros(0, dtype=np.uint8)
+        thresholds = np.quantile(scores, [band / band_count for band in range(1, band_count)])
+        return np.searchsorted(thresholds, scores, side="right").astype(np.uint8)
+
+    ordered = sorted(scores)
+    thresholds = [ordered[len(ordered) * band // band_count] for band in range(1, band_count)]
+    return array("B", (bisect.bisect_right(thresholds, score) for score in scores))
+
+def cache_path(store, cache_dir):
+    return os.path.join(cache_dir, f"difficulty-{store.fingerprint()}.bin")
+
+def load_cached(path, word_count, band_count):
+    try:
+        with open(path, "rb") as cache_file:
+            magic, version, bands_in_file, count = CACHE_HEADER.unpack(cache_file.read(CACHE_HEADER.size))
+            if (magic, version, bands_in_file, count) != (CACHE_MAGIC, SCORING_VERSION, band_count, word_count):
+                return None
+            bands = array("B")
+            bands.frombytes(cache_file.read(count))
+            scores = array("f")
+            scores.frombytes(cache_file.read(count * scores.itemsize))
+    except (OSError, struct.error, ValueError):
+        return None
+    if len(bands) != word_count or len(scores) != word_count:
+        return None
+    return scores, bands
+
+def save_cached(path, scores, bands, band_count):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(CACHE_HEADER.pack(CACHE_MAGIC, SCORING_VERSION, band_count, len(bands)))
+            cache_file.write(bytes(bands))
+            # numpy arrays and array('f') both write native-order float32
+            cache_file.write(scores.astype("float32").tobytes() if hasattr(scores, "astype") else scores.tobytes())
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Could not save difficulty cache: {e}")
+
+def build_difficulty_index(store, cache_dir=DEFAULT_CACHE_DIR, band_count=len(DIFFICULTY_BANDS), use_numpy=True):
+    """Score every word in the store and register the "difficulty" index on it
+
+    Scores come from the disk cache when the word file is unchanged; pass
+    cache_dir=None to always recompute.
+    """
+    start = time.perf_counter()
+    path = cache_path(store, cache_dir) if cache_dir else None
+    cached = load_cached(path, len(store), band_count) if path else None
+
+    if cached:
+        scores, bands = cached
+        source = "cache"
+    else:
+        np = load_numpy() if use_numpy else None
+        masks = letter_masks(store, np)
+        if np is not None:
+            scores = score_masks_numpy(masks, np)
+            source = "numpy"
+        else:
+            scores = score_masks_python(masks)
+            source = "python"
+        bands = split_bands(scores, band_count, np)
+        if path:
+            save_cached(path, scores, bands, band_count)
+
+    store.add_index("difficulty", bands.tolist() if hasattr(bands, "astype") else bands)
+    return DifficultyIndex(scores, bands, source, time.perf_counter() - start)
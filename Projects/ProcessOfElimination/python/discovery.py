@@ -0,0 +1,613 @@
+import json
+import os
+import selectors
+import socket
+import threading
+import time
+
+# zeroconf is optional and slow to import, so it is only loaded when discovery needs it
+_zeroconf = None
+
+def load_zeroconf():
+    """Import zeroconf on first use; returns the module, or None if it is not installed"""
+    global _zeroconf
+    if _zeroconf is None:
+        try:
+            import zeroconf
+            _zeroconf = zeroconf
+        except ImportError:
+            print("Zeroconf not available; service discovery will not work")
+            _zeroconf = False
+    return _zeroconf or None
+
+# Constants for networking modes
+class NetworkMode:
+    ZEROCONF = "zeroconf"
+    UDP_BROADCAST = "udp_broadcast"
+    DIRECT = "direct"
+
+# Ports a host is likely to be listening on; mirrors PoE_Server.find_available_port
+COMMON_PORTS = [8080, 80, 443, 5000, 5555]
+
+SERVICE_TYPE = "_poe._tcp.local."
+UDP_DISCOVERY_PORT = 5556
+UDP_DISCOVERY_REQUEST = b"DISCOVER_PROCESS_OF_ELIMINATION_SERVER"
+
+# Overall budget for one discovery run, and for each individual TCP connect
+DEFAULT_DISCOVERY_TIMEOUT = 5.0
+DEFAULT_CONNECT_TIMEOUT = 2.0
+
+# How often blocking waits wake up to check for cancellation
+POLL_INTERVAL = 0.05
+
+# A UDP request or reply can be lost, so the request is broadcast this many times, this far apart
+UDP_REQUEST_ATTEMPTS = 3
+UDP_RETRY_INTERVAL = 0.5
+
+# Servers that answered recently, remembered across runs so repeat joins skip discovery
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".poe_discovery_cache.json")
+DEFAULT_CACHE_TTL = 600.0
+MAX_CACHED_PROBES = 3
+
+# Entries verified this recently are not probed again by a refresh
+REFRESH_MIN_AGE = 30.0
+
+# Time cached endpoints get to answer before the slower discovery methods start
+CACHE_HEAD_START = 0.25
+
+# Requests a responder reads per wakeup before replying to the batch
+RESPONDER_BATCH_SIZE = 256
+
+# How often the responder wakes up to notice stop() when no requests arrive
+RESPONDER_POLL_INTERVAL = 0.5
+
+# How often an idle responder re-resolves the host's address in case the network changed
+INTERFACE_CHECK_INTERVAL = 30.0
+
+class DiscoveryListener:
+    """Listener for Zeroconf service discovery (implements zeroconf's ServiceListener interface)"""
+    def __init__(self):
+        self.services = {}
+        self.event = threading.Event()
+    
+    def add_service(self, zeroconf, service_type, name):
+        info = zeroconf.get_service_info(service_type, name)
+        if info:
+            self.services[name] = info
+            self.event.set()
+    
+    def update_service(self, zeroconf, service_type, name):
+        self.add_service(zeroconf, service_type, name)
+    
+    def remove_service(self, zeroconf, service_type, name):
+        if name in self.services:
+            del self.services[name]
+
+class DiscoveryResult:
+    """A server that answered, with the connected socket that reached it"""
+    def __init__(self, method, host, port, latency, sock=None, rtt=None):
+        self.method = method
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.sock = sock
+        # Time the TCP handshake itself took, as opposed to the whole search
+        self.rtt = rtt
+
+    def __repr__(self):
+        return f"DiscoveryResult({self.method}, {self.host}:{self.port}, {self.latency * 1000:.1f} ms)"
+
+class DiscoveryCache:
+    """Recently verified server endpoints with their RTT, persisted as JSON
+
+    Entries expire ttl seconds after they were last verified. Reads and writes
+    are best-effort: a missing or corrupt file just means an empty cache.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.refresh_thread = None
+        self.entries = self.load()
+
+    @staticmethod
+    def key(host, port):
+        return f"{host}:{port}"
+
+    def load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                entries = json.load(cache_file)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = json.dumps(self.entries)
+        try:
+            # Write then rename so a crash never leaves a half-written cache
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                cache_file.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save discovery cache: {e}")
+
+    def fresh(self, host=None, now=None):
+        """Unexpired entries, optionally only for one host, fastest first"""
+        now = time.time() if now is None else now
+        with self.lock:
+            entries = [
+                entry for entry in self.entries.values()
+                if now - entry["verified_at"] < self.ttl and (host is None or entry["host"] == host)
+            ]
+        return sorted(entries, key=lambda entry: entry["rtt"])
+
+    def record(self, host, port, rtt, method=None, now=None):
+        """Remember an endpoint that just accepted a connection"""
+        with self.lock:
+            key = self.key(host, port)
+            previous = self.entries.get(key, {})
+            self.entries[key] = {
+                "host": host,
+                "port": port,
+                "rtt": rtt,
+                "method": method or previous.get("method", NetworkMode.DIRECT),
+                "verified_at": time.time() if now is None else now,
+            }
+
+    def forget(self, host, port):
+        with self.lock:
+            self.entries.pop(self.key(host, port), None)
+
+    def prune(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if now - entry["verified_at"] >= self.ttl]:
+                del self.entries[key]
+
+    def refresh(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, skip=None, min_age=REFRESH_MIN_AGE):
+        """Re-verify entries: update RTTs, drop endpoints that stopped answering
+
+        The (host, port) in skip, e.g. the server just joined, and entries
+        verified in the last min_age seconds are left alone, so a join does
+        not open a second, throwaway connection to the server it joined.
+        """
+        self.prune()
+        now = time.time()
+        for entry in self.fresh(now=now):
+            if (entry["host"], entry["port"]) == skip or now - entry["verified_at"] < min_age:
+                continue
+            start = time.perf_counter()
+            try:
+                sock = socket.create_connection((entry["host"], entry["port"]), timeout=connect_timeout)
+            except OSError:
+                self.forget(entry["host"], entry["port"])
+                continue
+            rtt = time.perf_counter() - start
+            sock.close()
+            self.record(entry["host"], entry["port"], rtt)
+        self.save()
+
+    def refresh_in_background(self, skip=None):
+        """Start a refresh unless one is already running"""
+        if self.refresh_thread and self.refresh_thread.is_alive():
+            return
+        self.refresh_thread = threading.Thread(target=self.refresh, kwargs={"skip": skip})
+        self.refresh_thread.daemon = True
+        self.refresh_thread.start()
+
+def local_address():
+    """Hostname and the address it resolves to, as advertised in discovery replies"""
+    hostname = socket.gethostname()
+    return hostname, socket.gethostbyname(hostname)
+
+class DiscoveryResponder:
+    """Answers UDP discovery broadcasts for one server
+    
+    The reply never changes between requests, so it is encoded once and only
+    rebuilt when the server's port or name changes (update) or the host's
+    address does; the address is re-resolved when the socket has been idle
+    for INTERFACE_CHECK_INTERVAL seconds, never while answering. The socket
+    is non-blocking: each wakeup drains up to RESPONDER_BATCH_SIZE queued
+    requests and answers every distinct sender once.
+    """
+    def __init__(self, port, name, udp_port=UDP_DISCOVERY_PORT, bind_host='0.0.0.0'):
+        self.port = port
+        self.name = name
+        self.udp_port = udp_port
+        self.bind_host = bind_host
+        self.sock = None
+        self.running = False
+        self.thread = None
+        
+        self.response = None
+        self.address = None
+        self.checked_at = 0.0
+        
+        # Metrics
+        self.requests = 0
+        self.replies = 0
+        self.batches = 0
+        self.ignored = 0
+        self.dropped = 0
+    
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self.sock.bind((self.bind_host, self.udp_port))
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            self.sock = None
+            raise
+        # Resolve now so the first request is answered from the cache
+        self.refresh()
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def update(self, port=None, name=None):
+        """Change what is advertised; the reply is rebuilt for the next request"""
+        if port is not None:
+            self.port = port
+        if name is not None:
+            self.name = name
+        self.response = None
+    
+    def refresh(self):
+        """Re-resolve the host's address; rebuilds the reply only if it changed"""
+        self.checked_at = time.monotonic()
+        try:
+            address = local_address()
+        except OSError:
+            return
+        if address != self.address:
+            self.address = address
+            self.response = None
+    
+    def reply(self):
+        response = self.response
+        if response is None:
+            response = self.response = json.dumps({
+                "type": "server_info",
+                "host": self.address[1] if self.address else "127.0.0.1",
+                "port": self.port,
+                "name": self.name
+            }).encode('utf-8')
+        return response
+    
+    def run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self.sock, selectors.EVENT_READ)
+        try:
+            while self.running:
+                if not selector.select(timeout=RESPONDER_POLL_INTERVAL):
+                    if time.monotonic() - self.checked_at >= INTERFACE_CHECK_INTERVAL:
+                        self.refresh()
+                    continue
+                self.handle_batch()
+        except (OSError, ValueError) as e:
+            # The socket was closed by stop()
+            if self.running:
+                print(f"UDP discovery responder stopped: {e}")
+        finally:
+            selector.close()
+    
+    def handle_batch(self):
+        """Read every queued request (up to a batch) and answer each sender once"""
+        senders = {}
+        for _ in range(RESPONDER_BATCH_SIZE):
+            try:
+                data, addr = self.sock.recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                # Windows reports an earlier reply that could not be delivered here
+                continue
+            self.requests += 1
+            if data == UDP_DISCOVERY_REQUEST:
+                senders[addr] = None
+            else:
+                self.ignored += 1
+        
+        if not senders:
+            return
+        self.batches += 1
+        response = self.reply()
+        for addr in senders:
+            try:
+                self.sock.sendto(response, addr)
+                self.replies += 1
+            except (BlockingIOError, InterruptedError):
+                # Send buffer full; the client asks again after UDP_RETRY_INTERVAL
+                self.dropped += 1
+            except OSError as e:
+                print(f"Could not answer discovery request from {addr}: {e}")
+    
+    def metrics(self):
+        return {
+            "requests": self.requests,
+            "replies": self.replies,
+            "batches": self.batches,
+            "ignored": self.ignored,
+            "dropped": self.dropped,
+        }
+    
+    def close(self):
+        self.running = False
+        if self.sock:
+            self.sock.close()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1)
+
+class DiscoveryEngine:
+    """Race every way of finding a server and keep the first one that connects
+
+    Direct probes of the given host, Zeroconf browsing and UDP broadcast all
+    start at once (happy-eyeballs style). A method only wins once it holds a
+    connected TCP socket, so a stale advertisement never beats a live server.
+    As soon as one wins the rest are cancelled and any late sockets are closed.
+    Each method's outcome and latency is kept in .report for tuning.
+
+    With a DiscoveryCache, recently verified endpoints are probed first and
+    the other methods only start if none of them answers within
+    CACHE_HEAD_START, so a repeat join costs one round trip. Likewise the
+    common ports are only probed once the requested port has failed or had
+    the same head start, so another service listening on one of them does
+    not beat a server on the port that was asked for.
+    """
+    def __init__(self, host=None, port=None, probe_ports=COMMON_PORTS, zeroconf=True, udp=True,
+                 timeout=DEFAULT_DISCOVERY_TIMEOUT, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 service_type=SERVICE_TYPE, udp_port=UDP_DISCOVERY_PORT, cache=None,
+                 head_start=CACHE_HEAD_START):
+        self.host = host
+        self.port = port
+        self.probe_ports = probe_ports
+        self.use_zeroconf = zeroconf
+        self.use_udp = udp
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.service_type = service_type
+        self.udp_port = udp_port
+        self.cache = cache
+        self.head_start = head_start
+
+        # Set once the cached endpoints have all failed, or there were none
+        self.fallback = threading.Event()
+        self.cached_pending = 0
+
+        # Set once the requested port has failed
+        self.port_fallback = threading.Event()
+
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.winner = None
+        self.pending = 0
+        self.started = None
+
+        # method -> {"status": won/found/failed/timeout/cancelled, "latency": seconds or None}
+        self.report = {}
+
+    def cached_probes(self):
+        entries = self.cache.fresh(self.host)[:MAX_CACHED_PROBES] if self.cache else []
+        return [(f"cache:{entry['host']}:{entry['port']}", self.connect, (entry["host"], entry["port"]))
+                for entry in entries]
+
+    def direct_probes(self, cached):
+        """Direct probes of the requested port and of the common ports, as two lists
+
+        Endpoints already cached are skipped.
+        """
+        if not self.host:
+            return [], []
+        skip = {args for _, _, args in cached}
+        probes = [(f"{NetworkMode.DIRECT}:{port}", self.connect, (self.host, port))
+                  for port in [self.port] + [port for port in self.probe_ports if port != self.port]
+                  if port and (self.host, port) not in skip]
+        if probes and probes[0][2] == (self.host, self.port):
+            return probes[:1], probes[1:]
+        return [], probes
+
+    def search_probes(self):
+        """Methods that have to find a server before they can connect to it"""
+        probes = []
+        if self.use_zeroconf:
+            probes.append((NetworkMode.ZEROCONF, self.browse_zeroconf, ()))
+        if self.use_udp:
+            probes.append((NetworkMode.UDP_BROADCAST, self.broadcast_udp, ()))
+        return probes
+
+    def run(self):
+        """Run all methods concurrently; returns the winning DiscoveryResult or None"""
+        self.started = time.perf_counter()
+        cached = self.cached_probes()
+        requested, common = self.direct_probes(cached)
+        direct = requested + common
+        search = self.search_probes()
+        self.pending = len(cached) + len(direct) + len(search)
+        self.cached_pending = len(cached)
+        if not cached:
+            self.fallback.set()
+        if not self.pending:
+            return None
+
+        for method, _, _ in cached + direct + search:
+            self.report[method] = {"status": "pending", "latency": None}
+
+        # Connecting to a known address is cheap; searching the network waits for the cache,
+        # and guessing at common ports waits for the port that was asked for
+        for method, target, args in cached + requested:
+            self.start_method(method, target, args)
+        for method, target, args in common:
+            self.start_method(method, target, args, after=self.port_fallback if requested else self.fallback)
+        for method, target, args in search:
+            self.start_method(method, target, args, after=self.fallback)
+
+        self.done.wait(timeout=self.head_start + self.timeout + self.connect_timeout)
+        self.cancel()
+
+        with self.lock:
+            # Methods still running were either beaten or ran out of time
+            for method, entry in self.report.items():
+                if entry["status"] == "pending":
+                    entry["status"] = "cancelled" if self.winner else "timeout"
+            winner = self.winner
+
+        self.update_cache(cached, winner)
+        return winner
+
+    def update_cache(self, cached, winner):
+        """Remember the winner and drop cached endpoints that refused us"""
+        if not self.cache:
+            return
+        for method, _, (host, port) in cached:
+            if self.report[method]["status"] == "failed":
+                self.cache.forget(host, port)
+        if winner:
+            # A cached win keeps the method that originally found the server
+            method = winner.method.split(":")[0]
+            self.cache.record(winner.host, winner.port, winner.rtt, None if method == "cache" else method)
+        self.cache.save()
+
+    def start_method(self, method, target, args, after=None):
+        thread = threading.Thread(target=self.run_method, args=(method, target, args, after))
+        thread.daemon = True
+        thread.start()
+
+    def cancel(self):
+        """Stop every method still running; late successes close their sockets"""
+        self.cancelled.set()
+        self.fallback.set()
+        self.port_fallback.set()
+        self.done.set()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def run_method(self, method, target, args, after=None):
+        try:
+            # Give the methods this one waits for their head start; their win cancels it outright
+            if after is not None:
+                after.wait(timeout=self.head_start)
+            result = None if self.cancelled.is_set() else target(method, *args)
+        except Exception as e:
+            print(f"Discovery via {method} failed: {e}")
+            result = None
+
+        with self.lock:
+            entry = self.report[method]
+            if result is None:
+                entry["status"] = "cancelled" if self.cancelled.is_set() else "failed"
+            elif self.winner is None and not self.cancelled.is_set():
+                self.winner = result
+                entry.update(status="won", latency=result.latency)
+                self.cancelled.set()
+                self.fallback.set()
+                self.port_fallback.set()
+            else:
+                # Lost the race; the connection is not needed
+                entry.update(status="found", latency=result.latency)
+                result.sock.close()
+
+            if method.startswith("cache:"):
+                self.cached_pending -= 1
+                if self.cached_pending <= 0:
+                    self.fallback.set()
+            elif method == f"{NetworkMode.DIRECT}:{self.port}":
+                self.port_fallback.set()
+
+            self.pending -= 1
+            if self.winner is not None or self.pending == 0:
+                self.done.set()
+
+    def connect(self, method, host, port):
+        """Open a TCP connection unless discovery has already been won"""
+        if self.cancelled.is_set():
+            return None
+        start = time.perf_counter()
+        try:
+            sock = socket.create_connection((host, port), timeout=self.connect_timeout)
+        except OSError:
+            return None
+        sock.settimeout(None)
+        return DiscoveryResult(method, host, port, self.elapsed(), sock, rtt=time.perf_counter() - start)
+
+    def browse_zeroconf(self, method):
+        """Browse for the service type and connect to the first advertised address"""
+        zeroconf = load_zeroconf()
+        if not zeroconf:
+            return None
+
+        instance = zeroconf.Zeroconf()
+        try:
+            listener = DiscoveryListener()
+            browser = zeroconf.ServiceBrowser(instance, self.service_type, listener)
+            try:
+                deadline = time.monotonic() + self.timeout
+                while not self.cancelled.is_set() and time.monotonic() < deadline:
+                    if listener.event.wait(timeout=POLL_INTERVAL):
+                        break
+
+                for info in list(listener.services.values()):
+                    if info.addresses:
+                        result = self.connect(method, socket.inet_ntoa(info.addresses[0]), info.port)
+                        if result:
+                            return result
+                return None
+            finally:
+                browser.cancel()
+        finally:
+            instance.close()
+
+    def broadcast_udp(self, method):
+        """Broadcast a discovery request and connect to the first server that answers
+
+        The request is repeated up to UDP_REQUEST_ATTEMPTS times in case it or
+        the reply was dropped.
+        """
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            udp_socket.settimeout(POLL_INTERVAL)
+
+            attempts = 0
+            next_request = time.monotonic()
+            deadline = next_request + self.timeout
+            while not self.cancelled.is_set() and time.monotonic() < deadline:
+                if attempts < UDP_REQUEST_ATTEMPTS and time.monotonic() >= next_request:
+                    udp_socket.sendto(UDP_DISCOVERY_REQUEST, ('<broadcast>', self.udp_port))
+                    attempts += 1
+                    next_request += UDP_RETRY_INTERVAL
+                try:
+                    data, addr = udp_socket.recvfrom(1024)
+                    response = json.loads(data.decode('utf-8'))
+                except socket.timeout:
+                    continue
+                except ValueError:
+                    continue
+
+                if response.get("type") == "server_info":
+                    result = self.connect(method, response["host"], response["port"])
+                    if result:
+                        return result
+            return None
+        finally:
+            udp_socket.close()
+
+    def summary(self):
+        """One line per method: outcome and latency in milliseconds"""
+        lines = []
+        for method, entry in sorted(self.report.items()):
+            latency = f"{entry['latency'] * 1000:.1f} ms" if entry["latency"] is not None else "-"
+            lines.append(f"{method}: {entry['status']} ({latency})")
+        return lines
@@ -0,0 +1,416 @@
+"""Append-only binary log of meeting events, with replay and crash recovery
+
+Every pose_problem, start_meeting and propose_solution on a journaled
+PoE_Meeting is appended as one record: event type, wall-clock timestamp,
+room, the client that caused it, and the word or letter involved. Rooms also
+write a snapshot of their whole meeting state when they are opened, every
+SNAPSHOT_INTERVAL events and when the server stops, and the offset of each
+room's latest snapshot is kept in a small index file next to the log.
+
+Recovery reads the index, seeks to the oldest snapshot it names, and replays
+only the tail after it. Replaying from the start instead reconstructs any
+room at any point in the log, which is what the command line tool does:
+
+    python eventlog.py meetings.poelog --room default --until 2024-05-01T12:00
+"""
+
+import argparse
+import datetime
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+from logic import PoE_Meeting, Transcript
+
+# Written once at the start of the file: magic, format version
+FILE_HEADER = struct.Struct("!6sB")
+FILE_MAGIC = b"POELOG"
+FORMAT_VERSION = 1
+
+# Event type, timestamp, room length, client length, payload length; the
+# room, client and payload bytes follow, then a CRC-32 of the whole record
+RECORD = struct.Struct("!BdBBH")
+CHECKSUM = struct.Struct("!I")
+
+EVENT_POSE = 1
+EVENT_START = 2
+EVENT_GUESS = 3
+EVENT_SNAPSHOT = 4
+EVENT_CLOSE = 5
+
+EVENT_NAMES = {
+    EVENT_POSE: "pose",
+    EVENT_START: "start",
+    EVENT_GUESS: "guess",
+    EVENT_SNAPSHOT: "snapshot",
+    EVENT_CLOSE: "close",
+}
+
+# Seconds between writes of buffered records, and between fsyncs
+DEFAULT_FLUSH_INTERVAL = 0.05
+DEFAULT_FSYNC_INTERVAL = 1.0
+
+# Events a room logs between snapshots; bounds how much recovery replays
+SNAPSHOT_INTERVAL = 256
+
+class LogRecord:
+    __slots__ = ("offset", "kind", "timestamp", "room", "client", "payload")
+
+    def __init__(self, offset, kind, timestamp, room, client, payload):
+        self.offset = offset
+        self.kind = kind
+        self.timestamp = timestamp
+        self.room = room
+        self.client = client
+        self.payload = payload
+
+    def __repr__(self):
+        when = datetime.datetime.fromtimestamp(self.timestamp).isoformat(timespec="milliseconds")
+        return f"{when} {self.room} {EVENT_NAMES.get(self.kind, self.kind)} {self.client or '-'} {self.payload}"
+
+def encode_record(kind, timestamp, room, client, payload):
+    room = room.encode("utf-8")[:255]
+    client = (client or "").encode("utf-8")[:255]
+    payload = payload.encode("utf-8")
+    record = RECORD.pack(kind, timestamp, len(room), len(client), len(payload)) + room + client + payload
+    return record + CHECKSUM.pack(zlib.crc32(record))
+
+def read_records(log_file, offset=None):
+    """Yield LogRecords from the file position (or offset) to the last intact record
+
+    Iteration stops at a truncated or corrupt record, which is what a crash
+    in the middle of a write leaves behind; log_file.tell() is then the end
+    of the good data.
+    """
+    if offset is not None:
+        log_file.seek(offset)
+    while True:
+        start = log_file.tell()
+        header = log_file.read(RECORD.size)
+        if len(header) < RECORD.size:
+            log_file.seek(start)
+            return
+        kind, timestamp, room_length, client_length, payload_length = RECORD.unpack(header)
+        body_length = room_length + client_length + payload_length
+        body = log_file.read(body_length + CHECKSUM.size)
+        if len(body) < body_length + CHECKSUM.size \
+                or CHECKSUM.unpack(body[body_length:])[0] != zlib.crc32(header + body[:body_length]):
+            log_file.seek(start)
+            return
+        try:
+            room = body[:room_length].decode("utf-8")
+            client = body[room_length:room_length + client_length].decode("utf-8") or None
+            payload = body[room_length + client_length:body_length].decode("utf-8")
+        except UnicodeDecodeError:
+            log_file.seek(start)
+            return
+        yield LogRecord(start, kind, timestamp, room, client, payload)
+
+def meeting_state(meeting):
+    """Snapshot payload for a meeting"""
+    return json.dumps({
+        "word": meeting.word,
+        "guessed_letters": list(meeting.guessed_letters.letters()),
+        "incorrect_guesses": meeting.incorrect_guesses,
+        "max_incorrect": meeting.max_incorrect,
+        "state": meeting.state.value,
+    })
+
+def apply_record(meeting, record):
+    """Repeat a logged event on a meeting; the meeting must not be journaled"""
+    if record.kind == EVENT_POSE:
+        meeting.pose_problem(record.payload)
+    elif record.kind == EVENT_START:
+        meeting.start_meeting()
+    elif record.kind == EVENT_GUESS:
+        meeting.propose_solution(record.payload)
+    elif record.kind == EVENT_SNAPSHOT:
+        state = json.loads(record.payload)
+        meeting.restore(state["word"], state["guessed_letters"], state["incorrect_guesses"],
+                        Transcript(state["state"]))
+        meeting.max_incorrect = state["max_incorrect"]
+
+class RoomJournal:
+    """What a PoE_Meeting calls to log its events for one room"""
+    def __init__(self, log, room_id, meeting):
+        self.log = log
+        self.room_id = room_id
+        self.meeting = meeting
+        self.events = 0
+
+    def pose(self, word):
+        self.record(EVENT_POSE, word)
+
+    def start(self):
+        self.record(EVENT_START)
+
+    def guess(self, letter, client=None):
+        self.record(EVENT_GUESS, letter, client)
+
+    def record(self, kind, payload="", client=None):
+        self.log.append(kind, self.room_id, payload, client)
+        self.events += 1
+        if self.events >= SNAPSHOT_INTERVAL:
+            self.snapshot()
+
+    def snapshot(self):
+        self.log.snapshot(self.room_id, self.meeting)
+        self.events = 0
+
+    def close(self):
+        """The room is gone; recovery should not bring it back"""
+        self.log.close_room(self.room_id)
+
+class EventLog:
+    """Buffered writer for the event log file, plus its snapshot index
+
+    append() only adds the record to an in-memory buffer. A writer thread
+    writes the buffer every flush_interval seconds and fsyncs at most every
+    fsync_interval seconds, so a burst of guesses costs one write and one
+    fsync rather than one per event. On a crash, at most the last
+    fsync_interval seconds of events are lost.
+    """
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL, fsync_interval=DEFAULT_FSYNC_INTERVAL):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.file = None
+
+        self.buffer = bytearray()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+
+        # Logical end of the log, counting records still in the buffer
+        self.offset = 0
+
+        # Room id -> offset of its latest snapshot, counting snapshots still in the buffer
+        self.snapshots = {}
+        self.index_dirty = False
+
+        # The snapshot offsets as of the last write; saved to the index once it is fsynced
+        self.written_index = None
+
+        # Written to the file but not yet fsynced
+        self.unsynced = False
+
+        # Metrics
+        self.records = 0
+        self.writes = 0
+        self.fsyncs = 0
+        self.last_fsync = time.monotonic()
+
+    def recover(self, meeting_factory=PoE_Meeting):
+        """Rebuild every open room's meeting from the log; returns {room_id: meeting}
+
+        Starts from the oldest snapshot in the index and replays the tail.
+        A torn record at the end of the file is cut off so appends continue
+        from intact data. Call before start().
+        """
+        if not os.path.exists(self.path):
+            return {}
+
+        index = self.load_index()
+        meetings = {}
+        with open(self.path, "rb+") as log_file:
+            if not self.check_header(log_file):
+                raise ValueError(f"{self.path} is not a meeting event log")
+            data_start = log_file.tell()
+            size = os.fstat(log_file.fileno()).st_size
+            if index and all(data_start <= offset < size for offset in index.values()):
+                start = min(index.values())
+            else:
+                # No usable index; the whole log is the tail
+                index = {}
+                start = data_start
+
+            for record in read_records(log_file, start):
+                if record.offset < index.get(record.room, 0):
+                    # Superseded by the room's own later snapshot
+                    continue
+                if record.kind == EVENT_CLOSE:
+                    meetings.pop(record.room, None)
+                    self.snapshots.pop(record.room, None)
+                    continue
+                meeting = meetings.get(record.room)
+                if meeting is None:
+                    meeting = meetings[record.room] = meeting_factory()
+                apply_record(meeting, record)
+                if record.kind == EVENT_SNAPSHOT:
+                    self.snapshots[record.room] = record.offset
+
+            end = log_file.tell()
+            if end < size:
+                print(f"Event log: discarding {size - end} bytes of incomplete records")
+                log_file.truncate(end)
+        return meetings
+
+    def check_header(self, log_file):
+        header = log_file.read(FILE_HEADER.size)
+        return len(header) == FILE_HEADER.size and FILE_HEADER.unpack(header) == (FILE_MAGIC, FORMAT_VERSION)
+
+    def load_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as index_file:
+                return {room: int(offset) for room, offset in json.load(index_file).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def save_index(self, index):
+        data = json.dumps(index)
+        try:
+            # Write then rename so a crash never leaves a half-written index
+            temp_path = f"{self.index_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as index_file:
+                index_file.write(data)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            print(f"Could not save event log index: {e}")
+
+    def start(self):
+        self.file = open(self.path, "ab")
+        self.offset = self.file.seek(0, os.SEEK_END)
+        if self.offset == 0:
+            self.buffer += FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION)
+            self.offset = FILE_HEADER.size
+
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def journal(self, room_id, meeting):
+        """Attach a journal for a room to its meeting, starting with a snapshot"""
+        journal = RoomJournal(self, room_id, meeting)
+        meeting.journal = journal
+        journal.snapshot()
+        return journal
+
+    def append(self, kind, room_id, payload="", client=None):
+        record = encode_record(kind, time.time(), room_id, client, payload)
+        with self.lock:
+            offset = self.offset
+            self.buffer += record
+            self.offset += len(record)
+            self.records += 1
+        self.wakeup.set()
+        return offset
+
+    def snapshot(self, room_id, meeting):
+        offset = self.append(EVENT_SNAPSHOT, room_id, meeting_state(meeting))
+        with self.lock:
+            self.snapshots[room_id] = offset
+            self.index_dirty = True
+
+    def close_room(self, room_id):
+        self.append(EVENT_CLOSE, room_id)
+        with self.lock:
+            self.snapshots.pop(room_id, None)
+            self.index_dirty = True
+
+    def run(self):
+        while self.running:
+            # Sleep until there is something to write, or until written data is due an fsync
+            pending_sync = self.unsynced or self.written_index is not None
+            woke = self.wakeup.wait(self.fsync_interval if pending_sync else None)
+            if not self.running:
+                return
+            if woke:
+                # Let more records join this write
+                time.sleep(self.flush_interval)
+                self.wakeup.clear()
+            self.flush(fsync=time.monotonic() - self.last_fsync >= self.fsync_interval)
+
+    def flush(self, fsync=True):
+        with self.lock:
+            data, self.buffer = self.buffer, bytearray()
+            # Taken with the buffer, so every snapshot it names is in this write or an earlier one
+            index = dict(self.snapshots) if self.index_dirty else None
+            self.index_dirty = False
+        if data:
+            try:
+                self.file.write(data)
+                self.file.flush()
+                self.writes += 1
+                self.unsynced = True
+            except (OSError, ValueError) as e:
+                print(f"Could not write event log: {e}")
+                return
+        if index is not None:
+            self.written_index = index
+        if fsync and (self.unsynced or self.written_index is not None):
+            os.fsync(self.file.fileno())
+            self.fsyncs += 1
+            self.last_fsync = time.monotonic()
+            self.unsynced = False
+            # The index only ever points at records that are already on disk
+            if self.written_index is not None:
+                self.save_index(self.written_index)
+                self.written_index = None
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+        if self.file:
+            self.flush(fsync=True)
+            self.file.close()
+            self.file = None
+
+def replay(path, room=None, until=None, limit=None, on_record=None):
+    """Meetings as they stood after the logged events up to `until` (a timestamp) or `limit` records
+
+    Returns {room_id: PoE_Meeting}; rooms that were closed are left out.
+    on_record(record) is called for every record applied.
+    """
+    meetings = {}
+    with open(path, "rb") as log_file:
+        header = log_file.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (FILE_MAGIC, FORMAT_VERSION):
+            raise ValueError(f"{path} is not a meeting event log")
+        for count, record in enumerate(read_records(log_file)):
+            if (limit is not None and count >= limit) or (until is not None and record.timestamp > until):
+                break
+            if room is not None and record.room != room:
+                continue
+            if on_record:
+                on_record(record)
+            if record.kind == EVENT_CLOSE:
+                meetings.pop(record.room, None)
+                continue
+            meeting = meetings.get(record.room)
+            if meeting is None:
+                meeting = meetings[record.room] = PoE_Meeting()
+            apply_record(meeting, record)
+    return meetings
+
+def parse_time(value):
+    """Unix timestamp or ISO 8601 date/time in local time"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="event log file")
+    parser.add_argument("--room", help="only replay this room")
+    parser.add_argument("--until", type=parse_time, help="stop at this time (unix seconds or ISO 8601)")
+    parser.add_argument("--records", type=int, help="stop after this many records")
+    parser.add_argument("--events", action="store_true", help="print every event as it is replayed")
+    args = parser.parse_args(argv)
+
+    meetings = replay(args.log, args.room, args.until, args.records, print if args.events else None)
+    for room_id, meeting in sorted(meetings.items()):
+        print(f"{room_id}: {meeting.get_problem()}  word={meeting.word} state={meeting.state.name.lower()} "
+              f"guessed={''.join(meeting.guessed_letters)} incorrect={meeting.incorrect_guesses}/{meeting.max_incorrect}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+import collections
+import socket
+import threading
+
+from codec import CODEC_JSON
+
+# What to do when a client's outbound queue is full
+class SlowConsumerPolicy:
+    DROP_TO_SNAPSHOT = "drop_to_snapshot"
+    DISCONNECT = "disconnect"
+
+# Frames a client may fall behind by before the slow-consumer policy applies
+DEFAULT_MAX_QUEUE = 64
+
+class ControlFrame(bytes):
+    """An encoded frame that is not meeting state: a welcome, standby announcement or heartbeat
+
+    A snapshot does not supersede these, so they survive a queue overflow.
+    """
+    __slots__ = ()
+
+class OutboundQueue:
+    """Bounded queue of encoded frames waiting to be written to one client
+
+    Broadcasts hand every client the same immutable bytes object, so a state
+    version is serialized once no matter how many clients receive it. Subclasses
+    provide the actual writer and must call _take() / _sent() / _failed().
+    """
+    def __init__(self, address, snapshot_provider, max_queue=DEFAULT_MAX_QUEUE,
+                 policy=SlowConsumerPolicy.DROP_TO_SNAPSHOT):
+        self.address = address
+        self.snapshot_provider = snapshot_provider
+        self.max_queue = max_queue
+        self.policy = policy
+        self.queue = collections.deque()
+        self.closed = False
+
+        # PoE_Room this client is subscribed to, if any
+        self.room = None
+
+        # Set for a standby server, which receives every room's broadcasts
+        self.replica = False
+
+        # Set for a relay, a replica that re-broadcasts to its own spectators instead of standing by
+        self.relay = False
+
+        # Set for a read-only spectator, whose guesses are ignored
+        self.spectator = False
+
+        # Wire format negotiated at join; JSON until then
+        self.codec = CODEC_JSON
+
+        # Metrics
+        self.bytes_sent = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.overflows = 0
+        self.max_depth = 0
+
+        # Inbound guess throttling; the server attaches a TokenBucket on first guess
+        self.guess_bucket = None
+        self.guesses_limited = 0
+
+    def _enqueue(self, frame):
+        """Queue a frame, applying the slow-consumer policy; False if the client is gone"""
+        if self.closed:
+            return False
+
+        if len(self.queue) >= self.max_queue:
+            self.overflows += 1
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                print(f"Disconnecting slow client {self.address}")
+                self.close()
+                return False
+
+            # Every queued state and delta frame is superseded by the latest full snapshot;
+            # control frames stay, in order, ahead of it, less repeats such as heartbeats
+            control = []
+            for queued in self.queue:
+                if isinstance(queued, ControlFrame) and queued not in control:
+                    control.append(queued)
+            self.frames_dropped += len(self.queue) - len(control)
+            self.queue.clear()
+            self.queue.extend(control)
+            snapshot = self.snapshot_provider(self)
+            if isinstance(frame, ControlFrame):
+                self.queue.append(snapshot)
+            else:
+                self.frames_dropped += 1
+                frame = snapshot
+
+        self.queue.append(frame)
+        self.max_depth = max(self.max_depth, len(self.queue))
+        return True
+
+    def _sent(self, frame):
+        self.bytes_sent += len(frame)
+        self.frames_sent += 1
+
+    @property
+    def label(self):
+        """host:port of the client, for logs"""
+        if isinstance(self.address, tuple):
+            return f"{self.address[0]}:{self.address[1]}"
+        return str(self.address)
+
+    def metrics(self):
+        """Snapshot of this client's queue depth and traffic counters"""
+        return {
+            "address": self.address,
+            "queue_depth": len(self.queue),
+            "queued_bytes": sum(len(frame) for frame in self.queue),
+            "max_depth": self.max_depth,
+            "bytes_sent": self.bytes_sent,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "overflows": self.overflows,
+            "guesses_limited": self.guesses_limited,
+            "closed": self.closed,
+        }
+
+class ClientWriter(OutboundQueue):
+    """Per-client writer thread so one slow socket never blocks a broadcast"""
+    def __init__(self, sock, address, snapshot_provider, **kwargs):
+        super().__init__(address, snapshot_provider, **kwargs)
+        self.sock = sock
+        self.ready = threading.Condition()
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def send_frame(self, frame):
+        """Queue a frame without blocking; False if the client is gone"""
+        with self.ready:
+            queued = self._enqueue(frame)
+            if queued:
+                self.ready.notify()
+            return queued
+
+    def run(self):
+        while True:
+            with self.ready:
+                while not self.queue and not self.closed:
+                    self.ready.wait()
+                if self.closed:
+                    return
+                frame = self.queue.popleft()
+
+            try:
+                self.sock.sendall(frame)
+                self._sent(frame)
+            except Exception as e:
+                if not self.closed:
+                    print(f"Error sending to client {self.address}: {e}")
+                    self.close()
+                return
+
+    def close(self):
+        with self.ready:
+            self.closed = True
+            self.queue.clear()
+            self.ready.notify()
+        try:
+            # Shut down first: close() alone does not wake a reader blocked in recv()
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except:
+            pass
+
+    def __repr__(self):
+        return f"ClientWriter({self.address})"
@@ -0,0 +1,60 @@
+import struct
+
+# Every frame on the wire is a 4-byte big-endian payload length followed by the payload
+HEADER = struct.Struct("!I")
+HEADER_SIZE = HEADER.size
+
+# Upper bound for a single frame and for the per-connection reassembly buffer
+MAX_FRAME_SIZE = 1024 * 1024
+MAX_BUFFER_SIZE = 4 * MAX_FRAME_SIZE
+
+# Bytes requested per read; the decoder reassembles messages across reads
+RECV_SIZE = 65536
+
+class FrameError(ValueError):
+    """Raised when the byte stream cannot be split into valid frames"""
+
+def encode_frame(payload):
+    """Prefix a payload with its length so the receiver can find its end"""
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds limit of {MAX_FRAME_SIZE}")
+    return HEADER.pack(len(payload)) + payload
+
+class FrameDecoder:
+    """Incrementally reassemble length-prefixed frames from arbitrary recv() chunks"""
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE, max_buffer_size=MAX_BUFFER_SIZE):
+        self.max_frame_size = max_frame_size
+        self.max_buffer_size = max_buffer_size
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes and return every payload that is now complete"""
+        if len(self.buffer) + len(data) > self.max_buffer_size:
+            raise FrameError("Reassembly buffer limit exceeded")
+        self.buffer += data
+
+        frames = []
+        offset = 0
+        available = len(self.buffer)
+
+        while available - offset >= HEADER_SIZE:
+            (length,) = HEADER.unpack_from(self.buffer, offset)
+            if length > self.max_frame_size:
+                raise FrameError(f"Incoming frame of {length} bytes exceeds limit of {self.max_frame_size}")
+
+            end = offset + HEADER_SIZE + length
+            if end > available:
+                break
+
+            frames.append(bytes(self.buffer[offset + HEADER_SIZE:end]))
+            offset = end
+
+        # Drop consumed bytes in one go instead of once per frame
+        if offset:
+            del self.buffer[:offset]
+
+        return frames
+
+    def pending(self):
+        """Number of buffered bytes still waiting for the rest of their frame"""
+        return len(self.buffer)
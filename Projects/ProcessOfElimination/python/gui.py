@@ -1,13 +1,72 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 import math
+import threading
 from logic import Transcript
 
+# Most redraws per second; changes requested faster than this share a redraw
+MAX_REDRAW_RATE = 60
+
+# Pixels between the whiteboard's grid lines
+GRID_SPACING = 20
+
+# Clock face geometry on its 200x200 canvas
+CLOCK_CENTER = 100
+CLOCK_RADIUS = 80
+
 class Application:
     MAIN_MENU = "main_menu"
     MEETING = "meeting"
     RESULTS = "results"
 
+class UpdateScheduler:
+    """Runs a redraw on the Tk thread at most once per frame, however often and from whichever thread it is requested
+
+    request() only sets a flag, so a network thread never calls into Tk, which
+    raises if the mainloop is not running yet (e.g. while a startup messagebox
+    is open). The Tk thread checks the flag once per frame from its own
+    after() loop, started by start().
+    """
+    def __init__(self, root, redraw, max_rate=MAX_REDRAW_RATE):
+        self.root = root
+        self.redraw = redraw
+        self.interval_ms = max(1, round(1000 / max_rate))
+        self.lock = threading.Lock()
+        self.pending = False
+        
+        # Metrics
+        self.requested = 0
+        self.redraws = 0
+    
+    def start(self):
+        """Begin polling; call on the Tk thread"""
+        self.root.after(self.interval_ms, self.poll)
+    
+    def request(self):
+        with self.lock:
+            # A change made before the next poll shares its redraw
+            self.requested += 1
+            self.pending = True
+    
+    def poll(self):
+        with self.lock:
+            # Cleared before redrawing, so a change made during the redraw gets its own
+            due, self.pending = self.pending, False
+            if due:
+                self.redraws += 1
+        try:
+            if due:
+                self.redraw()
+        finally:
+            self.root.after(self.interval_ms, self.poll)
+    
+    def metrics(self):
+        return {
+            "requested": self.requested,
+            "redraws": self.redraws,
+            "merged": self.requested - self.redraws,
+        }
+
 class PoE_UI:
     def __init__(self, root, meeting, is_host=False, network=None):
         self.root = root
@@ -15,6 +74,10 @@ class PoE_UI:
         self.network = network
         self.is_host = is_host
         
+        # Network threads ask for redraws through request_update
+        self.updates = UpdateScheduler(root, self.update_display)
+        self.updates.start()
+        
         self.root.title("Process of Elimination")
         self.root.geometry("800x600")
         self.root.resizable(True, True)
@@ -133,6 +196,7 @@ class PoE_UI:
         
         self.clock_canvas = tk.Canvas(clock_frame, width=200, height=200, bg="white")
         self.clock_canvas.pack()
+        self.setup_clock()
         
         # Right column - Whiteboard
         right_col = tk.Frame(content_frame, padx=10)
@@ -170,6 +234,7 @@ class PoE_UI:
             highlightthickness=1
         )
         self.whiteboard_canvas.pack(fill=tk.BOTH, expand=True, pady=10)
+        self.setup_whiteboard()
         
         # Proposed solutions section
         solutions_frame = tk.LabelFrame(right_col, text="Proposed Solutions", padx=10, pady=10)
@@ -350,16 +415,23 @@ class PoE_UI:
         if state == Application.MEETING:
             self.update_display()
     
-    def draw_clock(self, incorrect_guesses):
-        """Draw a clock showing time running out instead of process_of_elimination"""
-        self.clock_canvas.delete("all")
-        
-        # Draw clock face
-        clock_radius = 80
-        center_x, center_y = 100, 100
+    def setup_clock(self):
+        """Create the clock's items once; draw_clock only moves the hands and toggles the warning"""
+        canvas = self.clock_canvas
+        center_x = center_y = CLOCK_CENTER
+        clock_radius = CLOCK_RADIUS
+        
+        # Red background for urgent time, behind everything else
+        self.clock_warning_bg = canvas.create_oval(
+            center_x - clock_radius, 
+            center_y - clock_radius,
+            center_x + clock_radius, 
+            center_y + clock_radius, 
+            fill="pink", outline="", state=tk.HIDDEN
+        )
         
         # Draw outer circle
-        self.clock_canvas.create_oval(
+        canvas.create_oval(
             center_x - clock_radius, 
             center_y - clock_radius,
             center_x + clock_radius, 
@@ -368,7 +440,7 @@ class PoE_UI:
         )
         
         # Draw clock center
-        self.clock_canvas.create_oval(
+        canvas.create_oval(
             center_x - 5, 
             center_y - 5,
             center_x + 5, 
@@ -383,9 +455,31 @@ class PoE_UI:
             y1 = center_y - (clock_radius - 10) * math.cos(angle)
             x2 = center_x + clock_radius * math.sin(angle)
             y2 = center_y - clock_radius * math.cos(angle)
+            canvas.create_line(x1, y1, x2, y2, width=2)
         
-        self.clock_canvas.create_line(x1, y1, x2, y2, width=2)
+        # Hands start at 12 o'clock
+        self.clock_minute_hand = canvas.create_line(
+            center_x, center_y, center_x, center_y - clock_radius * 0.7, width=3, fill="blue"
+        )
+        self.clock_hour_hand = canvas.create_line(
+            center_x, center_y, center_x, center_y - clock_radius * 0.5, width=4, fill="black"
+        )
+        
+        # Exclamation mark for urgency
+        self.clock_warning_text = canvas.create_text(
+            center_x, center_y + 30,
+            text="Time running out!",
+            fill="red",
+            font=("Arial", 10, "bold"),
+            state=tk.HIDDEN
+        )
     
+    def draw_clock(self, incorrect_guesses):
+        """Point the clock's hands at the time running out instead of process_of_elimination"""
+        canvas = self.clock_canvas
+        center_x = center_y = CLOCK_CENTER
+        clock_radius = CLOCK_RADIUS
+        
         # Calculate the clock hand position based on incorrect guesses
         max_incorrect = self.meeting.get_meeting_state()["max_incorrect"]
         progress = incorrect_guesses / max_incorrect if max_incorrect > 0 else 0
@@ -393,38 +487,27 @@ class PoE_UI:
         # Calculate angle (0 = 12 o'clock, 0.5 = 6 o'clock, 1.0 = 12 o'clock again)
         angle = progress * 2 * math.pi
         
-        # Draw minute hand (always points to current progress)
+        # Minute hand (always points to current progress)
         minute_length = clock_radius * 0.7
         minute_x = center_x + minute_length * math.sin(angle)
         minute_y = center_y - minute_length * math.cos(angle)
-        self.clock_canvas.create_line(center_x, center_y, minute_x, minute_y, width=3, fill="blue")
+        canvas.coords(self.clock_minute_hand, center_x, center_y, minute_x, minute_y)
         
-        # Draw hour hand (moves at 1/12 the speed of minute hand)
+        # Hour hand (moves at 1/12 the speed of minute hand)
         hour_length = clock_radius * 0.5
         hour_angle = (progress * 2 * math.pi) / 12
         hour_x = center_x + hour_length * math.sin(hour_angle)
         hour_y = center_y - hour_length * math.cos(hour_angle)
-        self.clock_canvas.create_line(center_x, center_y, hour_x, hour_y, width=4, fill="black")
-        
-        # Add indicators of time running out
-        if incorrect_guesses >= max_incorrect * 0.75:
-            # Red background for urgent time
-            self.clock_canvas.create_oval(
-                center_x - clock_radius, 
-                center_y - clock_radius,
-                center_x + clock_radius, 
-                center_y + clock_radius, 
-                fill="pink", outline="", tags="bg"
-            )
-            self.clock_canvas.tag_lower("bg")  # Put background behind everything else
-            
-            # Exclamation mark for urgency
-            self.clock_canvas.create_text(
-                center_x, center_y + 30,
-                text="Time running out!",
-                fill="red",
-                font=("Arial", 10, "bold")
-            )
+        canvas.coords(self.clock_hour_hand, center_x, center_y, hour_x, hour_y)
+        
+        # Show indicators of time running out
+        urgent = tk.NORMAL if incorrect_guesses >= max_incorrect * 0.75 else tk.HIDDEN
+        canvas.itemconfig(self.clock_warning_bg, state=urgent)
+        canvas.itemconfig(self.clock_warning_text, state=urgent)
+    
+    def request_update(self):
+        """Redraw soon on the Tk thread; safe to call from any thread"""
+        self.updates.request()
     
     def update_display(self):
         """Update the UI based on current meeting state"""
@@ -440,13 +523,7 @@ class PoE_UI:
         self.problem_display.config(text=meeting_state["display_word"])
         
         # Update solution lists on whiteboard
-        correct = []
-        incorrect = []
-        for letter in meeting_state["guessed_letters"]:
-            if letter in meeting_state["word"]:
-                correct.append(letter)
-            else:
-                incorrect.append(letter)
+        correct, incorrect = self.meeting.tally()
         
         # Update correct solutions text
         self.correct_solutions.config(state=tk.NORMAL)
@@ -489,70 +566,89 @@ class PoE_UI:
             self.meeting_status.config(text="Failed", fg="red")
             self.show_results(False, meeting_state["word"])
 
-    def update_whiteboard(self, meeting_state):
-        """Draw a business diagram on the whiteboard canvas"""
-        self.whiteboard_canvas.delete("all")
-        
-        # Draw a business-like diagram showing the problem solution progress
-        width = self.whiteboard_canvas.winfo_width()
-        height = self.whiteboard_canvas.winfo_height()
-        
-        # Draw whiteboard background with faint grid
-        for i in range(0, width, 20):
-            self.whiteboard_canvas.create_line(
-                i, 0, i, height, 
-                fill="#e0e0e0"
-            )
+    def setup_whiteboard(self):
+        """Create the business diagram's items once; update_whiteboard only reconfigures them"""
+        canvas = self.whiteboard_canvas
         
-        for i in range(0, height, 20):
-            self.whiteboard_canvas.create_line(
-                0, i, width, i, 
-                fill="#e0e0e0"
-            )
-        
-        # Draw a process flow diagram for the problem
-        progress = len([c for c in meeting_state["display_word"] if c.isalpha()]) / len(meeting_state["word"])
+        # Faint grid lines, laid out to the canvas size by resize_whiteboard
+        self.grid_lines = []
+        canvas.bind("<Configure>", self.resize_whiteboard)
         
         # Draw box for problem statement
-        self.whiteboard_canvas.create_rectangle(
+        canvas.create_rectangle(
             50, 40, 350, 80, 
             fill="#d0e0ff", outline="black"
         )
-        self.whiteboard_canvas.create_text(
+        canvas.create_text(
             200, 60,
             text="Problem Analysis Process",
             font=("Arial", 12, "bold")
         )
         
         # Draw arrow down
-        self.whiteboard_canvas.create_line(
+        canvas.create_line(
             200, 80, 200, 110,
             arrow=tk.LAST, width=2
         )
         
-        # Draw process box
-        progress_fill = f"#{int(255*(1-progress)):02x}{int(255*progress):02x}80"
-        self.whiteboard_canvas.create_rectangle(
+        # Process box, filled by progress
+        self.progress_box = canvas.create_rectangle(
             50, 110, 350, 150,
-            fill=progress_fill, outline="black"
+            fill="#ff0080", outline="black"
         )
         
         # Progress text
-        percent = int(progress * 100)
-        self.whiteboard_canvas.create_text(
+        self.progress_text = canvas.create_text(
             200, 130,
-            text=f"Solution Progress: {percent}%",
+            text="Solution Progress: 0%",
             font=("Arial", 11)
         )
         
-        # Draw remaining choices indicator
+        # Remaining choices indicator
+        self.remaining_text = canvas.create_text(
+            200, 170,
+            text="",
+            font=("Arial", 10)
+        )
+    
+    def resize_whiteboard(self, event):
+        """Lay the grid out over the whiteboard's new size, reusing existing lines"""
+        canvas = self.whiteboard_canvas
+        columns = range(0, event.width, GRID_SPACING)
+        rows = range(0, event.height, GRID_SPACING)
+        
+        needed = len(columns) + len(rows)
+        while len(self.grid_lines) < needed:
+            self.grid_lines.append(canvas.create_line(0, 0, 0, 0, fill="#e0e0e0", tags="grid"))
+        for line in self.grid_lines[needed:]:
+            canvas.delete(line)
+        del self.grid_lines[needed:]
+        
+        lines = iter(self.grid_lines)
+        for x in columns:
+            canvas.coords(next(lines), x, 0, x, event.height)
+        for y in rows:
+            canvas.coords(next(lines), 0, y, event.width, y)
+        
+        # Keep the grid behind the diagram
+        canvas.tag_lower("grid")
+    
+    def update_whiteboard(self, meeting_state):
+        """Show the problem solution progress on the whiteboard's business diagram"""
+        canvas = self.whiteboard_canvas
+        progress = len([c for c in meeting_state["display_word"] if c.isalpha()]) / len(meeting_state["word"])
+        
+        progress_fill = f"#{int(255*(1-progress)):02x}{int(255*progress):02x}80"
+        canvas.itemconfig(self.progress_box, fill=progress_fill)
+        
+        percent = int(progress * 100)
+        canvas.itemconfig(self.progress_text, text=f"Solution Progress: {percent}%")
+        
         remaining = meeting_state["max_incorrect"] - meeting_state["incorrect_guesses"]
         total = meeting_state["max_incorrect"]
-        
-        self.whiteboard_canvas.create_text(
-            200, 170,
+        canvas.itemconfig(
+            self.remaining_text,
             text=f"Remaining time: {remaining}/{total}",
-            font=("Arial", 10),
             fill="red" if remaining < 3 else "black"
         )
     
@@ -0,0 +1,296 @@
+"""Headless Process of Elimination host for servers without a display"""
+
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+
+from logic import PoE_Meeting, Transcript
+from network import PoE_Server, ServerEngine
+from codec import SUPPORTED_CODECS
+from fanout import DEFAULT_MAX_QUEUE, SlowConsumerPolicy
+from rooms import DEFAULT_IDLE_TIMEOUT, DEFAULT_ROOM
+from wordstore import default_store, open_word_store
+from difficulty import DIFFICULTY_BANDS, band_for, build_difficulty_index
+from throttle import DEFAULT_GUESS_BURST, DEFAULT_GUESS_RATE
+
+log = logging.getLogger("poe.headless")
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any extra 'fields' merged in"""
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+class KeyValueFormatter(logging.Formatter):
+    """logfmt-style 'key=value' lines for people reading the console"""
+    def format(self, record):
+        parts = [
+            time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)),
+            record.levelname.lower(),
+            record.name,
+            json.dumps(record.getMessage()),
+        ]
+        parts.extend(f"{key}={json.dumps(value)}" for key, value in getattr(record, "fields", {}).items())
+        return " ".join(parts)
+
+class PrintLogger:
+    """File-like object that turns the network layer's print() output into log records"""
+    def __init__(self, logger, level=logging.INFO):
+        self.logger = logger
+        self.level = level
+        self.partial = ""
+
+    def write(self, text):
+        lines = (self.partial + text).split("\n")
+        self.partial = lines.pop()
+        for line in lines:
+            if line.strip():
+                self.logger.log(self.level, line.strip())
+        return len(text)
+
+    def flush(self):
+        pass
+
+class NullUI:
+    """UI stand-in for the headless host: no drawing, only state-change events
+
+    When a meeting ends it schedules the next one, since there is no host at a
+    keyboard to press "Start New Meeting".
+    """
+    def __init__(self, meeting, restart_delay=None):
+        self.meeting = meeting
+        self.network = None
+        self.restart_delay = restart_delay
+        self.last_state = None
+        self.restart_timer = None
+
+    def update_display(self):
+        state = self.meeting.state
+        if state == self.last_state:
+            return
+        self.last_state = state
+
+        log.info("meeting state changed", extra={"fields": {
+            "event": "state",
+            "state": state.name.lower(),
+            "display_word": self.meeting.get_problem(),
+            "incorrect_guesses": self.meeting.incorrect_guesses,
+        }})
+
+        if state in (Transcript.WON, Transcript.LOST) and self.restart_delay is not None:
+            self.restart_timer = threading.Timer(self.restart_delay, self.restart)
+            self.restart_timer.daemon = True
+            self.restart_timer.start()
+
+    def restart(self):
+        if self.network and self.network.running:
+            self.network.start_new_meeting()
+
+def load_config(path):
+    with open(path, encoding="utf-8") as config_file:
+        return json.load(config_file)
+
+def configure_logging(level, fmt):
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else KeyValueFormatter())
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper())
+
+    # Route the network layer's console output through the same handler
+    sys.stdout = PrintLogger(logging.getLogger("poe.server"))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--config", help="JSON file with any of the options below; flags override it")
+    parser.add_argument("--word", help="word for the first meeting")
+    parser.add_argument("--word-list", help="file with one word per line to draw meetings from")
+    parser.add_argument("--min-length", type=int, help="shortest word to draw from the word list")
+    parser.add_argument("--max-length", type=int, help="longest word to draw from the word list")
+    parser.add_argument("--difficulty", choices=DIFFICULTY_BANDS, help="only draw words from this difficulty band")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, help="TCP port (default: first free common port)")
+    parser.add_argument("--engine", choices=[ServerEngine.THREADED, ServerEngine.ASYNCIO], default=ServerEngine.ASYNCIO)
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE)
+    parser.add_argument("--slow-consumer", choices=[SlowConsumerPolicy.DROP_TO_SNAPSHOT, SlowConsumerPolicy.DISCONNECT],
+                        default=SlowConsumerPolicy.DROP_TO_SNAPSHOT)
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT, help="seconds before empty rooms close")
+    parser.add_argument("--batch-ms", type=float, default=20.0,
+                        help="window for coalescing guesses into one broadcast; 0 applies each at once")
+    parser.add_argument("--guess-rate", type=float, default=DEFAULT_GUESS_RATE,
+                        help="guesses per second allowed per client; 0 disables the limit")
+    parser.add_argument("--guess-burst", type=int, default=DEFAULT_GUESS_BURST)
+    parser.add_argument("--codecs", default=",".join(SUPPORTED_CODECS),
+                        help="wire formats clients may negotiate, preferred first (e.g. 'json' to debug)")
+    parser.add_argument("--event-log", help="append every meeting event here and recover open rooms from it on start")
+    parser.add_argument("--standby-of", metavar="HOST:PORT", help="mirror this host and take over if it fails")
+    parser.add_argument("--advertise-host", help="address the host gives players for this standby")
+    parser.add_argument("--standby-secret",
+                        help="shared secret: a host only accepts a standby that sends it, and a standby sends it")
+    parser.add_argument("--failover-timeout", type=float, default=2.0,
+                        help="seconds without a heartbeat before a standby takes over")
+    parser.add_argument("--relay-of", metavar="HOST:PORT",
+                        help="serve this host's meetings read-only to spectators instead of hosting")
+    parser.add_argument("--restart-delay", type=float, default=10.0,
+                        help="seconds after a meeting ends before the next starts; negative disables")
+    parser.add_argument("--qr", dest="qr_code_path", help="write a join QR code PNG here (needs qrcode)")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--log-format", choices=["json", "text"], default="json")
+
+    # Config file values become defaults so explicit flags still win
+    pre_args, _ = parser.parse_known_args(argv)
+    if pre_args.config:
+        config = {key.replace("-", "_"): value for key, value in load_config(pre_args.config).items()}
+        parser.set_defaults(**config)
+
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(args.log_level, args.log_format)
+
+    # One store, memory-mapped and indexed once, shared by every room's meeting
+    words = open_word_store(args.word_list) if args.word_list else None
+    word_filters = {}
+    if args.min_length or args.max_length:
+        word_filters["length"] = (args.min_length, args.max_length)
+    if args.standby_of and args.event_log:
+        # Recovering the log at takeover would overwrite the mirrored rooms
+        log.error("--standby-of and --event-log cannot be combined", extra={"fields": {"event": "config_error"}})
+        return 2
+    if args.standby_of and not args.standby_secret:
+        # The host turns away any standby without the secret it was given
+        log.error("--standby-of needs --standby-secret", extra={"fields": {"event": "config_error"}})
+        return 2
+    if args.relay_of and (args.standby_of or args.event_log):
+        # A relay's rooms only ever come from its host
+        log.error("--relay-of cannot be combined with --standby-of or --event-log",
+                  extra={"fields": {"event": "config_error"}})
+        return 2
+    if words is not None and not len(words):
+        log.error("word list has no usable words", extra={"fields": {"event": "config_error"}})
+        return 2
+    if args.difficulty:
+        # Scored once per word file; later starts load the cached bands
+        index = build_difficulty_index(words if words is not None else default_store)
+        word_filters["difficulty"] = band_for(args.difficulty)
+        log.info("difficulty index ready", extra={"fields": {
+            "event": "difficulty_index", "source": index.source, "words": len(index),
+            "seconds": round(index.seconds, 3),
+        }})
+    
+    meeting = PoE_Meeting(words, word_filters)
+    if args.word:
+        if not args.word.isalpha():
+            log.error("invalid word: letters only", extra={"fields": {"event": "config_error"}})
+            return 2
+        meeting.pose_problem(args.word)
+
+    ui = NullUI(meeting, restart_delay=args.restart_delay if args.restart_delay >= 0 else None)
+    server = PoE_Server(
+        meeting,
+        ui,
+        host=args.host,
+        port=args.port,
+        engine=args.engine,
+        max_queue=args.max_queue,
+        slow_consumer_policy=args.slow_consumer,
+        idle_timeout=args.idle_timeout,
+        qr_code_path=args.qr_code_path,
+        batch_window=args.batch_ms / 1000 if args.batch_ms > 0 else None,
+        guess_rate=args.guess_rate if args.guess_rate > 0 else None,
+        guess_burst=args.guess_burst,
+        codecs=[codec.strip() for codec in args.codecs.split(",") if codec.strip()],
+        event_log=args.event_log,
+        read_only=bool(args.relay_of),
+        standby_secret=args.standby_secret,
+    )
+    if words is not None or word_filters:
+        def word_list_meeting():
+            room_meeting = PoE_Meeting(words, word_filters)
+            room_meeting.start_meeting()
+            return room_meeting
+        server.rooms.meeting_factory = word_list_meeting
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    if args.standby_of:
+        # Mirror the host and only start serving once it is gone
+        from replication import PoE_Standby
+        primary_host, _, primary_port = args.standby_of.rpartition(":")
+        standby = PoE_Standby(server, primary_host, int(primary_port), failover_timeout=args.failover_timeout,
+                              advertise_host=args.advertise_host, secret=args.standby_secret)
+        standby.start()
+        log.info("standing by", extra={"fields": {"event": "standby", "primary": args.standby_of, "port": server.port}})
+        while not standby.wait(0.2):
+            if stopping.is_set():
+                standby.stop()
+                return 0
+            if not standby.running:
+                log.error("host refused the standby", extra={"fields": {"event": "standby_refused",
+                                                                       "primary": args.standby_of}})
+                return 1
+        if not server.running:
+            log.error("server failed to start", extra={"fields": {"event": "start_failed"}})
+            return 1
+        log.info("took over from host", extra={"fields": {
+            "event": "takeover",
+            "primary": args.standby_of,
+            "rooms": len(server.rooms),
+            "takeover_ms": round((standby.took_over_at - standby.failure_detected_at) * 1000, 1),
+        }})
+    elif not server.start():
+        log.error("server failed to start", extra={"fields": {"event": "start_failed"}})
+        return 1
+    ui.network = server
+
+    relay = None
+    if args.relay_of:
+        # Spectators can connect right away; rooms fill in as the host's stream arrives
+        from relay import PoE_Relay
+        upstream_host, _, upstream_port = args.relay_of.rpartition(":")
+        relay = PoE_Relay(server, upstream_host, int(upstream_port), failover_timeout=args.failover_timeout)
+        relay.start()
+        log.info("relaying", extra={"fields": {"event": "relay", "upstream": args.relay_of, "port": server.port}})
+
+    if server.recovered_rooms:
+        log.info("recovered rooms from event log", extra={"fields": {
+            "event": "recovered", "rooms": server.recovered_rooms,
+        }})
+    # A recovered or mirrored meeting carries on where it was; a fresh one starts now
+    if DEFAULT_ROOM not in server.recovered_rooms and not args.standby_of and not relay:
+        meeting.start_meeting()
+        server.broadcast_meeting_state()
+    ui.update_display()
+    log.info("headless host ready", extra={"fields": {
+        "event": "ready",
+        "host": server.host,
+        "port": server.port,
+        "engine": server.engine,
+        "discovery": server.network_mode,
+    }})
+
+    stopping.wait()
+
+    log.info("shutting down", extra={"fields": {"event": "stop", "rooms": len(server.rooms)}})
+    if relay:
+        relay.stop()
+    server.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,38 +1,193 @@
-import random
 from enum import Enum
 
+from wordstore import default_store
+
 class Transcript(Enum):
     WAITING = 0
     PLAYING = 1
     WON = 2
     LOST = 3
 
+# Number of set bits in an int; int.bit_count needs Python 3.10
+popcount = getattr(int, "bit_count", None) or (lambda mask: bin(mask).count("1"))
+
+ALPHABET_START = ord("A")
+
+# Letters for every value of each mask byte, so listing a set costs four lookups
+_BYTE_LETTERS = [
+    [tuple(chr(ALPHABET_START + offset + bit) for bit in range(8) if value >> bit & 1 and offset + bit < 26)
+     for value in range(256)]
+    for offset in (0, 8, 16, 24)
+]
+
+class LetterSet:
+    """Set of letters stored as a bitmask over A-Z
+    
+    Bit n is set once chr(ord('A') + n) is in the set. Custom words may use
+    any alphabetic character, so anything outside A-Z goes in a small
+    overflow set and the class still behaves like a plain set. Iteration is
+    in alphabetical order, and int() gives the mask for the wire.
+    """
+    __slots__ = ("mask", "extra")
+    
+    def __init__(self, letters=()):
+        if isinstance(letters, LetterSet):
+            self.mask = letters.mask
+            self.extra = set(letters.extra) if letters.extra else None
+            return
+        self.mask = 0
+        self.extra = None
+        for letter in letters:
+            self.add(letter)
+    
+    @classmethod
+    def from_mask(cls, mask):
+        letters = cls()
+        letters.mask = mask
+        return letters
+    
+    def add(self, letter):
+        bit = ord(letter) - ALPHABET_START if len(letter) == 1 else -1
+        if 0 <= bit < 26:
+            self.mask |= 1 << bit
+        else:
+            if self.extra is None:
+                self.extra = set()
+            self.extra.add(letter)
+    
+    def __contains__(self, letter):
+        bit = ord(letter) - ALPHABET_START if len(letter) == 1 else -1
+        if 0 <= bit < 26:
+            return self.mask >> bit & 1 == 1
+        return self.extra is not None and letter in self.extra
+    
+    def letters(self):
+        """All letters as a tuple in alphabetical order"""
+        mask = self.mask
+        letters = (_BYTE_LETTERS[0][mask & 0xFF] + _BYTE_LETTERS[1][mask >> 8 & 0xFF]
+                   + _BYTE_LETTERS[2][mask >> 16 & 0xFF] + _BYTE_LETTERS[3][mask >> 24 & 0xFF])
+        if self.extra:
+            letters += tuple(sorted(self.extra))
+        return letters
+    
+    def __iter__(self):
+        return iter(self.letters())
+    
+    def __len__(self):
+        return popcount(self.mask) + (len(self.extra) if self.extra else 0)
+    
+    def __int__(self):
+        return self.mask
+    
+    def __eq__(self, other):
+        if isinstance(other, LetterSet):
+            return self.mask == other.mask and (self.extra or set()) == (other.extra or set())
+        if isinstance(other, (set, frozenset)):
+            return set(self) == other
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"LetterSet({''.join(self)!r})"
+
 class PoE_Meeting:
-    def __init__(self):
-        self.words = [
-            "python", "programming", "computer", "algorithm", "network",
-            "database", "interface", "variable", "function", "keyboard",
-            "monitor", "language", "software", "hardware", "developer"
-        ]
+    # Receives pose/start/guess events when the meeting is logged; see eventlog.RoomJournal
+    journal = None
+
+    def __init__(self, words=None, word_filters=None):
+        # Word source shared between meetings; see wordstore for file-backed dictionaries
+        self.words = words if words is not None else default_store
+        
+        # Index filters for reset_meeting, e.g. {"length": (5, 8)}
+        self.word_filters = word_filters or {}
         self.reset_meeting()
 
+    @property
+    def word(self):
+        return self._word
+
+    @word.setter
+    def word(self, word):
+        """Index the word once so guesses never rescan it"""
+        self._word = word
+        positions = {}
+        for index, letter in enumerate(word):
+            positions.setdefault(letter, []).append(index)
+        self._positions = positions
+        self._word_mask = LetterSet(positions).mask
+        self._sync_progress()
+
+    def _sync_progress(self):
+        """Rebuild the masked display and remaining-letter count from guessed_letters"""
+        guessed = getattr(self, "guessed_letters", LetterSet())
+        self._display = [letter if letter in guessed else "_" for letter in self._word]
+        self._display_text = None
+        self._remaining = sum(1 for letter in self._positions if letter not in guessed)
+        self._sorted_guesses = None
+
     def pose_problem(self, word):
+        self.guessed_letters = LetterSet()
         self.word = word.upper()
-        self.guessed_letters = set()
         self.incorrect_guesses = 0
         self.state = Transcript.WAITING
+        if self.journal is not None:
+            self.journal.pose(self.word)
     
     def reset_meeting(self):
-        self.word = random.choice(self.words).upper()
-        self.guessed_letters = set()
+        self.guessed_letters = LetterSet()
+        self.word = self.words.random_word(**self.word_filters) or self.words.random_word()
         self.incorrect_guesses = 0
         self.max_incorrect = 6
         self.state = Transcript.WAITING
+        if self.journal is not None:
+            self.journal.pose(self.word)
+    
+    def restore(self, word, guessed_letters, incorrect_guesses, state):
+        """Replace the whole meeting state, e.g. from a server snapshot"""
+        self.guessed_letters = LetterSet(guessed_letters)
+        self.word = word
+        self.incorrect_guesses = incorrect_guesses
+        self.state = state
     
     def start_meeting(self):
         self.state = Transcript.PLAYING
+        if self.journal is not None:
+            self.journal.start()
+    
+    def reveal(self, letter):
+        """Record a guessed letter and uncover it; returns whether it is in the word
+        
+        A letter already guessed changes nothing, so a replayed delta cannot
+        count the same hit twice.
+        """
+        if letter in self.guessed_letters:
+            return letter in self._positions
+        self.guessed_letters.add(letter)
+        self._sorted_guesses = None
+        
+        positions = self._positions.get(letter)
+        if positions is None:
+            return False
+        
+        display = self._display
+        for index in positions:
+            display[index] = letter
+        self._display_text = None
+        self._remaining -= 1
+        return True
+    
+    def propose_solution(self, letter, client=None):
+        """Guess a letter; returns whether it changed the meeting
+        
+        client names who guessed, for the event log.
+        """
+        accepted = self._propose_solution(letter)
+        if self.journal is not None:
+            self.journal.guess(letter.upper(), client)
+        return accepted
     
-    def propose_solution(self, letter):
+    def _propose_solution(self, letter):
         if self.state != Transcript.PLAYING:
             return False
         
@@ -40,29 +195,40 @@ class PoE_Meeting:
         if letter in self.guessed_letters:
             return False
         
-        self.guessed_letters.add(letter)
-        
-        if letter not in self.word:
+        if not self.reveal(letter):
             self.incorrect_guesses += 1
             if self.incorrect_guesses >= self.max_incorrect:
                 self.state = Transcript.LOST
         
         # Check if player has won
-        if all(letter in self.guessed_letters for letter in self.word):
+        if self._remaining == 0:
             self.state = Transcript.WON
         
         return True
     
+    def tally(self):
+        """Guessed letters split into (correct, incorrect) LetterSets, by masking with the word's letters"""
+        guessed = self.guessed_letters
+        correct = LetterSet.from_mask(guessed.mask & self._word_mask)
+        incorrect = LetterSet.from_mask(guessed.mask & ~self._word_mask)
+        for letter in guessed.extra or ():
+            (correct if letter in self._positions else incorrect).add(letter)
+        return correct, incorrect
+    
     def get_problem(self):
-        return " ".join([letter if letter in self.guessed_letters else "_" for letter in self.word])
+        if self._display_text is None:
+            self._display_text = " ".join(self._display)
+        return self._display_text
     
     def get_meeting_state(self):
+        if self._sorted_guesses is None:
+            # LetterSet iterates alphabetically, so no sort is needed
+            self._sorted_guesses = list(self.guessed_letters.letters())
         return {
             "word": self.word,
             "display_word": self.get_problem(),
-            "guessed_letters": sorted(list(self.guessed_letters)),
+            "guessed_letters": self._sorted_guesses,
             "incorrect_guesses": self.incorrect_guesses,
             "max_incorrect": self.max_incorrect,
             "state": self.state
         }
-
@@ -1,54 +1,98 @@
+import contextlib
+import hmac
 import socket
 import threading
 import json
 import time
 import random
-import subprocess
-import webbrowser
 import os
-from urllib.parse import quote
-
-try:
-    from zeroconf import Zeroconf, ServiceInfo, ServiceBrowser, ServiceListener
-    ZEROCONF_AVAILABLE = True
-except ImportError:
-    print("Zeroconf not available; service discovery will not work")
-    ZEROCONF_AVAILABLE = False
-
-# Constants for networking modes
-class NetworkMode:
-    ZEROCONF = "zeroconf"
-    UDP_BROADCAST = "udp_broadcast"
-    DIRECT = "direct"
-
-if ZEROCONF_AVAILABLE:
-    class DiscoveryListener(ServiceListener):
-        """Listener for Zeroconf service discovery"""
-        def __init__(self):
-            self.services = {}
-            self.event = threading.Event()
-        
-        def add_service(self, zeroconf, service_type, name):
-            info = zeroconf.get_service_info(service_type, name)
-            if info:
-                self.services[name] = info
-                self.event.set()
-        
-        def update_service(self, zeroconf, service_type, name):
-            self.add_service(zeroconf, service_type, name)
-        
-        def remove_service(self, zeroconf, service_type, name):
-            if name in self.services:
-                del self.services[name]
+from codec import CODEC_JSON, SUPPORTED_CODECS, decode_message, encode_message, negotiate
+from discovery import (DEFAULT_CONNECT_TIMEOUT, DiscoveryCache, DiscoveryEngine, DiscoveryResponder,
+                       NetworkMode, load_zeroconf)
+from fanout import ClientWriter, ControlFrame, DEFAULT_MAX_QUEUE, SlowConsumerPolicy
+from framing import FrameDecoder, FrameError, RECV_SIZE, encode_frame
+from rooms import DEFAULT_IDLE_TIMEOUT, DEFAULT_ROOM, PoE_Room, PoE_RoomRegistry
+from throttle import DEFAULT_GUESS_BURST, DEFAULT_GUESS_RATE, GuessBatcher, TokenBucket
+
+def control_frame(message):
+    """Frame a JSON message that is not meeting state, so a slow client's overflow keeps it"""
+    return ControlFrame(encode_frame(json.dumps(message).encode('utf-8')))
+
+def notify_ui(ui):
+    """Tell a UI its meeting changed; safe to call from any network thread
+    
+    UIs with request_update (PoE_UI) merge a burst of changes into one redraw
+    on their own thread; others are redrawn right away.
+    """
+    request_update = getattr(ui, "request_update", None)
+    if request_update is not None:
+        request_update()
+    else:
+        ui.update_display()
+
+# Concurrency models for PoE_Server
+class ServerEngine:
+    THREADED = "threaded"
+    ASYNCIO = "asyncio"
+
+# Exponential backoff between a client's reconnect attempts after a dropped connection
+RECONNECT_BASE_DELAY = 0.5
+RECONNECT_MAX_DELAY = 10.0
+RECONNECT_MAX_ATTEMPTS = 8
+
+# Seconds between heartbeats to standby servers
+HEARTBEAT_INTERVAL = 0.5
 
 class PoE_Server:
-    def __init__(self, meeting, ui, host='0.0.0.0', port=None):
+    def __init__(self, meeting, ui, host='0.0.0.0', port=None, engine=ServerEngine.THREADED,
+                 max_queue=DEFAULT_MAX_QUEUE, slow_consumer_policy=SlowConsumerPolicy.DROP_TO_SNAPSHOT,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, qr_code_path=None, batch_window=None,
+                 guess_rate=DEFAULT_GUESS_RATE, guess_burst=DEFAULT_GUESS_BURST, codecs=SUPPORTED_CODECS,
+                 event_log=None, read_only=False, standby_secret=None):
         self.meeting = meeting
         self.ui = ui
         self.host = host
+        self.engine = engine
+        self.async_engine = None
+        self.running = False
+        
+        # Where show_connection_info writes a join QR code; None skips it
+        self.qr_code_path = qr_code_path
+
+        # Per-client outbound queue bound and what happens when a client exceeds it
+        self.max_queue = max_queue
+        self.slow_consumer_policy = slow_consumer_policy
+
+        # Pending-connection queue; large meetings connect in bursts
+        self.backlog = 128
+        
+        # Seconds to collect guesses before applying them as one broadcast; None applies each at once
+        self.batch_window = batch_window
+        self.batcher = None
+        
+        # Wire formats clients may negotiate, in order of preference
+        self.codecs = codecs
+        
+        # Per-client guess token bucket; a rate of None disables the limit
+        self.guess_rate = guess_rate
+        self.guess_burst = guess_burst
+        
+        # Standby server clients should reconnect to if this one dies, as (host, port)
+        self.standby = None
+        
+        # Secret a standby must send to be streamed the rooms; None turns every standby away
+        self.standby_secret = standby_secret
+        
+        # A relay's server only serves spectators; its rooms change only through the relay
+        self.read_only = read_only
+        
+        # Path of the append-only meeting event log; rooms are recovered from it on start
+        self.event_log_path = event_log
+        self.event_log = None
+        self.recovered_rooms = []
 
         # try commonly available ports
-        self.port = port if port else self.find_available_port([
+        self.port = port if port is not None else self.find_available_port([
             8080,  # Common HTTP alternate
             80,    # HTTP - often open
             443,   # HTTPS - often open 
@@ -66,10 +110,15 @@ class PoE_Server:
         self.zeroconf = None
         self.service_info = None
         self.udp_server = None
-        self.discovery_thread = None
         
         # Initialize clients list
         self.clients = []
+        self.clients_lock = threading.Lock()
+
+        # Meetings hosted by this server keyed by room ID; the host's own meeting is the default room
+        self.rooms = PoE_RoomRegistry(idle_timeout=idle_timeout)
+        self.default_room = self.rooms.add(PoE_Room(DEFAULT_ROOM, meeting, persistent=True))
+        self.reap_interval = min(idle_timeout, 30.0)
 
         # service constants
         self.SERVICE_TYPE = "_poe._tcp.local."
@@ -93,6 +142,8 @@ class PoE_Server:
     # Add this method to help with connection sharing
     def show_connection_info(self):
         """Display connection info and provide easy sharing options"""
+        from urllib.parse import quote
+        
         hostname = socket.gethostname()
         local_ip = socket.gethostbyname(hostname)
         
@@ -101,7 +152,7 @@ class PoE_Server:
             external_ip = None
             try:
                 import urllib.request
-                external_ip = urllib.request.urlopen('https://api.ipify.org').read().decode('utf-8')
+                external_ip = urllib.request.urlopen('https://api.ipify.org', timeout=2).read().decode('utf-8')
             except:
                 pass
                 
@@ -120,15 +171,14 @@ class PoE_Server:
             share_text = f"Join my Process of Elimination meeting at {local_ip}:{self.port}"
             message += f"\nShare options:\n"
             
-            # Generate a QR code command if qrcode is available
-            try:
-                import qrcode
-                img = qrcode.make(share_text)
-                qr_path = "poe_connect.png"
-                img.save(qr_path)
-                message += f"- QR Code saved to: {qr_path}\n"
-            except ImportError:
-                message += "- Install 'qrcode' package for QR code sharing\n"
+            # QR codes are opt-in: qrcode is slow to import and writes a file
+            if self.qr_code_path:
+                try:
+                    import qrcode
+                    qrcode.make(share_text).save(self.qr_code_path)
+                    message += f"- QR Code saved to: {self.qr_code_path}\n"
+                except ImportError:
+                    message += "- Install 'qrcode' package for QR code sharing\n"
             
             # Email sharing
             email_link = f"mailto:?subject=Process%20of%20Elimination%20Meeting&body={quote(share_text)}"
@@ -148,9 +198,14 @@ class PoE_Server:
     def start(self):
         try:
             self.server.bind((self.host, self.port))
-            self.server.listen(5)
+            self.server.listen(self.backlog)
             self.running = True
 
+            # Port 0 asks the OS for any free port
+            if self.port == 0:
+                self.port = self.server.getsockname()[1]
+                self.SERVICE_NAME = f"POE_{socket.gethostname()}_{self.port}"
+
             if self.start_zeroconf():
                 self.network_mode = NetworkMode.ZEROCONF
             elif self.start_udp_discovery():
@@ -164,10 +219,35 @@ class PoE_Server:
             local_ip = socket.gethostbyname(hostname)
             print(f"Server started on {local_ip}:{self.port} using {self.network_mode}")
             
-            # Start listening for connections in a separate thread
-            thread = threading.Thread(target=self.accept_connections)
-            thread.daemon = True
-            thread.start()
+            if self.event_log_path:
+                self.open_event_log()
+            
+            if self.engine == ServerEngine.ASYNCIO:
+                # Accept, read and broadcast all run on one event loop
+                from async_engine import AsyncServerEngine
+                self.async_engine = AsyncServerEngine(self)
+                if not self.async_engine.start():
+                    raise RuntimeError("asyncio engine failed to start")
+            else:
+                # Start listening for connections in a separate thread
+                thread = threading.Thread(target=self.accept_connections)
+                thread.daemon = True
+                thread.start()
+
+            # Keep standby servers sure that this one is alive
+            heartbeat = threading.Thread(target=self.send_heartbeats)
+            heartbeat.daemon = True
+            heartbeat.start()
+            
+            # Close rooms nobody is using
+            reaper = threading.Thread(target=self.evict_idle_rooms)
+            reaper.daemon = True
+            reaper.start()
+            
+            # Coalesce guesses into one broadcast per room per tick
+            if self.batch_window:
+                self.batcher = GuessBatcher(self.batch_window, self.apply_guesses)
+                self.batcher.start()
 
             # After server start is successful:
             self.show_connection_info()
@@ -180,10 +260,34 @@ class PoE_Server:
             print(f"Error starting server: {e}")
             return False
         
+    def open_event_log(self):
+        """Restore the rooms a previous run left open, then log every meeting event from here on"""
+        from eventlog import EventLog
+        self.event_log = EventLog(self.event_log_path)
+        meetings = self.event_log.recover(self.rooms.meeting_factory)
+        for room_id, recovered in meetings.items():
+            if room_id == DEFAULT_ROOM:
+                # The host's UI holds on to its meeting object, so restore into it
+                self.meeting.restore(recovered.word, recovered.guessed_letters,
+                                     recovered.incorrect_guesses, recovered.state)
+                self.meeting.max_incorrect = recovered.max_incorrect
+            else:
+                self.rooms.add(PoE_Room(room_id, recovered))
+            self.recovered_rooms.append(room_id)
+        if meetings:
+            print(f"Recovered {len(meetings)} room(s) from {self.event_log_path}")
+        
+        self.event_log.start()
+        self.rooms.set_event_log(self.event_log)
+    
     def try_open_firewall_port(self):
         """Attempt to open the firewall port if possible"""
         try:
             if os.name == 'nt':  # Windows
+                import ctypes
+                import subprocess
+                import sys
+                
                 # Check if we're running with admin privileges
                 admin = False
                 try:
@@ -216,12 +320,12 @@ class PoE_Server:
 
     def start_zeroconf(self):
         """Start zeroconf service discovery"""
-        if not ZEROCONF_AVAILABLE:
-            print("Zeroconf not available; service discovery will not work")
+        zeroconf = load_zeroconf()
+        if not zeroconf:
             return False
         
         try:
-            self.zeroconf = Zeroconf()
+            self.zeroconf = zeroconf.Zeroconf()
             ip_addr = socket.gethostbyname(socket.gethostname())
             addresses = [socket.inet_aton(ip_addr)]
             properties = {
@@ -230,7 +334,7 @@ class PoE_Server:
                 'app': 'ProcessOfElimination'
             }
 
-            self.service_info = ServiceInfo(
+            self.service_info = zeroconf.ServiceInfo(
                 self.SERVICE_TYPE,
                 f"{self.SERVICE_NAME}.{self.SERVICE_TYPE}",
                 addresses=addresses,
@@ -253,60 +357,28 @@ class PoE_Server:
 
     def start_udp_discovery(self):
         """Start UDP broadcast discovery"""
+        responder = DiscoveryResponder(self.port, self.SERVICE_NAME, self.UDP_DISCOVERY_PORT)
         try:
-            self.udp_server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            self.udp_server.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            self.udp_server.bind(('0.0.0.0', self.UDP_DISCOVERY_PORT))
-
-            # Start thread to listen for discovery requests - fixed the method name
-            self.discovery_thread = threading.Thread(target=self.handle_discovery_requests)
-            self.discovery_thread.daemon = True
-            self.discovery_thread.start()
-
-            print(f"UDP discovery started on port {self.UDP_DISCOVERY_PORT}")
-
-            return True
+            responder.start()
         except Exception as e:
             print(f"Error starting UDP discovery: {e}")
-            if self.udp_server:
-                self.udp_server.close()
-                self.udp_server = None
             return False
-        
-    def handle_discovery_requests(self):
-        """listen for and respond to UDP discovery requests"""
-        while self.running:
-            try:
-                data, addr = self.udp_server.recvfrom(1024)
-                request = data.decode('utf-8')
-
-                if request == "DISCOVER_PROCESS_OF_ELIMINATION_SERVER":
-                    hostname = socket.gethostname()
-                    local_ip = socket.gethostbyname(hostname)
-                    response = json.dumps({
-                        "type": "server_info",
-                        "host": local_ip,
-                        "port": self.port,
-                        "name": self.SERVICE_NAME
-                    }).encode('utf-8')
-                    self.udp_server.sendto(response, addr)
-                    print(f"Responding to discovery request from {addr}")
-            except Exception as e:
-                if self.running:
-                    print(f"Error handling discovery request: {e}")
-                    time.sleep(1)
+        self.udp_server = responder
+        print(f"UDP discovery started on port {self.UDP_DISCOVERY_PORT}")
+        return True
 
     def register_service(self):
         """ register service using zeroconf/bonjour """
         try:
-            self.zeroconf = Zeroconf()
+            zeroconf = load_zeroconf()
+            self.zeroconf = zeroconf.Zeroconf()
             service_type = "_processOfElimination._tcp.local."
             service_name = f"Performing reductive analysis on {socket.gethostname()}:{self.port}.{service_type}"
             ip_addr = socket.gethostbyname(socket.gethostname())
             addresses = [socket.inet_aton(ip_addr)]
             properties = {}
 
-            self.service_info = ServiceInfo(
+            self.service_info = zeroconf.ServiceInfo(
                 service_type,
                 service_name,
                 addresses=addresses,
@@ -326,101 +398,317 @@ class PoE_Server:
                 client, address = self.server.accept()
                 print(f"Connection from {address}")
                 
-                # Add client to list
-                self.clients.append(client)
+                # Outbound traffic goes through a queued writer so broadcasts never block
+                writer = ClientWriter(
+                    client,
+                    address,
+                    self.client_snapshot,
+                    max_queue=self.max_queue,
+                    policy=self.slow_consumer_policy,
+                )
+                
+                # Add client to list; it gets the meeting state once it joins a room
+                self.add_client(writer)
                 
                 # Start thread to handle client
-                thread = threading.Thread(target=self.handle_client, args=(client,))
+                thread = threading.Thread(target=self.handle_client, args=(client, writer))
                 thread.daemon = True
                 thread.start()
-                
-                # Send current meeting state to new client
-                self.send_meeting_state(client)
             except Exception as e:
                 if self.running:
                     print(f"Error accepting connection: {e}")
                     time.sleep(1)
     
-    def handle_client(self, client):
+    def handle_client(self, client, writer=None):
+        decoder = FrameDecoder()
         while self.running:
             try:
-                data = client.recv(1024).decode('utf-8')
+                data = client.recv(RECV_SIZE)
                 if not data:
                     break
                 
-                message = json.loads(data)
-                self.process_message(message)
+                for frame in decoder.feed(data):
+                    self.process_message(decode_message(frame), writer)
+            except FrameError as e:
+                print(f"Dropping client with malformed stream: {e}")
+                break
             except Exception as e:
                 print(f"Error handling client: {e}")
                 break
         
         # Remove disconnected client
-        if client in self.clients:
-            self.clients.remove(client)
+        self.remove_client(writer)
     
-    def process_message(self, message):
-        if message["type"] == "guess":
-            letter = message["letter"]
-            self.meeting.propose_solution(letter)
+    def add_client(self, client):
+        """Track a new connection; it is subscribed to a room once it joins one"""
+        with self.clients_lock:
+            self.clients.append(client)
+
+    def remove_client(self, client):
+        """Stop broadcasting to a client and close its connection"""
+        if client is None:
+            return
+        if client.replica:
+            self.remove_replica(client)
+        if client.room:
+            client.room.remove_client(client)
+        with self.clients_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+        client.close()
+
+    def get_client_metrics(self):
+        """Queue depth and bytes sent for every connected client"""
+        return [client.metrics() for client in list(self.clients)]
+
+    def get_room(self, room_id=None):
+        """Room by ID; the default room when no ID is given"""
+        return self.default_room if room_id is None else self.rooms.get(room_id)
+
+    def client_snapshot(self, client):
+        """Latest full snapshot for a client's room, used when its queue overflows"""
+        if client.replica:
+            # A standby that fell behind needs every room again
+            return b"".join(room.snapshot_frame(client.codec) for room in self.rooms)
+        return (client.room or self.default_room).snapshot_frame(client.codec)
+
+    def join_room(self, client, room_id, session=None, since=None, codecs=None):
+        """Move a client into a room, creating the room on first join
+        
+        A client presenting a session token issued for this room resumes from
+        seq `since` and is sent only the deltas it missed. The welcome reply
+        names the codec picked from `codecs`; it is always JSON itself.
+        """
+        room = self.rooms.get_or_create(room_id or DEFAULT_ROOM)
+        if client.room is not room:
+            if client.room:
+                client.room.remove_client(client)
+            
+            resume = self.rooms.can_resume(session, room)
+            token = self.rooms.open_session(room, session if resume else None)
+            welcome = {"type": "welcome", "room": room.room_id, "session": token}
+            if self.standby:
+                welcome["standby"] = list(self.standby)
+            if codecs is not None:
+                client.codec = negotiate(codecs, self.codecs)
+                welcome["codec"] = client.codec
             
-            # Update UI and broadcast new state
-            self.ui.update_display()
-            self.broadcast_meeting_state()
+            if not (client.send_frame(control_frame(welcome))
+                    and room.add_client(client, since if resume else None)):
+                self.remove_client(client)
+        return room
+
+    def evict_idle_rooms(self):
+        """Periodically close rooms that nobody has been in for idle_timeout seconds"""
+        while self.running:
+            time.sleep(self.reap_interval)
+            for room_id in self.rooms.evict_idle():
+                print(f"Closed idle room {room_id}")
+
+    def add_replica(self, client, host, port, codecs=None, relay=False):
+        """Stream every room to a standby server and tell clients where it is
+        
+        The standby gets a welcome carrying this server's service name, a
+        snapshot of each room, then every broadcast and a heartbeat every
+        HEARTBEAT_INTERVAL seconds. A relay gets the same stream to pass on to
+        its spectators, but is not announced to clients.
+        
+        Only one standby is attached at a time: a standby reattaching from the
+        same address replaces its old connection, any other one is refused.
+        """
+        if not relay:
+            attached = [replica for replica in self.rooms.replicas if not replica.relay]
+            if attached and self.standby != (host, port):
+                print(f"Refused standby at {host}:{port}; {self.standby[0]}:{self.standby[1]} is attached")
+                self.remove_client(client)
+                return
+            for replica in attached:
+                self.remove_client(replica)
+        
+        client.replica = True
+        client.relay = relay
+        client.codec = negotiate(codecs, self.codecs) if codecs is not None else CODEC_JSON
+        welcome = {"type": "welcome", "role": "relay" if relay else "replica", "name": self.SERVICE_NAME,
+                   "codec": client.codec}
+        
+        rooms = list(self.rooms)
+        with contextlib.ExitStack() as locks:
+            # With every room locked, no delta can reach the standby ahead of its room's snapshot
+            for room in rooms:
+                locks.enter_context(room.lock)
+            frames = [control_frame(welcome)]
+            frames.extend(room.snapshot_frame(client.codec) for room in rooms)
+            sent = all(client.send_frame(frame) for frame in frames)
+            if sent:
+                self.rooms.replicas.append(client)
+        if not sent:
+            self.remove_client(client)
+            return
+        
+        if relay:
+            print(f"Relay attached from {client.address}")
+            return
+        self.standby = (host, port)
+        print(f"Standby server attached at {host}:{port}")
+        self.broadcast_control({"type": "standby", "host": host, "port": port})
     
-    def send_meeting_state(self, client=None):
-        meeting_state = self.meeting.get_meeting_state()
-        message = {
-            "type": "meeting_state",
-            "data": {
-                "actual_word": meeting_state["word"],
-                "display_word": meeting_state["display_word"],
-                "guessed_letters": meeting_state["guessed_letters"],
-                "incorrect_guesses": meeting_state["incorrect_guesses"],
-                "max_incorrect": meeting_state["max_incorrect"],
-                "state": meeting_state["state"].value
-            }
-        }
+    def trusts_standby(self, secret):
+        if self.standby_secret is None or not isinstance(secret, str):
+            return False
+        return hmac.compare_digest(secret.encode("utf-8"), self.standby_secret.encode("utf-8"))
+    
+    def remove_replica(self, client):
+        if client in self.rooms.replicas:
+            self.rooms.replicas.remove(client)
+        if client.relay:
+            print(f"Relay at {client.address} detached")
+        if self.standby and not any(not replica.relay for replica in self.rooms.replicas):
+            print(f"Standby server at {self.standby[0]}:{self.standby[1]} detached")
+            self.standby = None
+            self.broadcast_control({"type": "standby", "host": None, "port": None})
+    
+    def broadcast_control(self, message):
+        """Send a JSON message to every player in every room"""
+        frame = control_frame(message)
+        for client in list(self.clients):
+            if client.room and not client.replica:
+                client.send_frame(frame)
+    
+    def send_heartbeats(self):
+        frame = control_frame({"type": "heartbeat"})
+        while self.running:
+            time.sleep(HEARTBEAT_INTERVAL)
+            for client in list(self.rooms.replicas):
+                if not client.send_frame(frame):
+                    self.remove_client(client)
+    
+    def process_message(self, message, client=None):
+        if message["type"] in ("replicate", "relay"):
+            if client:
+                if message["type"] == "replicate" and not self.trusts_standby(message.get("secret")):
+                    # Players reconnect to whatever standby is announced, so only a configured one may attach
+                    print(f"Refused standby request from {client.address}")
+                    self.remove_client(client)
+                    return
+                host = message.get("host") or (client.address[0] if isinstance(client.address, tuple) else None)
+                self.add_replica(client, host, message["port"], message.get("codecs"),
+                                 relay=message["type"] == "relay")
+            return
+        
+        if client and client.replica:
+            if message["type"] == "sync" and message.get("room"):
+                # A standby saw a room it has no snapshot of, or a gap in one
+                room = self.rooms.get(message["room"])
+                if room:
+                    with room.lock:
+                        client.send_frame(room.snapshot_frame(client.codec))
+            return
+        
+        if client and message["type"] != "join" and client.room is None:
+            # Clients that skip the join message land in the default room
+            self.join_room(client, DEFAULT_ROOM)
+        
+        if message["type"] == "join":
+            if client:
+                client.spectator = bool(message.get("spectate"))
+                self.join_room(client, message.get("room"), message.get("session"), message.get("seq"),
+                               message.get("codecs"))
+        
+        elif message["type"] == "guess":
+            if self.read_only or (client and client.spectator):
+                return
+            if client and not self.allow_guess(client):
+                return
+            
+            room = client.room if client else self.default_room
+            label = client.label if client else None
+            if self.batcher:
+                self.batcher.add(room, message["letter"], label)
+            else:
+                self.apply_guesses(room, [message["letter"]], [label])
         
-        data = json.dumps(message).encode('utf-8')
+        elif message["type"] == "sync" and client:
+            # Client saw a gap in the delta sequence and needs a fresh snapshot
+            self.send_meeting_state(client)
+    
+    def allow_guess(self, client):
+        """Token-bucket check so one client cannot flood the server with guesses"""
+        if self.guess_rate is None:
+            return True
+        if client.guess_bucket is None:
+            client.guess_bucket = TokenBucket(self.guess_rate, self.guess_burst)
+        if client.guess_bucket.take():
+            return True
+        client.guesses_limited += 1
+        return False
+    
+    def apply_guesses(self, room, letters, clients=None):
+        """Apply guesses in arrival order and broadcast the result as a single delta"""
+        changed, disconnected_clients = room.propose_solutions(letters, clients)
+        for gone in disconnected_clients:
+            self.remove_client(gone)
         
+        # Update UI; only the default room is shown on the host
+        if changed and room is self.default_room:
+            notify_ui(self.ui)
+    
+    def snapshot_frame(self, room=None):
+        """Encoded meeting_state frame for a room's current seq, built once per version"""
+        return (room or self.default_room).snapshot_frame()
+    
+    def send_meeting_state(self, client=None, room=None):
         if client:
-            try:
-                client.send(data)
-            except Exception as e:
-                print(f"Error sending to client: {e}")
-                if client in self.clients:
-                    self.clients.remove(client)
+            room = client.room or self.default_room
+            with room.lock:
+                if not client.send_frame(room.snapshot_frame(client.codec)):
+                    self.remove_client(client)
         else:
-            # Broadcast to all clients
-            self.broadcast(data)
+            # Broadcast to all clients in the room
+            room = room or self.default_room
+            with room.lock:
+                self.broadcast(room.snapshot(), room)
     
-    def broadcast_meeting_state(self):
-        self.send_meeting_state()
+    def broadcast_meeting_state(self, room=None):
+        """Announce a change made outside a guess (new word, meeting started) as a new version"""
+        for client in (room or self.default_room).broadcast_meeting_state():
+            self.remove_client(client)
     
-    def broadcast(self, message):
-        disconnected_clients = []
-        
-        for client in self.clients:
-            try:
-                client.send(message)
-            except Exception as e:
-                print(f"Error broadcasting to client: {e}")
-                disconnected_clients.append(client)
+    def broadcast(self, message, room=None):
+        """Queue an EncodedMessage on every client in a room, in each client's codec, without blocking"""
+        disconnected_clients = (room or self.default_room).broadcast(message)
         
         # Remove disconnected clients
         for client in disconnected_clients:
-            if client in self.clients:
-                self.clients.remove(client)
+            self.remove_client(client)
     
-    def start_new_meeting(self):
-        self.meeting.reset_meeting()
-        self.meeting.start_meeting()
-        self.ui.update_display()
-        self.broadcast_meeting_state()
+    def start_new_meeting(self, room=None):
+        room = room or self.default_room
+        with room.lock:
+            room.meeting.reset_meeting()
+            room.meeting.start_meeting()
+            
+            # A new word cannot be expressed as a delta
+            self.broadcast_meeting_state(room)
+        if room is self.default_room:
+            notify_ui(self.ui)
     
     def stop(self):
         self.running = False
 
+        if self.batcher:
+            self.batcher.stop()
+
+        if self.async_engine:
+            self.async_engine.stop()
+
+        if self.event_log:
+            # A final snapshot per room means the next start has no tail to replay
+            for room in self.rooms:
+                with room.lock:
+                    if room.journal:
+                        room.journal.snapshot()
+            self.event_log.close()
+
         for client in self.clients:
             try:
                 client.close()
@@ -446,198 +734,272 @@ class PoE_Server:
                 pass
 
 class PoE_Client:
-    def __init__(self, meeting, ui, host=None, port=5555):
+    def __init__(self, meeting, ui, host=None, port=5555, room=None, discovery_cache=None, auto_reconnect=True,
+                 codecs=SUPPORTED_CODECS, spectate=False):
         self.meeting = meeting
         self.ui = ui
         self.host = host
         self.port = port
         
+        # Meeting to join on the server; None means the host's default room
+        self.room = room
+        
+        # Watch the meeting without taking part; a relay can serve spectators instead of the host
+        self.spectate = spectate
+        
         # TCP client
         self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.running = False
         
-        # Discovery mechanisms
+        # Sequence number of the last state applied; None until the first snapshot
+        self.seq = None
+        self.awaiting_sync = False
+        
+        # Token the server issued on join; presented with seq to resume after a drop
+        self.session = None
+        self.auto_reconnect = auto_reconnect
+        self.reconnect_attempts = RECONNECT_MAX_ATTEMPTS
+        
+        # Standby server the host announced, as (host, port); tried when the host is unreachable
+        self.standby = None
+        
+        # Wire formats to offer on join, preferred first; pass [CODEC_JSON] to debug with readable frames
+        self.codecs = codecs
+        self.codec = CODEC_JSON
+        
+        # Discovery mechanisms; per-method outcome and latency of the last discovery run
         self.network_mode = None
-        self.zeroconf = None
-        self.discovered_servers = []
+        self.discovery_report = {}
+        
+        # Servers joined recently; tried before any network-wide search
+        self.discovery_cache = discovery_cache if discovery_cache is not None else DiscoveryCache()
         
         # Service constants
         self.SERVICE_TYPE = "_poe._tcp.local."
         self.UDP_DISCOVERY_PORT = 5556
     
     def connect(self):
-        """Connect with automatic server discovery"""
-        if self.host:
-            if ":" in self.host:
-                host_parts = self.host.split(":")
-                if len(host_parts) == 2 and host_parts[1].isdigit():
-                    self.host = host_parts[0]
-                    self.port = int(host_parts[1])
-
-                if self.connect_direct(self.host, self.port):
-                    return True
-                
-                common_ports = [80, 443, 8080, 5000, 5555]
-                for port in common_ports:
-                    if port != self.port and self.connect_direct(self.host, port):
-                        return True
-        
-        # Try discovery methods in order
-        if self.discover_via_zeroconf():
-            self.network_mode = NetworkMode.ZEROCONF
-            return True
+        """Connect with automatic server discovery
         
-        if self.discover_via_udp():
-            self.network_mode = NetworkMode.UDP_BROADCAST
-            return True
+        Direct probes of the given host, Zeroconf and UDP broadcast race each
+        other; the first to reach a server wins and the others are cancelled.
+        """
+        port = self.port
+        if self.host and ":" in self.host:
+            host_parts = self.host.split(":")
+            if len(host_parts) == 2 and host_parts[1].isdigit():
+                self.host = host_parts[0]
+                port = int(host_parts[1])
         
-        print("All automatic discovery methods failed.")
-        return False
+        return self.discover(self.discovery_engine(host=self.host, port=port))
+    
+    def discovery_engine(self, **kwargs):
+        return DiscoveryEngine(
+            service_type=self.SERVICE_TYPE,
+            udp_port=self.UDP_DISCOVERY_PORT,
+            cache=self.discovery_cache,
+            **kwargs
+        )
+    
+    def discover(self, engine):
+        """Run a discovery race and connect through the winning socket"""
+        result = engine.run()
+        self.discovery_report = engine.report
+        for line in engine.summary():
+            print(f"Discovery {line}")
+        
+        if not result:
+            print("All automatic discovery methods failed.")
+            return False
+        
+        # Check the other remembered servers while this session runs; the winner was just measured
+        self.discovery_cache.refresh_in_background(skip=(result.host, result.port))
+        
+        if result.method.startswith((NetworkMode.DIRECT, "cache:")):
+            mode = NetworkMode.DIRECT
+        else:
+            mode = result.method
+        return self.attach(result.sock, result.host, result.port, mode)
     
     def connect_direct(self, host, port):
         """Direct connection to specified host:port"""
         try:
-            self.client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.client.connect((host, port))
-            self.host = host
-            self.port = port
-            self.running = True
-            self.network_mode = NetworkMode.DIRECT
-            
-            # Start thread to receive messages
-            thread = threading.Thread(target=self.receive_messages)
-            thread.daemon = True
-            thread.start()
-            
-            print(f"Connected directly to {host}:{port}")
-            return True
+            sock = socket.create_connection((host, port))
         except Exception as e:
             print(f"Direct connection failed: {e}")
             return False
+        return self.attach(sock, host, port, NetworkMode.DIRECT)
     
-    def discover_via_zeroconf(self):
-        """Discover servers using Zeroconf"""
-        try:
-            print("Searching for servers via Zeroconf...")
-            self.zeroconf = Zeroconf()
-            listener = DiscoveryListener()
-            browser = ServiceBrowser(self.zeroconf, self.SERVICE_TYPE, listener)
-            
-            # Wait for services to be discovered (with timeout)
-            found = listener.event.wait(timeout=5.0)
-            
-            if found and listener.services:
-                # Get the first discovered service
-                service_name = next(iter(listener.services))
-                service_info = listener.services[service_name]
-                
-                # Get host and port
-                if service_info.addresses:
-                    host = socket.inet_ntoa(service_info.addresses[0])
-                    port = service_info.port
-                    print(f"Found server via Zeroconf: {host}:{port}")
-                    
-                    # Connect to the discovered server
-                    result = self.connect_direct(host, port)
-                    
-                    # Clean up Zeroconf
-                    browser.cancel()
-                    self.zeroconf.close()
-                    self.zeroconf = None
-                    
-                    return result
-            
-            # Clean up Zeroconf if no server found
-            browser.cancel()
-            self.zeroconf.close()
-            self.zeroconf = None
-            print("No servers found via Zeroconf")
-            return False
-            
-        except Exception as e:
-            print(f"Zeroconf discovery failed: {e}")
-            if self.zeroconf:
-                self.zeroconf.close()
-                self.zeroconf = None
-            return False
+    def attach(self, sock, host, port, mode):
+        """Start the session on an already connected socket"""
+        self.client = sock
+        self.host = host
+        self.port = port
+        self.running = True
+        self.network_mode = mode
+        
+        # Start thread to receive messages
+        thread = threading.Thread(target=self.receive_messages, args=(sock,))
+        thread.daemon = True
+        thread.start()
+        
+        # The server sends the meeting state, or just what we missed, once we have joined a room
+        # Until the welcome names a codec, everything is sent as JSON
+        self.codec = CODEC_JSON
+        join = {
+            "type": "join",
+            "room": self.room,
+            "session": self.session,
+            # A sync still outstanding from the last connection needs a snapshot, not the deltas after seq
+            "seq": None if self.awaiting_sync else self.seq,
+            "codecs": self.codecs,
+        }
+        if self.spectate:
+            join["spectate"] = True
+        self.send_message(join)
+        
+        print(f"Connected via {mode} to {host}:{port}")
+        return True
     
-    def discover_via_udp(self):
-        """Discover servers using UDP broadcast"""
+    def reconnect(self):
+        """Re-establish a dropped connection with exponential backoff and resume the session"""
         try:
-            print("Searching for servers via UDP broadcast...")
-            udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            udp_socket.settimeout(5.0)  # Set timeout for discovery
-            
-            # Send discovery broadcast
-            broadcast_message = "DISCOVER_PROCESS_OF_ELIMINATION_SERVER"
-            udp_socket.sendto(broadcast_message.encode('utf-8'), ('<broadcast>', self.UDP_DISCOVERY_PORT))
-            
-            # Wait for responses with timeout
-            start_time = time.time()
-            self.discovered_servers = []
+            self.client.close()
+        except:
+            pass
+        
+        delay = RECONNECT_BASE_DELAY
+        for attempt in range(1, self.reconnect_attempts + 1):
+            # Jitter keeps a room full of clients from reconnecting in lockstep
+            time.sleep(random.uniform(delay / 2, delay))
+            if not self.running:
+                return False
             
-            while time.time() - start_time < 5.0:  # 5 second timeout
+            # The host first, then the standby that takes over if the host died
+            sock = None
+            for host, port in [(self.host, self.port)] + ([self.standby] if self.standby else []):
+                print(f"Reconnecting to {host}:{port} (attempt {attempt})")
                 try:
-                    data, addr = udp_socket.recvfrom(1024)
-                    response = json.loads(data.decode('utf-8'))
-                    
-                    if response["type"] == "server_info":
-                        self.discovered_servers.append(response)
-                        print(f"Found server via UDP: {response['host']}:{response['port']}")
-                except socket.timeout:
+                    sock = socket.create_connection((host, port), timeout=DEFAULT_CONNECT_TIMEOUT)
+                    sock.settimeout(None)
                     break
-                except Exception as e:
-                    print(f"Error receiving UDP response: {e}")
-            
-            udp_socket.close()
-            
-            # Connect to the first discovered server
-            if self.discovered_servers:
-                server = self.discovered_servers[0]
-                return self.connect_direct(server["host"], server["port"])
-            
-            print("No servers found via UDP broadcast")
-            return False
+                except OSError:
+                    sock = None
+            if sock is None:
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                continue
             
-        except Exception as e:
-            print(f"UDP discovery failed: {e}")
-            return False
+            if not self.running:
+                sock.close()
+                return False
+            if (host, port) == self.standby:
+                # The standby is the host now; it will announce its own standby, if any
+                self.standby = None
+            return self.attach(sock, host, port, self.network_mode)
+        
+        print("Could not reconnect to the server")
+        self.disconnect()
+        return False
+    
+    def discover_via_zeroconf(self):
+        """Discover servers using Zeroconf"""
+        return self.discover(self.discovery_engine(udp=False))
+    
+    def discover_via_udp(self):
+        """Discover servers using UDP broadcast"""
+        return self.discover(self.discovery_engine(zeroconf=False))
 
-    def receive_messages(self):
+    def receive_messages(self, sock=None):
+        sock = sock or self.client
+        decoder = FrameDecoder()
         while self.running:
             try:
-                data = self.client.recv(1024).decode('utf-8')
+                data = sock.recv(RECV_SIZE)
                 if not data:
                     break
                 
-                message = json.loads(data)
-                self.process_message(message)
+                for frame in decoder.feed(data):
+                    self.process_message(decode_message(frame))
             except Exception as e:
                 if self.running:
                     print(f"Error receiving message: {e}")
                     break
         
-        self.disconnect()
+        # A connection that was replaced or closed on purpose needs no cleanup here
+        if sock is not self.client:
+            return
+        if self.running and self.auto_reconnect:
+            self.reconnect()
+        else:
+            self.disconnect()
     
     def process_message(self, message):
-        if message["type"] == "meeting_state":
+        if message["type"] == "welcome":
+            self.session = message["session"]
+            self.codec = message.get("codec", CODEC_JSON)
+            if message.get("standby"):
+                self.standby = tuple(message["standby"])
+        
+        elif message["type"] == "standby":
+            self.standby = (message["host"], message["port"]) if message.get("host") else None
+        
+        elif message["type"] == "meeting_state":
             data = message["data"]
             
             # Update meeting state based on server data
             from logic import Transcript
             
-            # Update guessed letters
-            self.meeting.word = data["actual_word"]
-            self.meeting.guessed_letters = set(data["guessed_letters"])
-            self.meeting.incorrect_guesses = data["incorrect_guesses"]
-            self.meeting.state = Transcript(data["state"])
+            # Replace word, guessed letters and counters in one step
+            self.meeting.restore(
+                data["actual_word"],
+                data["guessed_letters"],
+                data["incorrect_guesses"],
+                Transcript(data["state"])
+            )
+            
+            self.seq = message.get("seq")
+            self.awaiting_sync = False
             
             # Update UI
-            self.ui.root.after(0, self.ui.update_display)
+            self.notify_ui()
+        
+        elif message["type"] == "meeting_delta":
+            if self.awaiting_sync or self.seq is None:
+                return
+            
+            if message["seq"] <= self.seq:
+                # Already applied
+                return
+            
+            if message["seq"] != self.seq + 1:
+                # Missed an update; ask for a full snapshot and drop deltas until it arrives
+                self.awaiting_sync = True
+                self.send_message({"type": "sync"})
+                return
+            
+            self.apply_delta(message["data"])
+            self.seq = message["seq"]
+            
+            # Update UI
+            self.notify_ui()
+    
+    def notify_ui(self):
+        notify_ui(self.ui)
+    
+    def apply_delta(self, data):
+        """Apply the letters, counters and state change from a meeting_delta"""
+        from logic import Transcript
+        
+        for letter in data["letters"]:
+            self.meeting.reveal(letter)
+        self.meeting.incorrect_guesses = data["incorrect_guesses"]
+        self.meeting.state = Transcript(data["state"])
     
     def propose_solution(self, letter):
+        if self.spectate:
+            print("Spectators cannot propose solutions")
+            return
+        
         message = {
             "type": "guess",
             "letter": letter
@@ -647,11 +1009,18 @@ class PoE_Client:
     
     def send_message(self, message):
         try:
-            data = json.dumps(message).encode('utf-8')
-            self.client.send(data)
+            data = encode_frame(encode_message(message, self.codec))
+            self.client.sendall(data)
         except Exception as e:
             print(f"Error sending message: {e}")
-            self.disconnect()
+            if self.auto_reconnect:
+                # Wake the receive thread, which owns reconnecting
+                try:
+                    self.client.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            else:
+                self.disconnect()
     
     def disconnect(self):
         self.running = False
@@ -0,0 +1,61 @@
+"""Relay that serves a host's meetings to spectators
+
+A relay attaches to the host the way a standby does and receives one copy of
+every room's broadcasts. It mirrors them into its own read-only PoE_Server
+and broadcasts each change again to the spectators connected to it, with
+the host's version numbers, so spectators can resume and ask for snapshots
+just as they would on the host. The host's fan-out cost grows with the
+number of relays, not with the number of people watching.
+
+Spectators connect to a relay with PoE_Client(spectate=True); a guess sent
+to a relay is ignored. A relay whose host goes away keeps serving the last
+state and keeps trying to attach again; it never takes over.
+"""
+
+import time
+
+from codec import CODEC_JSON
+from replication import DEFAULT_FAILOVER_TIMEOUT, PoE_Standby
+
+# Seconds between attempts to attach to a host that dropped the stream
+RELAY_RETRY_DELAY = 1.0
+
+class PoE_Relay(PoE_Standby):
+    """Mirror a host's rooms into a started, read-only PoE_Server and re-broadcast every change"""
+    REQUEST = "relay"
+    ROLE = "Relaying"
+
+    def __init__(self, server, primary_host, primary_port, failover_timeout=DEFAULT_FAILOVER_TIMEOUT,
+                 codecs=(CODEC_JSON,)):
+        super().__init__(server, primary_host, primary_port, failover_timeout, codecs=codecs)
+
+        # Metrics
+        self.broadcasts = 0
+        self.spectators_dropped = 0
+
+    def run(self):
+        while self.running:
+            self.replicate()
+            if self.running:
+                time.sleep(RELAY_RETRY_DELAY)
+
+    def mirrored(self, room, message):
+        if message["type"] == "meeting_state":
+            # Deltas cannot be replayed across a version that only exists as a snapshot
+            broadcast = room.snapshot()
+        else:
+            broadcast = room.delta(message["data"]["letters"])
+            room.history.append((room.seq, broadcast))
+        self.broadcasts += 1
+
+        for client in room.broadcast(broadcast):
+            self.spectators_dropped += 1
+            self.server.remove_client(client)
+
+    def metrics(self):
+        return {
+            "messages": self.messages,
+            "broadcasts": self.broadcasts,
+            "spectators": sum(len(room.clients) for room in self.server.rooms),
+            "spectators_dropped": self.spectators_dropped,
+        }
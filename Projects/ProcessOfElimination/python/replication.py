@@ -0,0 +1,226 @@
+"""Hot standby for a PoE_Server
+
+A standby connects to the host as a replica and mirrors every room from the
+host's own broadcasts: a snapshot of each room when it attaches, then every
+delta and snapshot as they are sent to players. The host tells its players
+where the standby is, so their reconnect loop tries it once the host stops
+answering. For that reason the host only streams to a standby that sends the
+secret it was started with (headless.py --standby-secret), and to one
+standby at a time.
+
+When the replication stream goes quiet for longer than failover_timeout or
+the connection drops, and the host's port no longer accepts connections, the
+standby starts its own PoE_Server. That server holds the mirrored rooms and
+advertises itself under the host's service name over Zeroconf or UDP
+discovery.
+"""
+
+import socket
+import threading
+import time
+
+from codec import CODEC_JSON, decode_message, encode_message
+from discovery import DEFAULT_CONNECT_TIMEOUT
+from framing import FrameDecoder, RECV_SIZE, encode_frame
+from logic import Transcript
+from network import HEARTBEAT_INTERVAL
+
+# Silence on the replication stream that counts as the host being gone
+DEFAULT_FAILOVER_TIMEOUT = 4 * HEARTBEAT_INTERVAL
+
+# Seconds between attempts to reach a host that is alive but dropped the stream
+REPLICA_RETRY_DELAY = 0.1
+
+class PoE_Standby:
+    """Mirror a host's rooms into a PoE_Server that is not started until the host fails"""
+    # Message that asks the host for the replication stream, and what the log calls attaching
+    REQUEST = "replicate"
+    ROLE = "Standing by"
+    
+    def __init__(self, server, primary_host, primary_port, failover_timeout=DEFAULT_FAILOVER_TIMEOUT,
+                 advertise_host=None, codecs=(CODEC_JSON,), secret=None):
+        self.server = server
+        self.primary_host = primary_host
+        self.primary_port = primary_port
+        self.failover_timeout = failover_timeout
+
+        # Address the host hands its players for this standby; the host uses
+        # the address it sees this connection come from when this is None
+        self.advertise_host = advertise_host
+
+        # Binary frames do not name their room, so the stream stays JSON unless told otherwise
+        self.codecs = list(codecs)
+
+        # Shared with the host, which turns away a standby without it
+        self.secret = secret
+
+        self.sock = None
+        self.running = False
+        self.thread = None
+        self.took_over = threading.Event()
+
+        # Set when the host closed the stream without welcoming us
+        self.refused = False
+
+        # Service name the host advertises; reused when taking over
+        self.primary_name = None
+
+        # Metrics
+        self.messages = 0
+        self.last_message = None
+        self.failure_detected_at = None
+        self.took_over_at = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.sock:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def wait(self, timeout=None):
+        """Block until the standby has taken over; True if it has"""
+        return self.took_over.wait(timeout)
+
+    def run(self):
+        while self.running:
+            if self.replicate():
+                if self.refused:
+                    print(f"Host {self.primary_host}:{self.primary_port} refused this standby; "
+                          f"check the standby secret, or whether another standby is attached")
+                    self.running = False
+                    return
+                # The stream ended but the host still accepts connections; attach again
+                time.sleep(REPLICA_RETRY_DELAY)
+                continue
+            if self.running:
+                self.take_over()
+            return
+
+    def replicate(self):
+        """Mirror the host until the stream ends; True to attach again, False to take over"""
+        try:
+            sock = socket.create_connection((self.primary_host, self.primary_port), timeout=DEFAULT_CONNECT_TIMEOUT)
+        except OSError as e:
+            print(f"Standby could not reach host {self.primary_host}:{self.primary_port}: {e}")
+            # Keep waiting for a host that has not come up yet; one we were mirroring is gone
+            if self.primary_name is None:
+                return True
+            self.failure_detected_at = time.monotonic()
+            return False
+
+        # Heartbeats arrive every HEARTBEAT_INTERVAL, so a timeout means the host is gone
+        sock.settimeout(self.failover_timeout)
+        self.sock = sock
+        self.send(sock, {
+            "type": self.REQUEST,
+            "host": self.advertise_host,
+            "port": self.server.port,
+            "codecs": self.codecs,
+            "secret": self.secret,
+        })
+        print(f"{self.ROLE} for {self.primary_host}:{self.primary_port}")
+
+        decoder = FrameDecoder()
+        welcomed = closed = False
+        try:
+            while self.running:
+                data = sock.recv(RECV_SIZE)
+                if not data:
+                    closed = True
+                    break
+                self.last_message = time.monotonic()
+                for frame in decoder.feed(data):
+                    message = decode_message(frame)
+                    welcomed = welcomed or message["type"] == "welcome"
+                    self.apply(message, sock)
+        except socket.timeout:
+            # A stream that stalled, like one that dropped, only means the host is gone if its port is too
+            print(f"No heartbeat from host for {self.failover_timeout:.1f}s")
+        except Exception as e:
+            if self.running:
+                print(f"Replication stream lost: {e}")
+        finally:
+            sock.close()
+
+        self.failure_detected_at = time.monotonic()
+        alive = self.running and self.primary_alive()
+        # A live host that closed the stream before its welcome has turned us away
+        self.refused = alive and closed and not welcomed
+        return alive
+
+    def primary_alive(self):
+        """Whether the host's port still accepts connections"""
+        try:
+            socket.create_connection((self.primary_host, self.primary_port), timeout=DEFAULT_CONNECT_TIMEOUT).close()
+            return True
+        except OSError:
+            return False
+
+    def send(self, sock, message):
+        sock.sendall(encode_frame(encode_message(message, CODEC_JSON)))
+
+    def apply(self, message, sock):
+        """Mirror one message from the host into the standby server's rooms"""
+        self.messages += 1
+        kind = message["type"]
+        if kind == "welcome":
+            self.primary_name = message.get("name")
+            return
+        if kind not in ("meeting_state", "meeting_delta"):
+            return
+
+        room_id = message.get("room")
+        room = self.server.rooms.get_or_create(room_id) if kind == "meeting_state" else self.server.rooms.get(room_id)
+        if room is None:
+            # A delta for a room the host created after we attached
+            self.send(sock, {"type": "sync", "room": room_id})
+            return
+
+        with room.lock:
+            if kind == "meeting_state":
+                data = message["data"]
+                room.meeting.restore(data["actual_word"], data["guessed_letters"], data["incorrect_guesses"],
+                                     Transcript(data["state"]))
+                room.meeting.max_incorrect = data["max_incorrect"]
+                room.history.clear()
+            elif message["seq"] != room.seq + 1:
+                if message["seq"] > room.seq:
+                    self.send(sock, {"type": "sync", "room": room_id})
+                return
+            else:
+                data = message["data"]
+                for letter in data["letters"]:
+                    room.meeting.reveal(letter)
+                room.meeting.incorrect_guesses = data["incorrect_guesses"]
+                room.meeting.state = Transcript(data["state"])
+
+            # Same version numbers as the host, so nothing looks stale to a player
+            room.seq = message["seq"]
+            room.snapshot_cache = None
+            self.mirrored(room, message)
+    
+    def mirrored(self, room, message):
+        """Called with the room locked after a host message was applied to it"""
+        pass
+
+    def take_over(self):
+        """Serve the mirrored rooms under the host's advertised name"""
+        if self.primary_name:
+            self.server.SERVICE_NAME = self.primary_name
+        if not self.server.start():
+            print("Standby failed to start its server")
+            return False
+        self.took_over_at = time.monotonic()
+        if self.failure_detected_at is not None:
+            print(f"Took over from {self.primary_host}:{self.primary_port} "
+                  f"{(self.took_over_at - self.failure_detected_at) * 1000:.0f} ms after detecting the failure")
+        self.took_over.set()
+        return True
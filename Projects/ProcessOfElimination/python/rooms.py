@@ -0,0 +1,268 @@
+import collections
+import secrets
+import threading
+import time
+
+from codec import CODEC_JSON, EncodedMessage
+from logic import PoE_Meeting
+
+# Room used by clients that do not ask for one, and by the host's own UI
+DEFAULT_ROOM = "default"
+
+# Seconds an empty room is kept before it is evicted
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+# Recent deltas kept per room so a reconnecting client can catch up without a snapshot
+DEFAULT_HISTORY_SIZE = 256
+
+# Session tokens remembered for resuming; the oldest are forgotten first
+MAX_SESSIONS = 10000
+
+def new_meeting():
+    """Meeting for a room created on demand: random word, already in progress"""
+    meeting = PoE_Meeting()
+    meeting.start_meeting()
+    return meeting
+
+class PoE_Room:
+    """One meeting plus the clients subscribed to its broadcasts"""
+    def __init__(self, room_id, meeting, persistent=False, history_size=DEFAULT_HISTORY_SIZE):
+        self.room_id = room_id
+        self.meeting = meeting
+        self.persistent = persistent
+        self.clients = []
+
+        # Version of the meeting state; bumped on every change that is broadcast
+        self.seq = 0
+        self.lock = threading.RLock()
+
+        # Snapshot message for the current seq, encoded once per codec and shared by every client
+        self.snapshot_cache = None
+
+        # (seq, EncodedMessage) for the most recent deltas, oldest first
+        self.history = collections.deque(maxlen=history_size)
+
+        self.last_active = time.monotonic()
+
+        # eventlog.RoomJournal while the server keeps an event log
+        self.journal = None
+
+        # Standby servers receiving every broadcast; shared by all rooms of a registry
+        self.replicas = []
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def is_idle(self, now, idle_timeout):
+        return not self.persistent and not self.clients and now - self.last_active >= idle_timeout
+
+    def snapshot(self):
+        """meeting_state message for the current seq, built once per version"""
+        cache = self.snapshot_cache
+        if cache and cache[0] == self.seq:
+            return cache[1]
+
+        meeting_state = self.meeting.get_meeting_state()
+        message = {
+            "type": "meeting_state",
+            "room": self.room_id,
+            "seq": self.seq,
+            "data": {
+                "actual_word": meeting_state["word"],
+                "display_word": meeting_state["display_word"],
+                "guessed_letters": meeting_state["guessed_letters"],
+                "incorrect_guesses": meeting_state["incorrect_guesses"],
+                "max_incorrect": meeting_state["max_incorrect"],
+                "state": meeting_state["state"].value
+            }
+        }
+
+        snapshot = EncodedMessage(message)
+        self.snapshot_cache = (self.seq, snapshot)
+        return snapshot
+
+    def snapshot_frame(self, codec=CODEC_JSON):
+        """Encoded meeting_state frame for the current seq"""
+        return self.snapshot().frame(codec)
+
+    def delta(self, letters):
+        """meeting_delta message for the change that produced the current seq"""
+        message = {
+            "type": "meeting_delta",
+            "room": self.room_id,
+            "seq": self.seq,
+            "data": {
+                "letters": letters,
+                "incorrect_guesses": self.meeting.incorrect_guesses,
+                "state": self.meeting.state.value
+            }
+        }
+
+        return EncodedMessage(message)
+
+    def replay_frames(self, since, codec=CODEC_JSON):
+        """Delta frames after seq `since`, or None if the history no longer reaches back that far"""
+        if since is None or since > self.seq:
+            return None
+        if since == self.seq:
+            return []
+        if not self.history or self.history[0][0] > since + 1:
+            return None
+        return [delta.frame(codec) for seq, delta in self.history if seq > since]
+
+    def add_client(self, client, since=None):
+        """Bring a client up to date, then include it in broadcasts
+
+        A client resuming from seq `since` is sent only the deltas it missed
+        when they are still in the history; anyone else gets the full state.
+        """
+        # Holding the lock keeps any delta from reaching the client before its catch-up
+        with self.lock:
+            client.room = self
+            self.clients.append(client)
+            self.touch()
+
+            frames = self.replay_frames(since, client.codec)
+            if frames is None:
+                frames = [self.snapshot_frame(client.codec)]
+            return all(client.send_frame(frame) for frame in frames)
+
+    def remove_client(self, client):
+        with self.lock:
+            if client in self.clients:
+                self.clients.remove(client)
+                self.touch()
+            if client.room is self:
+                client.room = None
+
+    def broadcast(self, message):
+        """Queue an EncodedMessage on every client in its codec; returns the clients that are gone"""
+        targets = self.clients + self.replicas if self.replicas else list(self.clients)
+        return [client for client in targets if not client.send_frame(message.frame(client.codec))]
+
+    def propose_solution(self, letter):
+        """Apply a guess and broadcast it as a delta; returns (changed, disconnected clients)"""
+        changed, gone = self.propose_solutions([letter])
+        return bool(changed), gone
+
+    def propose_solutions(self, letters, clients=None):
+        """Apply guesses in order and broadcast every change as one delta
+
+        clients, if given, names who sent each letter for the event log.
+        Returns (letters that changed the meeting, disconnected clients).
+        """
+        with self.lock:
+            self.touch()
+            clients = clients or [None] * len(letters)
+            changed = [letter.upper() for letter, client in zip(letters, clients)
+                       if self.meeting.propose_solution(letter, client)]
+            if not changed:
+                return [], []
+
+            self.seq += 1
+            delta = self.delta(changed)
+            self.history.append((self.seq, delta))
+            return changed, self.broadcast(delta)
+
+    def attach_journal(self, event_log):
+        """Log this room's meeting events, starting from a snapshot of its current state"""
+        with self.lock:
+            self.journal = event_log.journal(self.room_id, self.meeting)
+
+    def close_journal(self):
+        with self.lock:
+            if self.journal:
+                self.journal.close()
+                self.meeting.journal = None
+                self.journal = None
+
+    def broadcast_meeting_state(self):
+        """Announce a change made outside a guess (new word, meeting started) as a new version"""
+        with self.lock:
+            self.touch()
+            self.seq += 1
+            # Earlier deltas cannot be replayed across a version that only exists as a snapshot
+            self.history.clear()
+            return self.broadcast(self.snapshot())
+
+class PoE_RoomRegistry:
+    """Rooms keyed by meeting ID, created on first join and evicted once idle"""
+    def __init__(self, meeting_factory=new_meeting, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.meeting_factory = meeting_factory
+        self.idle_timeout = idle_timeout
+        self.rooms = {}
+        self.lock = threading.Lock()
+
+        # Session token -> the PoE_Room instance it was issued for, least recently used first
+        self.sessions = collections.OrderedDict()
+
+        # eventlog.EventLog that every room's meeting events are written to, if any
+        self.event_log = None
+
+        # Connections of standby servers; every room broadcasts to them
+        self.replicas = []
+
+    def add(self, room):
+        with self.lock:
+            self.rooms[room.room_id] = room
+            room.replicas = self.replicas
+        if self.event_log:
+            room.attach_journal(self.event_log)
+        return room
+
+    def set_event_log(self, event_log):
+        """Start logging every room, including the ones that already exist"""
+        self.event_log = event_log
+        for room in self:
+            room.attach_journal(event_log)
+
+    def get(self, room_id):
+        return self.rooms.get(room_id)
+
+    def get_or_create(self, room_id):
+        with self.lock:
+            room = self.rooms.get(room_id)
+            if room is None:
+                room = PoE_Room(room_id, self.meeting_factory())
+                room.replicas = self.replicas
+                self.rooms[room_id] = room
+                if self.event_log:
+                    room.attach_journal(self.event_log)
+            # Keep the room from being evicted before the joining client is added
+            room.touch()
+            return room
+
+    def open_session(self, room, token=None):
+        """Issue a session token for a room, or renew a client's existing one"""
+        with self.lock:
+            if token not in self.sessions:
+                token = secrets.token_hex(16)
+            self.sessions[token] = room
+            self.sessions.move_to_end(token)
+            while len(self.sessions) > MAX_SESSIONS:
+                self.sessions.popitem(last=False)
+            return token
+
+    def can_resume(self, token, room):
+        """True if the token was issued for this exact room instance, not an evicted namesake"""
+        return token is not None and self.sessions.get(token) is room
+
+    def evict_idle(self, now=None):
+        """Drop rooms that have had no clients for idle_timeout seconds"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            idle = [room_id for room_id, room in self.rooms.items() if room.is_idle(now, self.idle_timeout)]
+            for room_id in idle:
+                self.rooms.pop(room_id).close_journal()
+            if idle:
+                # Sessions for evicted rooms can never resume
+                live = set(self.rooms.values())
+                for token in [token for token, room in self.sessions.items() if room not in live]:
+                    del self.sessions[token]
+        return idle
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def __iter__(self):
+        return iter(list(self.rooms.values()))
@@ -0,0 +1,139 @@
+"""Screen buffer for the terminal UI that only rewrites the cells that changed
+
+A frame is a list of text lines that may contain ANSI color codes. Screen
+keeps the previous frame as rows of (character, style) cells and, for each
+new one, writes a cursor move followed by the new cells for each run of
+cells that differ, so a guess that reveals one letter costs tens of bytes
+instead of a cleared and reprinted screen.
+
+Anything else that writes to the terminal must call invalidate(), so the
+next frame is drawn in full over whatever it left behind.
+"""
+
+import re
+import sys
+
+RESET = "\033[0m"
+CLEAR_SCREEN = "\033[H\033[2J"
+
+SGR = re.compile(r"\033\[[0-9;]*m")
+
+# Unchanged cells between two changes are rewritten instead of jumped over
+# when that is no longer than the cursor move would be
+MIN_JUMP = 8
+
+def move_to(row, column):
+    return f"\033[{row + 1};{column + 1}H"
+
+def parse_line(line, width):
+    """Cells of a line: (character, style) with style the color codes in effect, clipped to width"""
+    cells = []
+    style = ""
+    position = 0
+    for match in SGR.finditer(line):
+        for character in line[position:match.start()]:
+            cells.append((character, style))
+        code = match.group()
+        style = "" if code == RESET else style + code
+        position = match.end()
+    for character in line[position:]:
+        cells.append((character, style))
+    del cells[width:]
+    cells.extend([(" ", "")] * (width - len(cells)))
+    return cells
+
+class Screen:
+    """Draws frames of lines, writing only what differs from the last frame"""
+    def __init__(self, width, height, stream=None):
+        self.width = width
+        self.height = height
+        self.stream = stream
+        self.rows = None
+
+        # Metrics
+        self.frames = 0
+        self.full_frames = 0
+        self.bytes_written = 0
+
+    def invalidate(self):
+        """Forget the last frame; the next one clears the screen and is drawn in full"""
+        self.rows = None
+
+    def render(self, lines, cursor=None):
+        """Draw lines from the top left and leave the cursor at (row, column), or after the last line"""
+        rows = [parse_line(line, self.width) for line in lines[:self.height]]
+        if cursor is None:
+            cursor = (max(len(rows) - 1, 0), min(len(SGR.sub("", lines[-1])), self.width - 1) if lines else 0)
+
+        if self.rows is None:
+            output = self.full(rows)
+            self.full_frames += 1
+        else:
+            output = self.diff(self.rows, rows)
+        self.rows = rows
+
+        output.append(move_to(*cursor))
+        self.write("".join(output))
+        self.frames += 1
+
+    def full(self, rows):
+        output = [CLEAR_SCREEN]
+        for index, row in enumerate(rows):
+            if index:
+                output.append("\r\n")
+            output.append(self.cells(row, 0, self.last_drawn(row)))
+        return output
+
+    def diff(self, old_rows, new_rows):
+        output = []
+        blank = [(" ", "")] * self.width
+        for index in range(max(len(old_rows), len(new_rows))):
+            old = old_rows[index] if index < len(old_rows) else blank
+            new = new_rows[index] if index < len(new_rows) else blank
+            if old == new:
+                continue
+
+            column = 0
+            while column < self.width:
+                if old[column] == new[column]:
+                    column += 1
+                    continue
+                # A run of changes, bridging short stretches of unchanged cells
+                start = end = column
+                column += 1
+                while column < self.width:
+                    if old[column] != new[column]:
+                        end = column
+                    elif column - end > MIN_JUMP:
+                        break
+                    column += 1
+                output.append(move_to(index, start))
+                output.append(self.cells(new, start, end + 1))
+        return output
+
+    @staticmethod
+    def last_drawn(row):
+        """End of a row once trailing blanks, which a cleared screen already has, are left off"""
+        end = len(row)
+        while end and row[end - 1] == (" ", ""):
+            end -= 1
+        return end
+
+    @staticmethod
+    def cells(row, start, end):
+        output = []
+        style = ""
+        for character, cell_style in row[start:end]:
+            if cell_style != style:
+                output.append(RESET + cell_style)
+                style = cell_style
+            output.append(character)
+        if style:
+            output.append(RESET)
+        return "".join(output)
+
+    def write(self, text):
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+        self.bytes_written += len(text.encode("utf-8"))
@@ -0,0 +1,268 @@
+"""Letter-guessing solver for PoE_Meeting
+
+The solver keeps the set of dictionary words that are still consistent with
+the masked word and the guessed letters, and guesses the letter that tells
+it the most about which of them is the answer.
+
+Words are split into one table per length. In a table, a candidate set is a
+bitmap (a Python int, bit k for the table's k-th word), and each (position,
+letter) pair has a bitmap of the words with that letter there. Applying a
+guess is one AND per position, and counting how many candidates contain
+each letter is 26 AND + popcount operations that process every word at
+once, so a move costs microseconds even on large dictionaries.
+"""
+
+import math
+
+from logic import ALPHABET_START, LetterSet, popcount
+from wordstore import ListWordStore, WordStore, default_store
+
+# At or below this many candidates, they are kept as a list and a guess is
+# scored by the full split of positions it would reveal, not just hit or miss
+EXACT_SPLIT_LIMIT = 64
+
+# Used when no dictionary word fits, e.g. a custom word the host typed in
+FALLBACK_ORDER = "ESIARNTOLCDUGPMKHBYFVWZXQJ"
+
+# numpy is optional; it only speeds up building the tables
+_numpy = None
+
+def load_numpy():
+    """Import numpy on first use; returns the module, or None if it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+def entropy(sizes, total):
+    """Bits of information in splitting `total` candidates into groups of these sizes"""
+    return -sum(size / total * math.log2(size / total) for size in sizes if size)
+
+class CandidateTable:
+    """Every A-Z word of one length, with per-position and per-word letter bitmaps"""
+    def __init__(self, length, words, np=None):
+        self.length = length
+        self.words = words
+        self.all = (1 << len(words)) - 1
+        if np is not None and words:
+            self.at = self.numpy_bitmaps(np)
+        else:
+            self.at = self.python_bitmaps()
+
+        # Words containing each letter anywhere
+        self.contains = [0] * 26
+        for position_bitmaps in self.at:
+            for letter, bitmap in enumerate(position_bitmaps):
+                self.contains[letter] |= bitmap
+
+    def python_bitmaps(self):
+        # Set bits in byte buffers and convert once; OR-ing into ints word by word is quadratic
+        size = (len(self.words) + 7) // 8
+        buffers = [[None] * 26 for _ in range(self.length)]
+        for index, word in enumerate(self.words):
+            byte, bit = index >> 3, 1 << (index & 7)
+            for position, letter in enumerate(word):
+                letter = ord(letter) - ALPHABET_START
+                buffer = buffers[position][letter]
+                if buffer is None:
+                    buffer = buffers[position][letter] = bytearray(size)
+                buffer[byte] |= bit
+        return [[int.from_bytes(buffer, "little") if buffer else 0 for buffer in position_buffers]
+                for position_buffers in buffers]
+
+    def numpy_bitmaps(self, np):
+        letters = np.frombuffer("".join(self.words).encode("ascii"), dtype=np.uint8)
+        letters = letters.reshape(len(self.words), self.length) - ALPHABET_START
+        bitmaps = []
+        for position in range(self.length):
+            column = letters[:, position]
+            bitmaps.append([
+                int.from_bytes(np.packbits(column == letter, bitorder="little").tobytes(), "little")
+                for letter in range(26)
+            ])
+        return bitmaps
+
+class Candidates:
+    """Words still consistent with one meeting, narrowed as guesses come in"""
+    def __init__(self, table):
+        self.table = table
+        self.bitmap = table.all
+        self.applied = 0
+
+        # Once few candidates are left: for each, the positions of every letter
+        # in it, as {letter: position mask}; exact scoring works from these
+        self.layouts = None
+
+    def __len__(self):
+        if self.layouts is not None:
+            return len(self.layouts)
+        return popcount(self.bitmap)
+
+    def apply(self, pattern, guessed_mask):
+        """Narrow to the letters guessed since the last call
+
+        pattern lists each position's letter, or "_" while it is hidden.
+        Returns False if the guesses are not a continuation of the ones
+        already applied (a new meeting), in which case nothing changes.
+        """
+        if self.applied & ~guessed_mask:
+            return False
+
+        new = guessed_mask & ~self.applied
+        while new:
+            low = new & -new
+            letter = low.bit_length() - 1
+            character = chr(ALPHABET_START + letter)
+            # The letter is exactly where it was revealed: present there, absent everywhere else
+            if self.layouts is not None:
+                shown = sum(1 << position for position, shown in enumerate(pattern) if shown == character)
+                self.layouts = [layout for layout in self.layouts if layout.get(letter, 0) == shown]
+            else:
+                at = self.table.at
+                bitmap = self.bitmap
+                for position, shown in enumerate(pattern):
+                    if shown == character:
+                        bitmap &= at[position][letter]
+                    else:
+                        bitmap &= ~at[position][letter]
+                self.bitmap = bitmap
+                if popcount(bitmap) <= EXACT_SPLIT_LIMIT:
+                    self.layouts = [self.layout(word) for word in self.members()]
+            new ^= low
+
+        self.applied = guessed_mask
+        return True
+
+    def members(self):
+        """Candidate words, read off the set bits of the bitmap"""
+        bits = bin(self.bitmap)
+        top = len(bits) - 1
+        words = []
+        position = bits.find("1", 2)
+        while position != -1:
+            words.append(self.table.words[top - position])
+            position = bits.find("1", position + 1)
+        return words
+
+    @staticmethod
+    def layout(word):
+        layout = {}
+        for position, letter in enumerate(word):
+            letter = ord(letter) - ALPHABET_START
+            layout[letter] = layout.get(letter, 0) | 1 << position
+        return layout
+
+    def best_letter(self, guessed_mask):
+        """Letter with the highest expected information gain; None if there is no candidate"""
+        total = len(self)
+        if not total:
+            return None
+        open_letters = [letter for letter in range(26) if not guessed_mask >> letter & 1]
+
+        if self.layouts is not None:
+            gains, hits = self.split_gains(open_letters, total)
+        else:
+            # Letter frequencies over all candidates at once, one popcount per letter
+            bitmap = self.bitmap
+            contains = self.table.contains
+            hits = {}
+            for letter in open_letters:
+                count = popcount(bitmap & contains[letter])
+                if count == total:
+                    # A letter every candidate contains cannot miss, so it is free information
+                    return chr(ALPHABET_START + letter)
+                if count:
+                    hits[letter] = count
+            gains = {letter: entropy((count, total - count), total) for letter, count in hits.items()}
+
+        if not hits:
+            return None
+        # Ties go to the letter more likely to be in the word
+        best = max(hits, key=lambda letter: (gains[letter], hits[letter]))
+        return chr(ALPHABET_START + best)
+
+    def split_gains(self, letters, total):
+        """Gain of each letter from the exact reveal patterns it would produce, and its hit count"""
+        # Candidates grouped by where each letter would appear; a miss is everyone else
+        patterns = {letter: {} for letter in letters}
+        for layout in self.layouts:
+            for letter, positions in layout.items():
+                counts = patterns.get(letter)
+                if counts is not None:
+                    counts[positions] = counts.get(positions, 0) + 1
+
+        gains = {}
+        hits = {}
+        for letter, counts in patterns.items():
+            hit = sum(counts.values())
+            if hit:
+                hits[letter] = hit
+                gains[letter] = entropy(list(counts.values()) + [total - hit], total)
+        return gains, hits
+
+class Solver:
+    """Chooses guesses for meetings whose word comes from a known dictionary
+
+    Tables are built lazily, one per word length, the first time a meeting of
+    that length is seen; the solver can be shared by any number of players.
+    """
+    def __init__(self, words=None, use_numpy=True):
+        if words is None:
+            words = default_store
+        elif not isinstance(words, WordStore):
+            words = ListWordStore(list(words))
+        self.words = words
+        self.np = load_numpy() if use_numpy else None
+        self.tables = {}
+
+    def table(self, length):
+        table = self.tables.get(length)
+        if table is None:
+            table = self.tables[length] = CandidateTable(length, self.words_of_length(length), self.np)
+        return table
+
+    def words_of_length(self, length):
+        index = self.words.get_index("length")
+        start, end = index.span(length, length)
+        words = []
+        for bucket in index.buckets[start:end]:
+            for word_id in bucket:
+                word = self.words.word(word_id).upper()
+                # Only A-Z words can be represented in the bitmaps
+                if word.isascii() and word.isalpha():
+                    words.append(word)
+        return words
+
+    def candidates(self, length):
+        return Candidates(self.table(length))
+
+    def move(self, pattern, guessed_letters, candidates=None):
+        """Next letter to guess for a masked word and the letters guessed so far
+
+        pattern is the meeting's display, e.g. "A _ _ L E" or a list of
+        characters; pass the Candidates from the previous move to only apply
+        the new guesses. Returns (letter, candidates), letter None when every
+        letter has been guessed.
+        """
+        if isinstance(pattern, str):
+            pattern = pattern.split(" ")
+        guessed_mask = LetterSet(guessed_letters).mask
+
+        if candidates is None or candidates.table.length != len(pattern) \
+                or not candidates.apply(pattern, guessed_mask):
+            candidates = self.candidates(len(pattern))
+            candidates.apply(pattern, guessed_mask)
+
+        letter = candidates.best_letter(guessed_mask)
+        if letter is None:
+            letter = next((letter for letter in FALLBACK_ORDER
+                           if not guessed_mask >> (ord(letter) - ALPHABET_START) & 1), None)
+        return letter, candidates
+
+    def play(self, meeting, candidates=None):
+        """Choose the next guess for a PoE_Meeting; see move()"""
+        return self.move(meeting.get_problem(), meeting.guessed_letters, candidates)
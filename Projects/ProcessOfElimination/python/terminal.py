@@ -0,0 +1,175 @@
+"""Keyboard input for the terminal UI that blocks until something happens
+
+Terminal.read_key() sleeps until a key is pressed or another thread calls
+wake(), e.g. because a network message changed the meeting, so an idle
+terminal costs no CPU and keys are handled as soon as they arrive.
+
+On Linux and macOS stdin is put in cbreak mode and waited on with selectors,
+together with a socket pair that wake() writes to. On Windows, where the
+console cannot be selected on, a reader thread blocks in msvcrt.getwch()
+and hands keys over through a queue that wake() also posts to.
+
+Keys come back normalized: Enter is "\\r", Backspace "\\b" and Escape "\\x1b";
+arrow and function keys are dropped, keeping any keys read along with them.
+EOFError is raised once stdin closes.
+"""
+
+import os
+import queue
+import selectors
+import socket
+import sys
+import threading
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+KEY_MAP = {"\n": "\r", "\x7f": "\b"}
+
+def parse_keys(data):
+    """Keys in a read from stdin, leaving out arrow and function keys' escape sequences
+
+    CSI sequences (ESC [, parameters, then a final byte in @ to ~) and SS3
+    sequences (ESC O and one byte) are dropped; an ESC that starts neither
+    is the Escape key itself.
+    """
+    keys = []
+    index = 0
+    while index < len(data):
+        char = data[index]
+        index += 1
+        if char == "\x1b" and index < len(data) and data[index] == "[":
+            index += 1
+            while index < len(data) and not "@" <= data[index] <= "~":
+                index += 1
+            index += 1
+        elif char == "\x1b" and index < len(data) and data[index] == "O":
+            index += 2
+        else:
+            keys.append(KEY_MAP.get(char, char))
+    return keys
+
+class Terminal:
+    """Wait for keys and wakeups together; use as a context manager around the UI loop"""
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self.saved_mode = None
+        self.pending = []
+
+        if msvcrt is not None:
+            self.keys = queue.Queue()
+            self.reader = None
+        else:
+            self.fd = None
+            self.wake_reader, self.wake_writer = socket.socketpair()
+            self.wake_reader.setblocking(False)
+            self.wake_writer.setblocking(False)
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.wake_reader, selectors.EVENT_READ, "wake")
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.restore()
+        return False
+
+    def open(self):
+        """Deliver keys one at a time without echo; Ctrl+C still interrupts"""
+        if msvcrt is not None:
+            if self.reader is None:
+                self.reader = threading.Thread(target=self.read_console)
+                self.reader.daemon = True
+                self.reader.start()
+            return
+        if self.fd is None:
+            self.fd = self.stream.fileno()
+            self.selector.register(self.fd, selectors.EVENT_READ, "key")
+        if termios is not None and self.saved_mode is None and os.isatty(self.fd):
+            self.saved_mode = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+
+    def restore(self):
+        if self.saved_mode is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved_mode)
+            self.saved_mode = None
+
+    def wake(self):
+        """Make a blocked read_key() return None; safe to call from any thread"""
+        if msvcrt is not None:
+            self.keys.put(None)
+            return
+        try:
+            self.wake_writer.send(b"\0")
+        except BlockingIOError:
+            # Already more wakeups queued than the loop has read
+            pass
+
+    def read_key(self, timeout=None):
+        """Next key, or None if woken or the timeout ran out first"""
+        if self.pending:
+            return self.pending.pop(0)
+        self.open()
+        if msvcrt is not None:
+            try:
+                return self.keys.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+        woken = False
+        for key, _ in self.selector.select(timeout):
+            if key.data == "wake":
+                self.drain_wakeups()
+                woken = True
+            else:
+                self.pending.extend(self.read_stdin())
+        if self.pending and not woken:
+            return self.pending.pop(0)
+        return None
+
+    def getch(self):
+        """Block until a key is pressed, ignoring wakeups"""
+        while True:
+            key = self.read_key()
+            if key is not None:
+                return key
+
+    def drain_wakeups(self):
+        try:
+            while self.wake_reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def read_stdin(self):
+        data = os.read(self.fd, 64).decode("utf-8", errors="ignore")
+        if not data:
+            # stdin closed; no key will ever come
+            self.selector.unregister(self.fd)
+            raise EOFError("stdin closed")
+        return parse_keys(data)
+
+    def read_console(self):
+        while True:
+            char = msvcrt.getwch()
+            if char in ("\x00", "\xe0"):
+                # Arrow and function keys arrive as a prefix and a scan code
+                msvcrt.getwch()
+                continue
+            self.keys.put(char)
+
+    def close(self):
+        self.restore()
+        if msvcrt is None:
+            self.selector.close()
+            self.wake_reader.close()
+            self.wake_writer.close()
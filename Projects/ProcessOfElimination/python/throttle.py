@@ -0,0 +1,81 @@
+import threading
+import time
+
+# Guesses a client may make per second, and how many it may fire off in a burst
+DEFAULT_GUESS_RATE = 10.0
+DEFAULT_GUESS_BURST = 20
+
+class TokenBucket:
+    """Classic token bucket: refills at `rate` tokens per second up to `burst`"""
+    def __init__(self, rate=DEFAULT_GUESS_RATE, burst=DEFAULT_GUESS_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self, now=None):
+        """Spend one token; False if the bucket is empty"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+class GuessBatcher:
+    """Collect guesses for `window` seconds, then hand each room its batch in arrival order
+
+    The ticker thread sleeps until the first guess of a batch arrives, so an
+    idle server does no periodic work. flush(room, letters, clients) is called
+    once per room per tick, from the ticker thread, with the client that sent
+    each letter.
+    """
+    def __init__(self, window, flush):
+        self.window = window
+        self.flush = flush
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+
+        # Metrics
+        self.ticks = 0
+        self.guesses = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def add(self, room, letter, client=None):
+        with self.lock:
+            letters, clients = self.pending.setdefault(room, ([], []))
+            letters.append(letter)
+            clients.append(client)
+        self.wakeup.set()
+
+    def run(self):
+        while self.running:
+            self.wakeup.wait()
+            if not self.running:
+                return
+            time.sleep(self.window)
+
+            with self.lock:
+                self.wakeup.clear()
+                batch, self.pending = self.pending, {}
+
+            self.ticks += 1
+            for room, (letters, clients) in batch.items():
+                self.guesses += len(letters)
+                try:
+                    self.flush(room, letters, clients)
+                except Exception as e:
+                    print(f"Error applying guess batch: {e}")
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
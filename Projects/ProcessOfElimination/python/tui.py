@@ -1,11 +1,9 @@
-#TODO: investigate windows-curses and textual as alternatives to msvcrt
-
 import os
-import time
+import shutil
 import sys
-import msvcrt
 from logic import Transcript, PoE_Meeting
-from network import PoE_Client, PoE_Server
+from screen import CLEAR_SCREEN, Screen
+from terminal import Terminal
 
 class Application:
     """Application states - matches GUI version for consistency"""
@@ -36,12 +34,20 @@ class ProcessOfEliminationTUI:
         os.system("")
         
         # Get terminal dimensions
-        self.width = os.get_terminal_size().columns
-        self.height = os.get_terminal_size().lines
+        self.width, self.height = shutil.get_terminal_size()
+        
+        # The meeting view is drawn through a screen buffer that only rewrites changed cells
+        self.screen = Screen(self.width, self.height)
         
         # Input buffer for user input
         self.input_buffer = ""
         
+        # Keyboard input; network threads wake it through update_display
+        self.terminal = Terminal()
+        
+        # Meeting and input the meeting view was last drawn for
+        self.drawn_view = None
+        
         # Current state
         self.current_state = None
         
@@ -53,10 +59,11 @@ class ProcessOfEliminationTUI:
     
     def clear_screen(self):
         """Clear the console screen"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        print(CLEAR_SCREEN, end="", flush=True)
+        self.screen.invalidate()
     
-    def draw_header(self, title, status=None, status_color=None):
-        """Draw the header with title and optional status"""
+    def header_lines(self, title, status=None, status_color=None):
+        """Lines of the header with title and optional status"""
         header = f"{Colors.BOLD}{title}{Colors.RESET}"
         
         # Add status if provided
@@ -65,19 +72,31 @@ class ProcessOfEliminationTUI:
             padding = self.width - len(title) - len(status) - 4
             header += " " * padding + f"{color}{status}{Colors.RESET}"
         
-        print(header)
-        print("=" * self.width)
+        return [header, "=" * self.width]
     
-    def draw_footer(self, message="", input_prompt=None):
-        """Draw the footer with message and optional input prompt"""
-        print()
-        print("=" * self.width)
+    def draw_header(self, title, status=None, status_color=None):
+        """Draw the header with title and optional status"""
+        for line in self.header_lines(title, status, status_color):
+            print(line)
+    
+    def footer_lines(self, message="", input_prompt=None):
+        """Lines of the footer with message and optional input prompt"""
+        lines = ["", "=" * self.width]
         
         if input_prompt:
-            prompt = f"{input_prompt}: {self.input_buffer}"
-            print(prompt, end="", flush=True)
+            lines.append(f"{input_prompt}: {self.input_buffer}")
         elif message:
-            print(message)
+            lines.append(message)
+        return lines
+    
+    def draw_footer(self, message="", input_prompt=None):
+        """Draw the footer with message and optional input prompt"""
+        lines = self.footer_lines(message, input_prompt)
+        for line in lines[:-1]:
+            print(line)
+        
+        # Leave the cursor after an input prompt
+        print(lines[-1], end="" if input_prompt else "\n", flush=True)
     
     def center_text(self, text, width=None):
         """Center text in the given width"""
@@ -120,7 +139,7 @@ class ProcessOfEliminationTUI:
         self.draw_footer("Enter a number to select an option")
     
     def draw_ascii_clock(self, incorrect_guesses, max_incorrect):
-        """Draw an ASCII representation of a clock"""
+        """Lines of an ASCII representation of a clock"""
         # Calculate progress
         progress = incorrect_guesses / max_incorrect if max_incorrect > 0 else 0
         
@@ -154,9 +173,7 @@ class ProcessOfEliminationTUI:
         if progress >= 0.75:
             clock.append(f"{Colors.RED}TIME RUNNING OUT!{Colors.RESET}")
         
-        # Print the clock
-        for line in clock:
-            print(line)
+        return clock
     
     def draw_progress_bar(self, progress, width=40):
         """Draw a progress bar showing completion"""
@@ -165,12 +182,20 @@ class ProcessOfEliminationTUI:
         percent = int(progress * 100)
         return f"Solution Progress: {percent}% {bar}"
     
+    def meeting_view_key(self, meeting_state):
+        """Everything the meeting view shows; it only needs redrawing when this changes"""
+        return (meeting_state["state"], meeting_state["display_word"], meeting_state["incorrect_guesses"],
+                meeting_state["max_incorrect"], tuple(meeting_state["guessed_letters"]),
+                self.input_buffer, self.is_host)
+    
     def draw_meeting_view(self):
-        """Draw the meeting screen with problem and clock"""
-        self.clear_screen()
-        
+        """Draw the meeting screen with problem and clock, rewriting only what changed"""
         meeting_state = self.meeting.get_meeting_state()
-        
+        self.drawn_view = self.meeting_view_key(meeting_state)
+        self.screen.render(self.meeting_view_lines(meeting_state))
+    
+    def meeting_view_lines(self, meeting_state):
+        """Lines of the meeting screen; the cursor is left at the end of the last one"""
         # Determine meeting status and color
         status = "Not Started"
         color = Colors.YELLOW
@@ -186,55 +211,51 @@ class ProcessOfEliminationTUI:
             color = Colors.RED
         
         # Draw header with status
-        self.draw_header("Ongoing Meeting", status, color)
+        lines = self.header_lines("Ongoing Meeting", status, color)
         
         # Draw clock visualization
-        self.draw_ascii_clock(meeting_state["incorrect_guesses"], meeting_state["max_incorrect"])
+        lines.extend(self.draw_ascii_clock(meeting_state["incorrect_guesses"], meeting_state["max_incorrect"]))
         
-        print()
+        lines.append("")
         
         # Display problem (word to guess)
         problem_title = "Current Problem:"
         problem = meeting_state["display_word"]
         
-        print(self.center_text(problem_title))
-        print(self.center_text(f"{Colors.BOLD}{problem}{Colors.RESET}"))
+        lines.append(self.center_text(problem_title))
+        lines.append(self.center_text(f"{Colors.BOLD}{problem}{Colors.RESET}"))
         
-        print()
+        lines.append("")
         
         # Calculate progress for the process diagram
         progress = len([c for c in meeting_state["display_word"] if c.isalpha()]) / len(meeting_state["word"])
         
         # Show progress bar
-        print(self.center_text(self.draw_progress_bar(progress)))
+        lines.append(self.center_text(self.draw_progress_bar(progress)))
         
-        print()
+        lines.append("")
         
         # Display proposed solutions
-        correct = []
-        incorrect = []
-        for letter in meeting_state["guessed_letters"]:
-            if letter in meeting_state["word"]:
-                correct.append(letter)
-            else:
-                incorrect.append(letter)
+        correct, incorrect = self.meeting.tally()
         
         correct_str = "Correct Approaches: " + ", ".join(correct) if correct else "Correct Approaches: None"
         incorrect_str = "Incorrect Approaches: " + ", ".join(incorrect) if incorrect else "Incorrect Approaches: None"
         
-        print(self.center_text(f"{Colors.GREEN}{correct_str}{Colors.RESET}"))
-        print(self.center_text(f"{Colors.RED}{incorrect_str}{Colors.RESET}"))
+        lines.append(self.center_text(f"{Colors.GREEN}{correct_str}{Colors.RESET}"))
+        lines.append(self.center_text(f"{Colors.RED}{incorrect_str}{Colors.RESET}"))
         
         # Footer with controls or input prompt
         if not self.is_host and meeting_state["state"] == Transcript.PLAYING:
-            self.draw_footer(input_prompt="Enter a letter to propose a solution")
+            lines.extend(self.footer_lines(input_prompt="Enter a letter to propose a solution"))
         elif self.is_host:
             if meeting_state["state"] == Transcript.WAITING:
-                self.draw_footer("Press 'S' to start meeting, 'M' for main menu")
+                lines.extend(self.footer_lines("Press 'S' to start meeting, 'M' for main menu"))
             else:
-                self.draw_footer("Press 'M' for main menu")
+                lines.extend(self.footer_lines("Press 'M' for main menu"))
         else:
-            self.draw_footer("Waiting for meeting to start...")
+            lines.extend(self.footer_lines("Waiting for meeting to start..."))
+        
+        return lines
     
     def draw_results_view(self, success, problem):
         """Draw the meeting results screen"""
@@ -285,27 +306,24 @@ class ProcessOfEliminationTUI:
         
         buffer = ""
         while True:
-            if msvcrt.kbhit():
-                char = msvcrt.getch().decode('utf-8', errors='ignore')
-                
-                # Enter key
-                if char == '\r':
-                    print()  # Move to next line
-                    return buffer
-                
-                # Backspace
-                elif char == '\b':
-                    if buffer:
-                        buffer = buffer[:-1]
-                        # Clear the last character on screen
-                        print('\b \b', end='', flush=True)
-                
-                # Regular character
-                elif char.isprintable():
-                    buffer += char
-                    print(char, end='', flush=True)
+            char = self.terminal.getch()
+            
+            # Enter key
+            if char == '\r':
+                print()  # Move to next line
+                return buffer
+            
+            # Backspace
+            elif char == '\b':
+                if buffer:
+                    buffer = buffer[:-1]
+                    # Clear the last character on screen
+                    print('\b \b', end='', flush=True)
             
-            time.sleep(0.05)  # Small delay to prevent CPU hogging
+            # Regular character
+            elif char.isprintable():
+                buffer += char
+                print(char, end='', flush=True)
     
     def host_meeting(self):
         """Host a new meeting"""
@@ -327,6 +345,7 @@ class ProcessOfEliminationTUI:
         # Initialize server if needed
         if not self.network:
             try:
+                from network import PoE_Server
                 self.network = PoE_Server(self.meeting, self, host='0.0.0.0')
                 self.network.start()
                 
@@ -336,7 +355,7 @@ class ProcessOfEliminationTUI:
                 print(f"\nServer started at {hostname}:{port}")
                 print("Tell your team members to join using this address.")
                 print("\nPress any key to continue...")
-                msvcrt.getch()
+                self.terminal.getch()
                 
             except Exception as e:
                 self.show_error(f"Failed to start server: {e}")
@@ -362,6 +381,10 @@ class ProcessOfEliminationTUI:
         elif hasattr(self.meeting, "start_game"):
             self.meeting.start_game()
         
+        # Let clients that joined while we were setting up see the new problem
+        if hasattr(self.network, "broadcast_meeting_state"):
+            self.network.broadcast_meeting_state()
+        
         self.switch_to_state(Application.MEETING)
     
     def join_meeting(self):
@@ -382,6 +405,7 @@ class ProcessOfEliminationTUI:
         
         # Try to connect to server
         try:
+            from network import PoE_Client
             self.network = PoE_Client(self.meeting, self, host=server_ip)
             if not self.network.connect():
                 self.show_error("Failed to connect to server")
@@ -389,7 +413,7 @@ class ProcessOfEliminationTUI:
             
             print("\nConnected to server successfully!")
             print("Press any key to continue...")
-            msvcrt.getch()
+            self.terminal.getch()
             
         except Exception as e:
             self.show_error(f"Connection error: {e}")
@@ -439,10 +463,12 @@ class ProcessOfEliminationTUI:
         """Show an error message to the user"""
         print(f"\n{Colors.RED}ERROR: {message}{Colors.RESET}")
         print("Press any key to continue...")
-        msvcrt.getch()
+        self.terminal.getch()
         
         # Redraw the current screen
         if self.current_state == Application.MEETING:
+            # The message was printed over the screen buffer's last frame
+            self.screen.invalidate()
             self.draw_meeting_view()
         elif self.current_state == Application.MAIN_MENU:
             self.draw_main_menu()
@@ -456,6 +482,10 @@ class ProcessOfEliminationTUI:
         self.draw_results_view(success, problem)
         self.switch_to_state(Application.RESULTS)
     
+    def update_display(self):
+        """Called by the network layer, from its own threads, when the meeting changes"""
+        self.terminal.wake()
+    
     def update(self):
         """Update the UI based on current meeting state"""
         if self.current_state == Application.MEETING:
@@ -465,71 +495,70 @@ class ProcessOfEliminationTUI:
                 self.show_results(True, meeting_state["word"])
             elif meeting_state["state"] == Transcript.LOST:
                 self.show_results(False, meeting_state["word"])
-            else:
-                # Check if we need to redraw
+            elif self.meeting_view_key(meeting_state) != self.drawn_view:
                 self.draw_meeting_view()
     
     def run(self):
         """Main application loop"""
         running = True
-        
-        while running:
-            try:
-                # Non-blocking input check
-                if msvcrt.kbhit():
-                    key = msvcrt.getch().decode('utf-8', errors='ignore')
+        self.terminal.open()
+        try:
+            while running:
+                try:
+                    # Redraw if the meeting or the input changed since the last key or wakeup
+                    self.update()
+                
+                    # Sleep until a key is pressed or the network wakes us
+                    key = self.terminal.read_key()
+                    if key is not None:
                     
-                    # Main menu options
-                    if self.current_state == Application.MAIN_MENU:
-                        if key == '1':
-                            self.host_meeting()
-                        elif key == '2':
-                            self.join_meeting()
-                        elif key == '3' or key.lower() == 'q':
-                            running = False
+                        # Main menu options
+                        if self.current_state == Application.MAIN_MENU:
+                            if key == '1':
+                                self.host_meeting()
+                            elif key == '2':
+                                self.join_meeting()
+                            elif key == '3' or key.lower() == 'q':
+                                running = False
                     
-                    # Meeting options
-                    elif self.current_state == Application.MEETING:
-                        meeting_state = self.meeting.get_meeting_state()
+                        # Meeting options
+                        elif self.current_state == Application.MEETING:
+                            meeting_state = self.meeting.get_meeting_state()
                         
-                        if key.lower() == 'm':
-                            self.switch_to_state(Application.MAIN_MENU)
-                        elif self.is_host and key.lower() == 's':
-                            self.start_new_meeting()
-                        elif not self.is_host and meeting_state["state"] == Transcript.PLAYING:
-                            if key == '\r':  # Enter key
-                                if self.input_buffer:
-                                    self.propose_solution(self.input_buffer)
+                            if key.lower() == 'm':
+                                self.switch_to_state(Application.MAIN_MENU)
+                            elif self.is_host and key.lower() == 's':
+                                self.start_new_meeting()
+                            elif not self.is_host and meeting_state["state"] == Transcript.PLAYING:
+                                if key == '\r':  # Enter key
+                                    if self.input_buffer:
+                                        self.propose_solution(self.input_buffer)
+                                        self.input_buffer = ""
+                                elif key == '\x1b':  # Escape key
                                     self.input_buffer = ""
-                                    self.draw_meeting_view()
-                            elif key == '\x1b':  # Escape key
-                                self.input_buffer = ""
-                                self.draw_meeting_view()
-                            elif key == '\b':  # Backspace
-                                self.input_buffer = self.input_buffer[:-1]
-                                print('\b \b', end='', flush=True)
-                            elif len(self.input_buffer) < 1 and key.isalpha():
-                                self.input_buffer += key.lower()
-                                print(key.lower(), end='', flush=True)
+                                elif key == '\b':  # Backspace
+                                    self.input_buffer = self.input_buffer[:-1]
+                                elif len(self.input_buffer) < 1 and key.isalpha():
+                                    self.input_buffer += key.lower()
                     
-                    # Results options
-                    elif self.current_state == Application.RESULTS:
-                        if key.lower() == 'm':
-                            self.switch_to_state(Application.MAIN_MENU)
-                
-                # Update the UI periodically
-                self.update()
-                
-                # Small delay to prevent CPU hogging
-                time.sleep(0.1)
+                        # Results options
+                        elif self.current_state == Application.RESULTS:
+                            if key.lower() == 'm':
+                                self.switch_to_state(Application.MAIN_MENU)
                 
-            except Exception as e:
-                # Display error message
-                self.show_error(f"Error: {str(e)}")
-        
-        # Clean up
-        if self.network:
-            self.network.stop()
+                except EOFError:
+                    running = False
+                except Exception as e:
+                    # Display error message
+                    self.show_error(f"Error: {str(e)}")
+        finally:
+            # Put the terminal back even if Ctrl+C got past the loop
+            self.terminal.close()
+            if self.network:
+                if hasattr(self.network, "stop"):
+                    self.network.stop()
+                elif hasattr(self.network, "disconnect"):
+                    self.network.disconnect()
         print("Thanks for using Process of Elimination!")
 
 
@@ -0,0 +1,226 @@
+import bisect
+import hashlib
+import mmap
+import os
+import random
+from array import array
+
+# Words used when a meeting is not given a dictionary
+DEFAULT_WORDS = [
+    "python", "programming", "computer", "algorithm", "network",
+    "database", "interface", "variable", "function", "keyboard",
+    "monitor", "language", "software", "hardware", "developer"
+]
+
+class WordIndex:
+    """Word ids bucketed by a small integer key such as length or difficulty band
+
+    Each bucket is a compact array of ids. Picking a random word whose key
+    falls in a range is a bisect over the distinct keys plus one array lookup,
+    regardless of how many words there are.
+    """
+    def __init__(self, keys):
+        # Key of every word id, for checking a word picked through another index
+        self.key_of = array("i", keys)
+
+        buckets = {}
+        for word_id, key in enumerate(self.key_of):
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = array("I")
+            bucket.append(word_id)
+
+        self.keys = sorted(buckets)
+        self.buckets = [buckets[key] for key in self.keys]
+
+        # Running totals so a range of buckets can be sampled as one list
+        self.cumulative = [0]
+        for bucket in self.buckets:
+            self.cumulative.append(self.cumulative[-1] + len(bucket))
+
+    def matches(self, word_id, low=None, high=None):
+        key = self.key_of[word_id]
+        return (low is None or key >= low) and (high is None or key <= high)
+
+    def count(self, low=None, high=None):
+        start, end = self.span(low, high)
+        return self.cumulative[end] - self.cumulative[start]
+
+    def span(self, low, high):
+        """Range of bucket positions whose keys lie in [low, high]"""
+        start = 0 if low is None else bisect.bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect.bisect_right(self.keys, high)
+        return start, max(start, end)
+
+    def pick(self, rng=random, low=None, high=None):
+        """Random word id with a key in [low, high]; None if there is none"""
+        start, end = self.span(low, high)
+        total = self.cumulative[end] - self.cumulative[start]
+        if total == 0:
+            return None
+
+        position = self.cumulative[start] + rng.randrange(total)
+        bucket = bisect.bisect_right(self.cumulative, position, start, end + 1) - 1
+        return self.buckets[bucket][position - self.cumulative[bucket]]
+
+class WordStore:
+    """Source of candidate words, shared by every meeting that draws from it
+
+    Subclasses provide __len__, word(word_id), word_length(word_id) and
+    fingerprint(), a digest of the contents used to key on-disk caches.
+    Filters passed to random_word name an index (``length`` is always
+    available; others are added with add_index) and give either one key or
+    an inclusive (low, high) range, e.g. random_word(length=(5, 8)).
+    """
+    # Attempts at satisfying the secondary filters before giving up
+    MAX_FILTER_TRIES = 64
+
+    def __init__(self):
+        self.indexes = {}
+
+    def add_index(self, name, keys):
+        """Index words by one integer key per word id, in word id order"""
+        self.indexes[name] = WordIndex(keys)
+        return self.indexes[name]
+
+    def get_index(self, name):
+        if name == "length" and "length" not in self.indexes:
+            self.add_index("length", (self.word_length(word_id) for word_id in range(len(self))))
+        return self.indexes[name]
+
+    @staticmethod
+    def bounds(value):
+        if isinstance(value, (tuple, list)):
+            return value[0], value[1]
+        return value, value
+
+    def count(self, **filters):
+        """Words matching a single filter (or all words with none)"""
+        if not filters:
+            return len(self)
+        (name, value), = filters.items()
+        return self.get_index(name).count(*self.bounds(value))
+
+    def random_word(self, rng=random, **filters):
+        """Random word matching every filter, upper-cased; None if nothing matches"""
+        if not filters:
+            return self.word(rng.randrange(len(self))).upper() if len(self) else None
+
+        if len(filters) == 1:
+            (name, value), = filters.items()
+            word_id = self.get_index(name).pick(rng, *self.bounds(value))
+            return None if word_id is None else self.word(word_id).upper()
+
+        # Draw from the most selective index and check the rest against their keys
+        ranges = {name: self.bounds(value) for name, value in filters.items()}
+        name = min(ranges, key=lambda name: self.get_index(name).count(*ranges[name]))
+        checks = [(self.get_index(other), *ranges[other]) for other in ranges if other != name]
+
+        for _ in range(self.MAX_FILTER_TRIES):
+            word_id = self.get_index(name).pick(rng, *ranges[name])
+            if word_id is None:
+                return None
+            if all(index.matches(word_id, low, high) for index, low, high in checks):
+                return self.word(word_id).upper()
+        return None
+
+class ListWordStore(WordStore):
+    """Words already in memory; the list is referenced, not copied"""
+    def __init__(self, words):
+        super().__init__()
+        self.words = words
+
+    def __len__(self):
+        return len(self.words)
+
+    def word(self, word_id):
+        return self.words[word_id]
+
+    def word_length(self, word_id):
+        return len(self.words[word_id])
+
+    def fingerprint(self):
+        digest = hashlib.blake2b(digest_size=16)
+        for word in self.words:
+            digest.update(word.encode("utf-8") + b"\n")
+        return digest.hexdigest()
+
+class MappedWordStore(WordStore):
+    """Word file memory-mapped and indexed by byte offset
+
+    Only an array of line offsets is kept in memory; a word becomes a Python
+    string when it is picked. Lines that are blank or contain anything but
+    letters are skipped at index time, so word ids are dense.
+    """
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._fingerprint = None
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        # mmap cannot map an empty file
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        # Start and end of each word; 4-byte offsets unless the file is 4 GiB or larger
+        typecode = "I" if size < 2 ** 32 else "Q"
+        self.starts = array(typecode)
+        self.ends = array(typecode)
+        self.build_offsets()
+
+    def build_offsets(self):
+        """Scan the file once for word offsets, building the length index on the way"""
+        starts = self.starts
+        ends = self.ends
+        lengths = array("i")
+        position = 0
+        self.file.seek(0)
+        for line in self.file:
+            start = position
+            position += len(line)
+            word = line.strip()
+            if not word:
+                continue
+            if word.isascii():
+                if not word.isalpha():
+                    continue
+                length = len(word)
+            else:
+                text = word.decode("utf-8", "replace")
+                if not text.isalpha():
+                    continue
+                length = len(text)
+            # Offsets of the stripped word within the line
+            offset = len(line) - len(line.lstrip())
+            starts.append(start + offset)
+            ends.append(start + offset + len(word))
+            lengths.append(length)
+        self.add_index("length", lengths)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def word(self, word_id):
+        return self.data[self.starts[word_id]:self.ends[word_id]].decode("utf-8")
+
+    def word_length(self, word_id):
+        # Byte length equals letter count for ASCII words; decode the rare others
+        raw = self.data[self.starts[word_id]:self.ends[word_id]]
+        return len(raw) if raw.isascii() else len(raw.decode("utf-8"))
+
+    def fingerprint(self):
+        """Digest of the file bytes; computed once, the mapping is read-only"""
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.blake2b(self.data, digest_size=16).hexdigest()
+        return self._fingerprint
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+def open_word_store(path):
+    """Word store for a dictionary file, one word per line"""
+    return MappedWordStore(path)
+
+# Shared by every PoE_Meeting that is not given its own store
+default_store = ListWordStore(DEFAULT_WORDS)